@@ -0,0 +1,9 @@
+# Konfigurasi pytest: uas.py berada di uasStrukturData/ dan bukan paket
+import os
+import sys
+
+# Harus diatur sebelum pygame diimpor (lewat uas)
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "uasStrukturData"))
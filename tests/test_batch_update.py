@@ -0,0 +1,43 @@
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import LibraryStorage, PlaylistManager, Song
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = PlaylistManager(storage=LibraryStorage(str(tmp_path / "library"), str(tmp_path / "legacy.json")))
+    manager.create_playlist("A")
+    manager.create_playlist("B")
+    for name in ("A", "B"):
+        manager.add_song(Song("Lagu", "Artis", "Album", "3:00", "/musik/lagu.mp3", playlist=name), name)
+        manager.add_song(Song(f"Lain {name}", "Artis", "Album", "3:00", f"/musik/{name}.mp3", playlist=name), name)
+    return manager
+
+
+def test_in_place_edit_keeps_one_song_object_per_playlist(manager):
+    song_a = manager.playlists["A"].head.song
+    song_b = manager.playlists["B"].head.song
+    manager.update_songs([(song_a, {"title": "Judul Baru"})])
+    assert manager.playlists["A"].head.song is song_a
+    assert manager.playlists["B"].head.song is song_b
+    assert song_a.title == song_b.title == "Judul Baru"
+    assert (song_a.playlist, song_b.playlist) == ("A", "B")
+    assert [record[0] for record in manager.history.state.playlists.get("B")] == ["Judul Baru", "Lain B"]
+
+
+def test_move_into_playlist_that_already_has_the_song(manager):
+    song_a = manager.playlists["A"].head.song
+    song_b = manager.playlists["B"].head.song
+    manager.update_songs([(song_a, {"playlist": "B", "artist": "Artis Baru"})])
+    assert [song.file_path for song in manager.playlists["A"]] == ["/musik/A.mp3"]
+    assert [song.file_path for song in manager.playlists["B"]] == ["/musik/lagu.mp3", "/musik/B.mp3"]
+    assert manager.playlists["B"].head.song is song_b and song_b.artist == "Artis Baru"
+    assert manager.search_index.search("artis baru")[0] is song_b
+
+
+def test_queued_copy_is_updated(manager):
+    queued = Song("Lagu", "Artis", "Album", "3:00", "/musik/lagu.mp3", playlist="Lain")
+    manager.playback_queue.enqueue(queued)
+    manager.update_songs([(manager.playlists["A"].head.song, {"album": "Album Baru"})])
+    assert queued.album == "Album Baru"
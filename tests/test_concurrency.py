@@ -0,0 +1,124 @@
+import random
+import threading
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import LibraryStorage, PlaylistManager, PlaylistStore, Song
+
+NAMES = ["A", "B", "C", "D", "E"]
+SONGS_PER_PLAYLIST = 40
+
+
+def make_storage(tmp_path):
+    return LibraryStorage(str(tmp_path / "library"), str(tmp_path / "legacy.json"))
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Library di disk dengan beberapa playlist; sebagian lagu ada di lebih dari satu playlist"""
+    manager = PlaylistManager(storage=make_storage(tmp_path))
+    for index, name in enumerate(NAMES):
+        manager.create_playlist(name)
+        for k in range(SONGS_PER_PLAYLIST):
+            number = index * SONGS_PER_PLAYLIST + k if k % 4 else k
+            manager.add_song(Song(f"Lagu {number}", f"Artis {number % 7}", "Album", "3:00",
+                                  f"/musik/{number}.mp3", playlist=name), name)
+    manager.save()
+    return make_storage(tmp_path)
+
+
+def reload(storage, playlists_in_memory=2):
+    manager = PlaylistManager(storage=storage,
+                              max_bytes=playlists_in_memory * SONGS_PER_PLAYLIST * PlaylistStore.BYTES_PER_SONG)
+    manager.load()
+    return manager
+
+
+def test_switching_loads_playlist_for_readers(storage):
+    manager = reload(storage)
+    assert not manager.playlists.is_loaded("B")
+    manager.current_playlist = "B"
+    assert manager.playlists.is_loaded("B")
+    assert len(list(manager.get_sorted_playlist_songs())) == SONGS_PER_PLAYLIST
+    assert len(manager.get_current_playlist_songs()) == SONGS_PER_PLAYLIST
+    assert manager.fuzzy_search("lagu 3")
+
+
+def test_unloaded_playlists_can_be_read_without_lock_upgrade(storage):
+    manager = reload(storage, playlists_in_memory=1)
+    with manager.reading(["C"]):
+        assert len(list(manager.get_playlist_view("C"))) == SONGS_PER_PLAYLIST
+    assert len(manager.get_playlist_view("D")) == SONGS_PER_PLAYLIST
+
+
+def check_playlist(playlist):
+    node, previous, paths = playlist.head, None, []
+    while node:
+        assert node.prev is previous
+        paths.append(node.song.file_path)
+        previous, node = node, node.next
+    assert playlist.tail is previous and playlist.length == len(paths)
+    assert +playlist.members == Counter(paths)
+    return paths
+
+
+def test_switching_and_searching_from_many_threads(storage):
+    manager = reload(storage)
+    errors = []
+    added = Counter()
+    added_lock = threading.Lock()
+    start = threading.Barrier(8)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        start.wait()
+        try:
+            for step in range(150):
+                action = rng.random()
+                name = rng.choice(NAMES)
+                if action < 0.2:
+                    manager.current_playlist = name
+                elif action < 0.4:
+                    songs = list(manager.get_sorted_playlist_songs())
+                    assert songs == sorted(songs, key=lambda song: song.title.lower())
+                elif action < 0.55:
+                    for song in manager.fuzzy_search(f"lagu {rng.randint(0, 199)}"):
+                        assert song.file_path in manager.song_stats
+                elif action < 0.75:
+                    with manager.reading([name]):
+                        view = manager.get_playlist_view(name)
+                        assert len(list(view)) == len(view)
+                elif action < 0.85:
+                    assert len(manager.get_similar_songs(Song("", "", "", "", "/musik/1.mp3"), 3)) <= 3
+                elif action < 0.95:
+                    path = f"/musik/baru-{seed}-{step}.mp3"
+                    manager.add_song(Song(f"Baru {seed} {step}", "Artis", "Album", "3:00", path, playlist=name), name)
+                    with added_lock:
+                        added[name] += 1
+                else:
+                    with manager.lock.write():
+                        playlist = manager.playlists[name]
+                        manager.move_song(rng.randrange(len(playlist)), rng.randrange(len(playlist)), name)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=120)
+    assert not any(thread.is_alive() for thread in threads)
+    assert errors == []
+
+    for name in NAMES:
+        paths = check_playlist(manager.playlists[name])
+        assert len(paths) == SONGS_PER_PLAYLIST + added[name]
+        assert manager.playlists.summary(name)[0] == len(paths)
+        assert all(path in manager.song_stats for path in paths)
+    manager.save()
+    reloaded = reload(storage)
+    for name in NAMES:
+        assert [song.file_path for song in reloaded.playlists[name]] == \
+               [song.file_path for song in manager.playlists[name]]
@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import ExternalSorter, LibraryStorage, PlaylistManager, PlaylistView, Song
+
+
+@pytest.fixture
+def sorter(tmp_path):
+    # Chunk kecil dan anggaran memori dua chunk memaksa sebagian run ditulis ke disk
+    sorter = ExternalSorter(workers=2, chunk_size=100, memory_budget=200 * ExternalSorter.BYTES_PER_ITEM,
+                            threshold=0, temp_dir=str(tmp_path))
+    yield sorter
+    sorter.close()
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_matches_sorted_and_cleans_up(sorter, tmp_path, reverse):
+    rng = random.Random(46)
+    items = [(rng.randint(0, 20), position, f"lagu-{position}") for position in range(1234)]
+    expected = [item[2] for item in sorted(items, reverse=reverse)]
+    assert list(sorter.sort(iter(items), reverse)) == expected
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_single_chunk_skips_pool(sorter):
+    assert list(sorter.sort([(2, 0, "b"), (1, 1, "a")])) == ["a", "b"]
+    assert sorter.pool is None
+
+
+def test_sorted_view_matches_in_memory_merge_sort(sorter, tmp_path):
+    manager = PlaylistManager(storage=LibraryStorage(str(tmp_path / "library"), str(tmp_path / "legacy.json")))
+    rng = random.Random(7)
+    for k in range(450):
+        artist = f"Artis {rng.randint(0, 5)}"  # Banyak kunci kembar
+        manager.add_song(Song(f"Lagu {k}", artist, "Album", "3:00", f"/musik/{k}.mp3"))
+    playlist = manager.playlists[manager.current_playlist]
+    for order in ("ascending", "descending"):
+        key = lambda song: manager._get_song_value(song, "artist")
+        reverse = order == "descending"
+        external = list(PlaylistView(playlist, sorter=sorter).sorted(key, reverse))
+        in_memory = list(PlaylistView(playlist).sorted(key, reverse))
+        assert external == in_memory == manager._merge_sort_final(list(playlist), "artist", order)
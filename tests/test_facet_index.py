@@ -0,0 +1,63 @@
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import FacetIndex, LibraryStorage, PlaylistManager, Song
+
+
+def song(k, artist, album, playlist="A"):
+    return Song(f"Lagu {k}", artist, album, "3:00", f"/musik/{k}.mp3", playlist=playlist)
+
+
+def snapshot(facets):
+    return facets.entries, facets.artists, facets.artist_counts, facets.albums
+
+
+def assert_matches_rebuild(manager, name):
+    fresh = FacetIndex(manager.playlists[name])
+    assert snapshot(manager.get_facets(name)) == snapshot(fresh)
+
+
+def test_add_reindex_and_remove():
+    facets = FacetIndex([song(0, "Raisa", "Heart"), song(1, "Raisa", "Heart"), song(2, "Tulus", "Gajah")])
+    assert facets.artist_list() == [("Raisa", 2), ("Tulus", 1)]
+    assert facets.album_list("Raisa") == [("Heart", 2)]
+    assert facets.members("Raisa") == {"/musik/0.mp3", "/musik/1.mp3"}
+
+    moved = song(1, "Tulus", "Monokrom")  # Metadata berubah: entri lama dipindah
+    facets.add(moved)
+    assert facets.artist_list() == [("Raisa", 1), ("Tulus", 2)]
+    assert facets.members("Tulus", "Monokrom") == {"/musik/1.mp3"}
+    assert facets.members(album="Gajah") == {"/musik/2.mp3"}
+
+    facets.remove_path("/musik/0.mp3")
+    facets.remove_path("/musik/0.mp3")  # Dua kali tidak apa-apa
+    assert "Raisa" not in facets.artists and "Heart" not in facets.albums
+    assert facets.members("Raisa") == set()
+
+
+def test_manager_keeps_facets_in_sync(tmp_path):
+    manager = PlaylistManager(storage=LibraryStorage(str(tmp_path / "library"), str(tmp_path / "legacy.json")))
+    manager.create_playlist("A")
+    manager.create_playlist("B")
+    for k in range(6):
+        manager.add_song(song(k, f"Artis {k % 2}", f"Album {k % 3}"), "A")
+    manager.add_song(song(10, "Artis 9", "Album 9", playlist="B"), "B")
+    manager.get_facets("A")
+    manager.get_facets("B")
+
+    manager.add_song(song(6, "Artis 2", "Album 0"), "A")
+    assert_matches_rebuild(manager, "A")
+
+    first, second = manager.playlists["A"].head.song, manager.playlists["A"].head.next.song
+    manager.update_songs([(first, {"artist": "Artis Baru"}), (second, {"playlist": "B", "album": "Album B"})])
+    assert_matches_rebuild(manager, "A")
+    assert manager.get_facets("A").members("Artis Baru") == {first.file_path}
+    assert second.file_path not in manager.get_facets("A").entries
+    assert_matches_rebuild(manager, "B")
+
+    manager.delete_songs([manager.playlists["A"].tail.song])
+    assert_matches_rebuild(manager, "A")
+
+    manager.merge_playlist("B", "A")
+    assert_matches_rebuild(manager, "A")
+    assert "B" not in manager.facets
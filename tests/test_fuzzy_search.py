@@ -0,0 +1,61 @@
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import FuzzySearchIndex, Song
+
+
+def make_song(title, artist, album="Album", path=None):
+    return Song(title, artist, album, "3:00", path or f"/musik/{title}.mp3")
+
+
+@pytest.fixture
+def index():
+    index = FuzzySearchIndex()
+    index.rebuild([
+        make_song("Bohemian Rhapsody", "Queen"),
+        make_song("Don't Stop Me Now", "Queen"),
+        make_song("Yellow", "Coldplay"),
+        make_song("Fix You", "Coldplay"),
+        make_song("Rolling in the Deep", "Adele"),
+    ])
+    return index
+
+
+def test_exact_and_prefix_queries(index):
+    assert index.search("yellow")[0].title == "Yellow"
+    assert index.search("bohem")[0].title == "Bohemian Rhapsody"
+    assert index.search("") == []
+
+
+def test_typos_are_tolerated(index):
+    assert index.search("bohemain rapsody")[0].title == "Bohemian Rhapsody"
+    assert index.search("coldpaly")[0].artist == "Coldplay"
+    assert index.search("zzzzqqq") == []
+
+
+def test_title_outranks_artist(index):
+    index.add(make_song("Queen of Hearts", "Someone"))
+    assert index.search("queen")[0].title == "Queen of Hearts"
+
+
+def test_add_remove_and_allowed_paths(index):
+    index.search("warmup")  # Memaksa indeks dibangun, selanjutnya inkremental
+    song = make_song("Hello", "Adele")
+    index.add(song)
+    assert index.search("helo")[0] is song
+    song.title = "Someone Like You"
+    index.add(song)  # Mengindeks ulang setelah metadata diedit
+    assert all(result.title != "Hello" for result in index.search("hello"))
+    assert index.search("someone like")[0] is song
+    assert index.search("someone like", allowed_paths=set()) == []
+    index.remove(song)
+    assert index.search("someone like") == []
+    assert index.search("adele", limit=1)[0].title == "Rolling in the Deep"
+
+
+def test_remove_path_while_pending():
+    index = FuzzySearchIndex()
+    songs = [make_song("Yellow", "Coldplay"), make_song("Fix You", "Coldplay")]
+    index.rebuild(songs)
+    index.remove_path(songs[0].file_path)  # Dihapus sebelum indeks dibangun
+    assert [song.title for song in index.search("coldplay")] == ["Fix You"]
@@ -0,0 +1,71 @@
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import LibraryStorage, PlaylistManager, Song
+
+
+def make_song(title, name):
+    return Song(title, "Artis", "Album", "3:00", f"/musik/{title}.mp3", playlist=name)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = PlaylistManager(storage=LibraryStorage(str(tmp_path / "library"), str(tmp_path / "legacy.json")))
+    manager.create_playlist("A")
+    manager.create_playlist("B")
+    for name in ("A", "B"):
+        for k in range(3):
+            manager.add_song(make_song(f"{name}{k}", name), name)
+    manager.save()
+    return manager
+
+
+def titles(playlist):
+    return [song.title for song in playlist]
+
+
+def test_undo_rebuilds_only_changed_playlist(manager):
+    a, b = manager.playlists["A"], manager.playlists["B"]
+    b_songs = list(b)
+    b_version = b.version
+    manager.delete_song(a.head.song)
+    manager.undo()
+    assert manager.playlists["A"] is a and titles(a) == ["A0", "A1", "A2"]
+    assert manager.playlists["B"] is b and b.version == b_version
+    assert list(b) == b_songs and not manager.playlists.is_dirty("B")
+
+
+def test_undo_keeps_song_objects_and_views(manager):
+    a = manager.playlists["A"]
+    song = a.node_at(1).song
+    view = manager.get_playlist_view("A")
+    manager.update_songs([(song, {"title": "Baru"})])
+    manager.move_song(1, 0, "A")
+    manager.undo()
+    assert titles(view) == ["A0", "Baru", "A2"] and view[1] is song
+    manager.undo()
+    assert song.title == "A1" and a.node_at(1).song is song
+    assert manager.search_index.search("A1")[0] is song
+    manager.redo()
+    assert song.title == "Baru"
+
+
+def test_undo_move_between_playlists_reuses_song(manager):
+    song = manager.playlists["A"].head.song
+    manager.move_songs([song], "B")
+    assert song.file_path in manager.playlists["B"].members
+    manager.undo()
+    assert manager.playlists["A"].head.song is song and song.playlist == "A"
+    assert titles(manager.playlists["B"]) == ["B0", "B1", "B2"]
+
+
+def test_undo_add_removes_song_from_index_and_queue(manager):
+    song = make_song("Tambahan", "B")
+    manager.add_song(song, "B")
+    manager.playback_queue.enqueue(song)
+    manager.undo()
+    assert titles(manager.playlists["B"]) == ["B0", "B1", "B2"]
+    assert song not in manager.playback_queue
+    assert not manager.search_index.search("Tambahan")
+    manager.redo()
+    assert titles(manager.playlists["B"])[-1] == "Tambahan"
@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import PlaylistLinkedList, Song
+
+
+def make_song(title):
+    return Song(str(title), "Artis", "Album", "1:00", f"/musik/{title}.mp3")
+
+
+def make_list(titles):
+    playlist = PlaylistLinkedList()
+    for title in titles:
+        playlist.append(make_song(title))
+    return playlist
+
+
+def titles(playlist):
+    return [song.title for song in playlist]
+
+
+def check_index(playlist):
+    """Treap posisi harus sama dengan urutan linked list"""
+    expected = titles(playlist)
+    assert [playlist[i].title for i in range(len(playlist))] == expected
+    node, index = playlist.head, 0
+    while node:
+        assert playlist.index_of(node) == index
+        node, index = node.next, index + 1
+    return expected
+
+
+def test_positional_access():
+    playlist = make_list(range(1000))
+    assert not playlist.indexed  # Treap baru dibangun saat posisi dibutuhkan
+    assert playlist[0].title == "0" and playlist[999].title == "999" and playlist[-1].title == "999"
+    assert playlist.indexed
+    assert playlist.index_of(playlist.tail) == 999
+    with pytest.raises(IndexError):
+        playlist[1000]
+    playlist.append(make_song("baru"))
+    assert playlist[1000].title == "baru"
+
+
+def test_move_by_node():
+    playlist = make_list("abcde")
+    assert playlist.move(playlist.node_at(0), 3) == 0
+    assert check_index(playlist) == list("bcdae")
+    assert playlist.move(playlist.tail, 0) == 4
+    assert check_index(playlist) == list("ebcda")
+
+
+def test_random_operations_match_list():
+    rng = random.Random(7)
+    reference = [str(k) for k in range(200)]
+    playlist = make_list(reference)
+    playlist[0]
+    for step in range(1500):
+        op = rng.randrange(5)
+        if op == 0:
+            reference.append(f"n{step}")
+            playlist.append(make_song(f"n{step}"))
+        elif op == 1 and reference:
+            index = rng.randrange(len(reference))
+            reference.pop(index)
+            assert playlist.remove_index(playlist[index]) == index
+        elif op == 2 and reference:
+            old, new = rng.randrange(len(reference)), rng.randrange(len(reference))
+            reference.insert(new, reference.pop(old))
+            assert playlist.move(playlist.node_at(old), new) == old
+        elif op == 3 and len(reference) > 2:
+            # Pindah blok di dalam list lewat splice
+            first = rng.randrange(len(reference) - 1)
+            last = rng.randrange(first, len(reference) - 1)
+            block = reference[first:last + 1]
+            rest = reference[:first] + reference[last + 1:]
+            at = rng.randrange(len(rest) + 1)
+            if at == len(rest):
+                ref = None
+            else:
+                ref = playlist.node_at(at if at < first else at + len(block))
+            playlist.splice(playlist.node_at(first), playlist.node_at(last), ref=ref)
+            reference = rest[:at] + block + rest[at:]
+        elif reference:
+            start = rng.randrange(len(reference))
+            assert playlist[start].title == reference[start]
+        assert len(playlist) == len(reference)
+    assert check_index(playlist) == reference
+
+
+def test_split_and_concat_keep_index():
+    a, b = make_list("abcdef"), make_list("xyz")
+    a[0], b[0]
+    rest = a.split(a.node_at(4))
+    assert check_index(a) == list("abcd") and check_index(rest) == list("ef")
+    a.concat(b)
+    assert check_index(a) == list("abcdxyz") and len(b) == 0
+    unindexed = make_list("uv")
+    a.concat(unindexed)
+    assert check_index(a) == list("abcdxyzuv")
+    a.splice(a.node_at(1), a.node_at(2), target=rest, ref=rest.node_at(1))
+    assert check_index(a) == list("adxyzuv") and check_index(rest) == list("ebcf")
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import LibraryMerger, LibraryStorage, PlaylistManager, merge_libraries
+
+
+def song(path, title=None, play_count=0, last_played=None):
+    return {"title": title or path, "artist": "Artis", "album": "Album", "duration": "3:00",
+            "file_path": path, "play_count": play_count, "last_played": last_played}
+
+
+def write_library(path, playlists, stats=None, favorites=(), current="Default"):
+    data = {"playlists": playlists, "favorites": list(favorites), "song_stats": stats or {},
+            "current_playlist": current, "queue": {}}
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+@pytest.fixture
+def sources(tmp_path):
+    first = write_library(tmp_path / "a.json", {
+        "Default": [song("/m/1.mp3", "Satu"), song("/m/2.mp3")],
+        "Santai": [song("/m/3.mp3"), song("/m/4.mp3")],
+    }, stats={"/m/1.mp3": {"play_count": 5, "last_played": 100}, "/m/3.mp3": {"play_count": 1, "last_played": 50}},
+        favorites=["/m/1.mp3"], current="Santai")
+    second = write_library(tmp_path / "b.json", {
+        "Default": [song("/m/3.mp3"), song("/m/5.mp3")],
+        "Santai": [song("/m/4.mp3"), song("/m/1.mp3", "Judul Lain")],
+    }, stats={"/m/1.mp3": {"play_count": 3, "last_played": 200}}, favorites=["/m/5.mp3"])
+    return [first, second]
+
+
+def paths(songs):
+    return [entry["file_path"] for entry in songs]
+
+
+def test_merge_to_legacy_file(tmp_path, sources):
+    output = str(tmp_path / "hasil.json")
+    summary = merge_libraries(sources, output)
+    merged = json.loads(open(output).read())
+
+    assert summary["playlists"] == 2 and summary["unique_songs"] == 5 and summary["favorites"] == 2
+    assert list(merged["playlists"]) == ["Default", "Santai"]
+    # /m/1.mp3 dan /m/3.mp3 sudah ada di Santai di salah satu sumber, jadi tidak diduplikasi di Default
+    assert paths(merged["playlists"]["Default"]) == ["/m/2.mp3", "/m/5.mp3"]
+    assert paths(merged["playlists"]["Santai"]) == ["/m/3.mp3", "/m/4.mp3", "/m/1.mp3"]
+    first = merged["playlists"]["Santai"][2]
+    assert first["title"] == "Satu"  # Metadata dari sumber paling awal
+    assert merged["song_stats"]["/m/1.mp3"] == {"play_count": 5, "last_played": 200}
+    assert sorted(merged["favorites"]) == ["/m/1.mp3", "/m/5.mp3"]
+    assert merged["current_playlist"] == "Santai"
+
+
+def test_sum_play_counts_and_partitioning_give_same_result(tmp_path, sources):
+    single = str(tmp_path / "satu.json")
+    merge_libraries(sources, single, play_counts="sum")
+    many = str(tmp_path / "banyak.json")
+    summary = merge_libraries(sources, many, play_counts="sum", memory_budget=64)
+    assert summary["partitions"] > 1
+    expected, actual = json.loads(open(single).read()), json.loads(open(many).read())
+    assert expected["song_stats"]["/m/1.mp3"]["play_count"] == 8
+    assert actual["playlists"] == expected["playlists"]
+    assert actual["song_stats"] == expected["song_stats"]
+    assert sorted(actual["favorites"]) == sorted(expected["favorites"])
+
+
+def test_merge_to_directory_loads_as_library(tmp_path, sources):
+    output = str(tmp_path / "gabungan")
+    merge_libraries(sources, output)
+    manager = PlaylistManager(storage=LibraryStorage(output, str(tmp_path / "tidak_ada.json")))
+    manager.load()
+    assert [song.file_path for song in manager.get_playlist_view("Santai")] == ["/m/3.mp3", "/m/4.mp3", "/m/1.mp3"]
+    assert manager.song_stats["/m/1.mp3"]["play_count"] == 5
+
+    with pytest.raises(ValueError):
+        merge_libraries(sources, output)  # Tidak menimpa library yang sudah ada
+
+
+def test_match_by_content(tmp_path):
+    audio = tmp_path / "asli.mp3"
+    copy = tmp_path / "salinan.mp3"
+    audio.write_bytes(b"ID3" + bytes(range(256)) * 10)
+    copy.write_bytes(audio.read_bytes())
+    first = write_library(tmp_path / "a.json", {"Default": [song(str(audio))]},
+                          stats={str(audio): {"play_count": 2, "last_played": 10}})
+    second = write_library(tmp_path / "b.json", {"Default": [song(str(copy))]},
+                           stats={str(copy): {"play_count": 4, "last_played": 20}})
+    output = str(tmp_path / "hasil.json")
+    merge_libraries([first, second], output, play_counts="sum", match="content")
+    merged = json.loads(open(output).read())
+    assert paths(merged["playlists"]["Default"]) == [str(audio)]
+    assert merged["song_stats"] == {str(audio): {"play_count": 6, "last_played": 20}}
+
+
+def test_invalid_options():
+    with pytest.raises(ValueError):
+        LibraryMerger([], play_counts="avg")
+    with pytest.raises(ValueError):
+        LibraryMerger([], match="title")
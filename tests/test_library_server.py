@@ -0,0 +1,132 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import LibraryServer, LibraryStorage, PlaylistManager, Song
+
+AUDIO = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def server(tmp_path):
+    manager = PlaylistManager(storage=LibraryStorage(str(tmp_path / "library"), str(tmp_path / "legacy.json")))
+    manager.create_playlist("Santai")
+    for k in range(5):
+        path = tmp_path / f"lagu{k}.mp3"
+        path.write_bytes(AUDIO)
+        manager.add_song(Song(f"Lagu {k}", "Artis", "Album", "3:00", str(path), playlist="Santai"), "Santai")
+    server = LibraryServer(manager, port=0)
+    server.start_in_thread()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(server):
+    connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+    yield connection
+    connection.close()
+
+
+def get(client, path, **headers):
+    client.request("GET", path, headers=headers)
+    response = client.getresponse()
+    return response, response.read()
+
+
+def test_json_endpoints_and_paging(client):
+    response, body = get(client, "/api/playlists")
+    assert response.status == 200
+    assert response.getheader("Content-Type").startswith("application/json")
+    playlists = {entry["name"]: entry for entry in json.loads(body)["playlists"]}
+    assert playlists["Santai"]["songs"] == 5
+
+    titles, token = [], None
+    while True:
+        path = "/api/playlists/Santai?size=2&sort=title&order=descending"
+        response, body = get(client, path + (f"&cursor={token}" if token else ""))
+        page = json.loads(body)
+        titles.extend(song["title"] for song in page["songs"])
+        token = page["next"]
+        if token is None:
+            break
+    assert titles == [f"Lagu {k}" for k in reversed(range(5))]
+
+    response, body = get(client, "/api/search?q=lagu%203&playlist=Santai")
+    assert json.loads(body)["songs"][0]["title"] == "Lagu 3"
+    response, _ = get(client, "/api/playlists/TidakAda")
+    assert response.status == 404
+    response, _ = get(client, "/api/playlists/Santai?sort=bukan")
+    assert response.status == 400
+
+
+def test_json_etag_not_modified(client):
+    response, _ = get(client, "/api/playlists")
+    etag = response.getheader("ETag")
+    response, body = get(client, "/api/playlists", **{"If-None-Match": etag})
+    assert response.status == 304 and body == b""
+
+
+def test_stream_range_etag_and_unsatisfiable(client):
+    _, body = get(client, "/api/playlists/Santai?size=1")
+    stream = json.loads(body)["songs"][0]["stream"]
+
+    response, body = get(client, stream)
+    assert response.status == 200 and body == AUDIO
+    assert response.getheader("Accept-Ranges") == "bytes"
+    etag = response.getheader("ETag")
+
+    response, body = get(client, stream, Range="bytes=100-199")
+    assert response.status == 206
+    assert response.getheader("Content-Range") == f"bytes 100-199/{len(AUDIO)}"
+    assert body == AUDIO[100:200]
+
+    response, body = get(client, stream, Range="bytes=-10")
+    assert response.status == 206 and body == AUDIO[-10:]
+
+    response, body = get(client, stream, Range="bytes=100-199", **{"If-Range": '"lama"'})
+    assert response.status == 200 and body == AUDIO
+
+    response, body = get(client, stream, **{"If-None-Match": etag})
+    assert response.status == 304 and body == b""
+
+    response, body = get(client, stream, Range=f"bytes={len(AUDIO)}-")
+    assert response.status == 416
+    assert response.getheader("Content-Range") == f"bytes */{len(AUDIO)}"
+
+    response, _ = get(client, "/stream/0000000000000000")
+    assert response.status == 404
+
+
+def test_handler_error_answers_500_and_server_keeps_running(server, client, monkeypatch):
+    def broken():
+        raise RuntimeError("rusak")
+    monkeypatch.setattr(server, "_playlists_json", broken)
+    response, body = get(client, "/api/playlists")
+    assert response.status == 500
+    assert "error" in json.loads(body)
+
+    monkeypatch.undo()
+    connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+    try:
+        response, _ = get(connection, "/api/playlists")
+        assert response.status == 200
+    finally:
+        connection.close()
+
+
+def test_manager_calls_run_off_the_event_loop(server, client, monkeypatch):
+    threads = []
+    original = server._playlists_json
+
+    def recording():
+        threads.append(threading.current_thread())
+        return original()
+    monkeypatch.setattr(server, "_playlists_json", recording)
+    response, _ = get(client, "/api/playlists")
+    assert response.status == 200
+    assert threads and threads[0] is not server.thread
+    assert server.host == "127.0.0.1"
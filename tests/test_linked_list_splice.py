@@ -0,0 +1,93 @@
+import random
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import PlaylistLinkedList, Song
+
+
+def make_list(titles):
+    playlist = PlaylistLinkedList()
+    for title in titles:
+        playlist.append(Song(title, "Artis", "Album", "1:00", f"/musik/{title}"))
+    return playlist
+
+
+def nodes(playlist):
+    node, result = playlist.head, []
+    while node:
+        result.append(node)
+        node = node.next
+    return result
+
+
+def check(playlist):
+    """Memeriksa pointer prev/next, tail, length dan members; mengembalikan judul"""
+    titles, previous = [], None
+    for node in nodes(playlist):
+        assert node.prev is previous
+        titles.append(node.song.title)
+        previous = node
+    assert playlist.tail is previous
+    assert playlist.length == len(titles)
+    assert +playlist.members == Counter(f"/musik/{title}" for title in titles)
+    return "".join(titles)
+
+
+def test_splice_between_lists_and_within_list():
+    a, b = make_list("abcdef"), make_list("xyz")
+    a_nodes = nodes(a)
+    assert a.splice(a_nodes[1], a_nodes[3], b, b.head.next) == 3
+    assert (check(a), check(b)) == ("aef", "xbcdyz")
+    a.splice(a_nodes[4], a_nodes[5], None, a.head)
+    assert check(a) == "efa"
+    a.splice(a.head, a.head, None, None)
+    assert check(a) == "fae"
+
+
+def test_splice_rejects_invalid_ranges():
+    a = make_list("abc")
+    with pytest.raises(ValueError):
+        a.splice(a.head, a.tail, None, a.head.next)
+    with pytest.raises(ValueError):
+        a.splice(a.tail, a.head)
+
+
+def test_concat_and_split():
+    a, b = make_list("abc"), make_list("de")
+    assert a.concat(b) == 2
+    assert (check(a), check(b)) == ("abcde", "")
+    assert Song("d", "", "", "", "/musik/d") in a
+    assert a.concat(a) == 0
+    rest = a.split(a.head.next.next)
+    assert (check(a), check(rest)) == ("ab", "cde")
+    empty = PlaylistLinkedList()
+    empty.concat(rest)
+    assert (check(empty), check(rest)) == ("cde", "")
+    assert check(a.split(None)) == "" and check(a) == "ab"
+
+
+def test_random_splices_keep_lists_consistent():
+    rng = random.Random(44)
+    for _ in range(500):
+        lists = [make_list(str(rng.randint(0, 9)) for _ in range(rng.randint(0, 8))) for _ in range(2)]
+        source, target = rng.sample(lists, 2) if rng.random() < 0.7 else (lists[0], lists[0])
+        source_nodes = nodes(source)
+        if not source_nodes:
+            continue
+        i = rng.randrange(len(source_nodes))
+        j = rng.randrange(i, len(source_nodes))
+        moved = source_nodes[i:j + 1]
+        candidates = [None] + [node for node in nodes(target) if node not in moved]
+        ref = rng.choice(candidates)
+        expected_source = [node for node in source_nodes if node not in moved]
+        expected_target = [node for node in nodes(target) if node not in moved]
+        position = len(expected_target) if ref is None else expected_target.index(ref)
+        expected_target[position:position] = moved
+        source.splice(moved[0], moved[-1], target, ref)
+        check(source)
+        check(target)
+        assert nodes(target) == expected_target
+        if target is not source:
+            assert nodes(source) == expected_source
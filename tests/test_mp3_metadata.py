@@ -0,0 +1,82 @@
+import struct
+
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import parse_mpeg_frame_header, read_mp3_art, read_mp3_metadata
+
+# MPEG1 Layer III, 128 kbps, 44.1 kHz, tanpa padding, stereo -> 417 byte per frame
+FRAME_HEADER = b"\xff\xfb\x90\x00"
+FRAME_LENGTH = 417
+
+
+def synchsafe(value):
+    return bytes((value >> shift) & 0x7F for shift in (21, 14, 7, 0))
+
+
+def id3_frame(frame_id, payload, version):
+    size = synchsafe(len(payload)) if version == 4 else struct.pack(">I", len(payload))
+    return frame_id.encode("latin-1") + size + b"\x00\x00" + payload
+
+
+def id3_tag(frames, version, padding=64):
+    body = b"".join(frames) + b"\x00" * padding
+    return b"ID3" + bytes((version, 0, 0)) + synchsafe(len(body)) + body
+
+
+def audio(frames, xing_frames=None):
+    data = bytearray()
+    for i in range(frames):
+        frame = bytearray(FRAME_HEADER + b"\x00" * (FRAME_LENGTH - 4))
+        if i == 0 and xing_frames is not None:
+            # Stereo MPEG1: tag Info setelah header 4 byte + side info 32 byte
+            frame[36:48] = b"Info" + struct.pack(">II", 1, xing_frames)
+        data += frame
+    return bytes(data)
+
+
+def test_frame_header():
+    frame_length, samples, sample_rate, bitrate, info = parse_mpeg_frame_header(FRAME_HEADER)
+    assert (frame_length, samples, sample_rate, bitrate) == (417, 1152, 44100, 128)
+    assert info == {"mpeg1": True, "layer": 3, "mono": False}
+    # Padding menambah satu byte; MPEG2 Layer III memakai 576 sampel per frame
+    assert parse_mpeg_frame_header(b"\xff\xfb\x92\x00")[0] == 418
+    assert parse_mpeg_frame_header(b"\xff\xf3\x90\x00")[1:3] == (576, 22050)
+
+
+@pytest.mark.parametrize("header", [b"\xff\xfb\xf0\x00", b"\xff\xfb\x9c\x00", b"\xff\xeb\x90\x00", b"\x00\xfb\x90\x00", b"\xff"])
+def test_invalid_frame_headers(header):
+    assert parse_mpeg_frame_header(header) is None
+
+
+@pytest.mark.parametrize("version", [3, 4])
+def test_tags_duration_and_cover(tmp_path, version):
+    cover = b"\xff\xd8\xff" + bytes(range(256)) * 4
+    frames = [
+        id3_frame("TIT2", b"\x03" + "Judul Ü".encode("utf-8") if version == 4 else b"\x01" + "Judul Ü".encode("utf-16"), version),
+        id3_frame("TPE1", b"\x00Artis", version),
+        id3_frame("APIC", b"\x00image/jpeg\x00\x03desc\x00" + cover, version),
+    ]
+    path = tmp_path / "lagu.mp3"
+    # 383 frame CBR ~ 10 detik
+    path.write_bytes(id3_tag(frames, version) + audio(383) + b"TAG" + b"\x00" * 125)
+    metadata = read_mp3_metadata(str(path))
+    assert metadata["title"] == "Judul Ü"
+    assert metadata["artist"] == "Artis"
+    assert metadata["album"] is None
+    assert metadata["duration"] == pytest.approx(383 * 1152 / 44100, rel=0.01)
+    assert metadata["art_mime"] == "image/jpeg"
+    assert read_mp3_art(str(path), metadata) == cover
+
+
+def test_xing_frame_count_wins_over_file_size(tmp_path):
+    path = tmp_path / "vbr.mp3"
+    path.write_bytes(audio(10, xing_frames=1000))
+    assert read_mp3_metadata(str(path))["duration"] == pytest.approx(1000 * 1152 / 44100)
+
+
+def test_not_an_mp3(tmp_path):
+    path = tmp_path / "bukan.mp3"
+    path.write_bytes(b"bukan audio" * 100)
+    assert read_mp3_metadata(str(path)) is None
+    assert read_mp3_metadata(str(tmp_path / "tidak_ada.mp3")) is None
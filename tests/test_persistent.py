@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import LibraryHistory, LibraryState, PersistentMap, PersistentSequence
+
+
+def test_sequence_versions_are_independent():
+    rng = random.Random(11)
+    versions = [(PersistentSequence(), [])]
+    for step in range(500):
+        sequence, reference = versions[rng.randrange(len(versions))]
+        reference = list(reference)
+        op = rng.randrange(3)
+        if op == 0 or not reference:
+            index = rng.randint(0, len(reference))
+            sequence = sequence.insert(index, step)
+            reference.insert(index, step)
+        elif op == 1:
+            index = rng.randrange(len(reference))
+            sequence = sequence.delete(index)
+            del reference[index]
+        else:
+            index = rng.randrange(len(reference))
+            sequence = sequence.set(index, -step)
+            reference[index] = -step
+        versions.append((sequence, reference))
+    # Setiap versi lama tetap utuh setelah versi turunannya berubah
+    for sequence, reference in versions:
+        assert list(sequence) == reference
+        assert len(sequence) == len(reference)
+
+
+def test_map_set_get_delete_keep_old_versions():
+    empty = PersistentMap()
+    first = PersistentMap.from_items((f"k{i}", i) for i in range(100))
+    second = first.set("k5", "baru").delete("k7")
+    assert first.get("k5") == 5 and "k7" in first and len(first) == 100
+    assert second.get("k5") == "baru" and "k7" not in second and len(second) == 99
+    assert list(second.keys()) == sorted(second.keys())
+    assert empty.get("k1") is None and len(empty) == 0
+
+
+def test_history_undo_redo():
+    history = LibraryHistory(max_steps=2)
+    base = LibraryState()
+    history.reset(base)
+    one = base.replace(current_playlist="A")
+    two = one.replace(current_playlist="B")
+    three = two.replace(current_playlist="C")
+    history.commit("satu", one)
+    history.commit("dua", two)
+    history.commit("tiga", three)
+    assert history.undo() == ("tiga", two)
+    assert history.undo() == ("dua", one)
+    assert history.undo() is None  # Dibatasi max_steps
+    assert history.redo() == ("dua", two)
+    history.commit("empat", two.replace(current_playlist="D"))
+    assert not history.can_redo()
+
+
+def test_tracked_playlist_resolves_in_every_version():
+    history = LibraryHistory()
+    history.reset(LibraryState())
+    history.commit("ubah", history.state.replace(current_playlist="X"))
+    history.track_playlist("Lama", [("a",), ("b",)])
+    assert list(history.sequence(history.state.playlists, "Lama")) == [("a",), ("b",)]
+    history.track_playlist("Lama", [("c",)])  # Hanya muatan pertama yang dicatat
+    _, previous = history.undo()
+    assert list(history.sequence(previous.playlists, "Lama")) == [("a",), ("b",)]
+    assert history.playlist_names(previous.playlists) == ["Lama"]
+    # Playlist baseline yang dihapus tidak kembali dari baseline
+    deleted = history.without(previous.playlists, "Lama")
+    assert history.sequence(deleted, "Lama") is None and history.playlist_names(deleted) == []
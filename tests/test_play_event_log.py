@@ -0,0 +1,83 @@
+import calendar
+import os
+import time
+
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import PlayEventLog, _day_index, _week_index
+
+
+@pytest.fixture
+def berlin_time(monkeypatch):
+    # Aturan POSIX agar tidak bergantung pada tzdata: CET, DST dari Maret sampai Oktober
+    monkeypatch.setenv("TZ", "CET-1CEST,M3.5.0,M10.5.0/3")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def local_day(year, month, day):
+    return calendar.timegm((year, month, day, 0, 0, 0)) // 86400
+
+
+def test_day_index_follows_dst(berlin_time):
+    winter = calendar.timegm((2024, 1, 10, 23, 30, 0))   # 00:30 CET tanggal 11
+    summer = calendar.timegm((2024, 7, 1, 22, 30, 0))    # 00:30 CEST tanggal 2
+    assert _day_index(winter) == local_day(2024, 1, 11)
+    assert _day_index(summer) == local_day(2024, 7, 2)
+
+
+def test_rollups_match_after_reload(tmp_path, berlin_time):
+    log = PlayEventLog(str(tmp_path / "events"))
+    base = calendar.timegm((2024, 3, 30, 12, 0, 0))  # Sabtu, sehari sebelum DST dimulai
+    events = [("a.mp3", base, 60.0), ("b.mp3", base + 3600, 30.0),
+              ("a.mp3", base + 86400, 90.0), ("a.mp3", base + 3 * 86400, 10.0)]
+    for event in events:
+        log.append(*event)
+
+    saturday, sunday, tuesday = local_day(2024, 3, 30), local_day(2024, 3, 31), local_day(2024, 4, 2)
+    assert log.daily == {saturday: [2, 90.0], sunday: [1, 90.0], tuesday: [1, 10.0]}
+    assert _week_index(saturday) == _week_index(sunday) != _week_index(tuesday)
+    assert log.weekly[_week_index(saturday)] == {log.ids["a.mp3"]: 2, log.ids["b.mp3"]: 1}
+
+    reloaded = PlayEventLog(str(tmp_path / "events"))
+    assert reloaded.daily == log.daily
+    assert reloaded.weekly == log.weekly
+    plays, seconds = reloaded.aggregate(base, base + 2 * 86400)
+    assert plays == {"a.mp3": 2, "b.mp3": 1} and seconds == 180.0
+
+
+def test_aggregate_with_out_of_order_timestamps(tmp_path):
+    log = PlayEventLog(str(tmp_path / "events"))
+    for file_path, timestamp in [("a.mp3", 100.0), ("b.mp3", 300.0), ("c.mp3", 200.0), ("d.mp3", 400.0)]:
+        log.append(file_path, timestamp, 1.0)
+    assert not log.ordered
+    plays, seconds = log.aggregate(150, 350)
+    assert plays == {"b.mp3": 1, "c.mp3": 1} and seconds == 2.0
+
+    reloaded = PlayEventLog(str(tmp_path / "events"))
+    assert not reloaded.ordered
+    assert reloaded.aggregate(150, 350)[0] == plays
+
+
+def test_truncated_write_is_recovered(tmp_path):
+    directory = tmp_path / "events"
+    log = PlayEventLog(str(directory))
+    for k in range(3):
+        log.append(f"{k}.mp3", 1000.0 + k, 5.0)
+    # Simulasikan aplikasi tertutup di tengah baris keempat: hanya sebagian kolom tertulis
+    with open(directory / "song_id.bin", "ab") as f:
+        f.write(b"\x00\x00\x00\x00")
+    with open(directory / "timestamp.bin", "ab") as f:
+        f.write(b"\x00\x00\x00")
+
+    reloaded = PlayEventLog(str(directory))
+    assert len(reloaded) == 3
+    for name, column in reloaded.columns.items():
+        assert os.path.getsize(directory / f"{name}.bin") == 3 * column.itemsize
+    reloaded.append("3.mp3", 1003.0, 5.0)
+    again = PlayEventLog(str(directory))
+    assert len(again) == 4
+    assert again.aggregate(1000, 1004) == ({f"{k}.mp3": 1 for k in range(4)}, 20.0)
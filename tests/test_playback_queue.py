@@ -0,0 +1,110 @@
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import PlaybackQueue, PlaylistLinkedList, PlaylistView, Song
+
+
+def make_songs(titles):
+    return [Song(title, "Artis", "Album", "1:00", f"/musik/{title}.mp3") for title in titles]
+
+
+class CountingList(list):
+    """List yang mencatat akses per indeks, untuk memastikan konteks tidak disalin"""
+    def __init__(self, items):
+        super().__init__(items)
+        self.lookups = 0
+
+    def __getitem__(self, index):
+        self.lookups += 1
+        return super().__getitem__(index)
+
+    def __iter__(self):
+        raise AssertionError("konteks tidak boleh disalin")
+
+
+def titles(songs):
+    return [song.title for song in songs]
+
+
+def test_seed_is_lazy_and_wraps():
+    context = CountingList(make_songs("abcd"))
+    queue = PlaybackQueue()
+    assert not queue
+    queue.seed(context, 2)
+    assert queue and len(queue) == 0
+    assert queue.current_song().title == "c" and context.lookups == 1
+    assert titles([queue.advance(), queue.advance(), queue.advance()]) == ["d", "a", "b"]
+    assert titles([queue.back(), queue.back()]) == ["a", "d"]
+    assert context.lookups == 6
+
+
+def test_explicit_items_play_before_context():
+    a, b, c, d = make_songs("abcd")
+    x, y, z = make_songs("xyz")
+    queue = PlaybackQueue()
+    queue.seed([a, b, c, d], 0)
+    queue.enqueue(x)
+    queue.enqueue(y)
+    queue.play_next(z)
+    assert titles(queue) == ["z", "x", "y"]
+    assert queue.advance() is z
+    queue.play_next(y)  # Sudah ada di antrian: dipindah tepat setelah lagu saat ini
+    assert titles(queue) == ["z", "y", "x"]
+    # Lagu antrian yang selesai dikeluarkan; setelah habis konteks dilanjutkan
+    assert titles([queue.advance(), queue.advance(), queue.advance()]) == ["y", "x", "b"]
+    assert len(queue) == 0
+
+
+def test_back_from_explicit_item_returns_to_context():
+    a, b, c = make_songs("abc")
+    (x,) = make_songs("x")
+    queue = PlaybackQueue()
+    queue.seed([a, b, c], 1)
+    queue.enqueue(x)
+    assert queue.advance() is x
+    assert queue.back() is b
+    assert titles(queue) == ["x"]  # Masih menunggu
+    assert queue.advance() is x and queue.advance() is c
+
+
+def test_remove_move_and_jump():
+    songs = make_songs("pqrs")
+    queue = PlaybackQueue()
+    for song in songs:
+        queue.enqueue(song)
+    assert queue.remove(songs[1]) and not queue.remove(songs[1])
+    assert queue.move_before(songs[3], songs[0])
+    assert titles(queue) == ["s", "p", "r"]
+    assert queue.jump_to(songs[2]) and queue.current_song() is songs[2]
+    queue.remove(songs[2])
+    assert queue.current_song() is None and queue.advance() is songs[3]
+
+
+def test_to_dict_and_load():
+    songs = make_songs("abc")
+    queue = PlaybackQueue()
+    queue.seed(make_songs("uvw"), 0)
+    for song in songs:
+        queue.enqueue(song)
+    queue.advance()
+    data = queue.to_dict()
+    assert data == {"songs": [s.file_path for s in songs], "current": songs[0].file_path}
+
+    restored = PlaybackQueue()
+    by_path = {song.file_path: song for song in songs[1:]}
+    restored.load(data, by_path)  # Lagu yang tidak dikenal dilewati
+    assert titles(restored) == ["b", "c"] and restored.current_song() is None
+    assert restored.source is None
+    assert restored.advance() is songs[1]
+
+
+def test_seed_from_sorted_view_sorts_once():
+    playlist = PlaylistLinkedList()
+    for song in make_songs(["d", "b", "a", "c"]):
+        playlist.append(song)
+    calls = []
+    view = PlaylistView(playlist).sorted(key=lambda song: calls.append(song) or song.title)
+    queue = PlaybackQueue()
+    queue.seed(view, 0)
+    assert titles([queue.current_song(), queue.advance(), queue.advance(), queue.back()]) == ["a", "b", "c", "b"]
+    assert len(calls) == 4
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import LibraryStorage, PlaylistManager, Song
+
+
+def make_manager(tmp_path, budget_songs=None):
+    manager = PlaylistManager(storage=LibraryStorage(str(tmp_path / "library"), str(tmp_path / "legacy.json")))
+    if budget_songs is not None:
+        manager.playlists.max_bytes = budget_songs * manager.playlists.BYTES_PER_SONG
+    return manager
+
+
+@pytest.fixture
+def library(tmp_path):
+    """Library tersimpan dengan lima playlist; dimuat ulang sehingga hanya Default yang ada di memori"""
+    manager = make_manager(tmp_path)
+    for p in range(5):
+        name = f"P{p}"
+        manager.create_playlist(name)
+        for k in range(20):
+            song = Song(f"Lagu {p}-{k}", "Artis", "Album", "3:00", f"/musik/{p}/{k}.mp3", playlist=name)
+            manager.add_song(song, name)
+    shared = Song("Bersama", "Artis", "Album", "3:00", "/musik/bersama.mp3", playlist="P1")
+    manager.add_song(shared, "P1")
+    manager.add_song(Song("Bersama", "Artis", "Album", "3:00", "/musik/bersama.mp3", playlist="P3"), "P3")
+    manager.song_stats["/musik/2/5.mp3"]["play_count"] = 9
+    manager.save()
+    fresh = make_manager(tmp_path, budget_songs=40)
+    fresh.load()
+    return fresh
+
+
+def loaded_names(manager):
+    return {name for name, _ in manager.playlists.loaded_items()}
+
+
+def test_lookups_do_not_load_other_playlists(library):
+    assert loaded_names(library) == {"Default"}
+    songs = library.get_songs_by_path(["/musik/1/3.mp3", "/musik/bersama.mp3", "/musik/tidak-ada.mp3"])
+    assert sorted(songs) == ["/musik/1/3.mp3", "/musik/bersama.mp3"]
+    assert songs["/musik/1/3.mp3"].title == "Lagu 1-3"
+    most = library.get_most_played_songs(1)
+    assert [song.file_path for song in most] == ["/musik/2/5.mp3"] and most[0].play_count == 9
+    assert len(library.get_library_paths()) == 101
+    assert library.playlists.playlists_with(["/musik/bersama.mp3"]) == ["P1", "P3"]
+    assert loaded_names(library) == {"Default"}
+
+
+def test_delete_loads_only_affected_playlists(library):
+    library.delete_songs([Song("Bersama", "Artis", "Album", "3:00", "/musik/bersama.mp3")])
+    assert loaded_names(library) <= {"Default", "P1", "P3"}
+    assert library.playlists.playlists_with(["/musik/bersama.mp3"]) == []
+    assert "/musik/bersama.mp3" not in library.get_library_paths()
+    library.undo()
+    assert library.playlists.playlists_with(["/musik/bersama.mp3"]) == ["P1", "P3"]
+
+
+def test_song_index_survives_save_and_eviction(library, tmp_path):
+    song = library.get_songs_by_path(["/musik/4/0.mp3"])["/musik/4/0.mp3"]
+    library.update_songs([(song, {"playlist": "P0"})])
+    for name in ("P1", "P2", "P3"):
+        library.playlists[name]  # Anggaran 40 lagu: P0/P4 ditulis lalu dibuang
+    assert library.playlists.playlists_with(["/musik/4/0.mp3"]) == ["P0"]
+    library.save()
+    with open(tmp_path / "library" / "index.json") as f:
+        index = json.load(f)
+    file_p0 = library.playlists.meta["P0"]["file"]
+    assert index["song_files"]["/musik/4/0.mp3"] == [file_p0]
+
+
+def test_index_without_song_files_is_rebuilt(library, tmp_path):
+    path = tmp_path / "library" / "index.json"
+    with open(path) as f:
+        index = json.load(f)
+    del index["song_files"]
+    with open(path, "w") as f:
+        json.dump(index, f)
+    manager = make_manager(tmp_path)
+    manager.load()
+    assert manager.playlists.playlists_with(["/musik/bersama.mp3"]) == ["P1", "P3"]
+
+
+def test_export_streams_unloaded_playlists(library, tmp_path):
+    target = tmp_path / "ekspor.json"
+    library.save_to_file(str(target))
+    with open(target) as f:
+        data = json.load(f)
+    assert list(data["playlists"]) == library.playlists.keys()
+    assert len(data["playlists"]["P2"]) == 20 and data["current_playlist"] == "Default"
+    assert loaded_names(library) == {"Default"}
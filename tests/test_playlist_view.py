@@ -0,0 +1,62 @@
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import LibraryStorage, PlaylistManager, Song
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = PlaylistManager(storage=LibraryStorage(str(tmp_path / "library"), str(tmp_path / "legacy.json")))
+    manager.create_playlist("Kosong")
+    return manager
+
+
+def test_view_of_empty_playlist_is_live(manager):
+    view = manager.get_playlist_view("Kosong")
+    assert len(view) == 0 and not view
+    manager.add_song(Song("Baru", "Artis", "Album", "3:00", "/musik/baru.mp3", playlist="Kosong"), "Kosong")
+    assert [song.title for song in view] == ["Baru"]
+
+
+def test_pages_cover_sorted_view(manager):
+    for k in range(23):
+        manager.add_song(Song(f"Lagu {k:02d}", "Artis", "Album", "3:00", f"/musik/{k}.mp3", playlist="Kosong"), "Kosong")
+    view = manager.get_playlist_view("Kosong").sorted(key=lambda song: song.title, reverse=True)
+    cursor, seen = None, []
+    while True:
+        songs, cursor = view.page(cursor, 5)
+        seen.extend(songs)
+        if cursor is None:
+            break
+    assert seen == list(view) == sorted(seen, key=lambda song: song.title, reverse=True)
+    assert len(seen) == 23
+
+
+def test_random_access_on_sorted_view_sorts_once(manager):
+    for k in range(300):
+        manager.add_song(Song(f"Lagu {k:03d}", "Artis", "Album", "3:00", f"/musik/{k}.mp3", playlist="Kosong"), "Kosong")
+    calls = []
+
+    def key(song):
+        calls.append(song)
+        return song.title
+
+    view = manager.get_playlist_view("Kosong").sorted(key=key, reverse=True)
+    expected = sorted((song.title for song in manager.playlists["Kosong"]), reverse=True)
+    assert [view[i].title for i in (0, 150, 299, -1)] == [expected[0], expected[150], expected[299], expected[-1]]
+    assert view.window(250, 5) == view[250:255]
+    assert len(calls) == 300
+    with pytest.raises(IndexError):
+        view[300]
+    manager.add_song(Song("Lagu 999", "Artis", "Album", "3:00", "/musik/999.mp3", playlist="Kosong"), "Kosong")
+    assert view[0].title == "Lagu 999"  # Versi playlist berubah: dimaterialisasi ulang
+    assert len(calls) == 601
+
+
+def test_filtered_view_indexing(manager):
+    for k in range(50):
+        manager.add_song(Song(f"Lagu {k}", "Artis", "Album", "3:00", f"/musik/{k}.mp3", playlist="Kosong"), "Kosong")
+    view = manager.get_playlist_view("Kosong").filter(lambda song: int(song.title.split()[1]) % 5 == 0)
+    assert len(view) == 10
+    assert [view[i].title for i in range(10)] == [f"Lagu {k}" for k in range(0, 50, 5)]
+    assert view[-1].title == "Lagu 45" and view[3:5] == [view[3], view[4]]
@@ -0,0 +1,118 @@
+import json
+import threading
+
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import Profiler
+
+
+class FakeRoot:
+    """Pengganti Tk: callback after() disimpan dan dijalankan manual"""
+    def __init__(self):
+        self.callbacks = {}
+        self.ids = 0
+
+    def after(self, ms, callback):
+        self.ids += 1
+        self.callbacks[self.ids] = callback
+        return self.ids
+
+    def after_cancel(self, after_id):
+        self.callbacks.pop(after_id, None)
+
+    def run_pending(self):
+        callbacks, self.callbacks = self.callbacks, {}
+        for callback in callbacks.values():
+            callback()
+
+
+@pytest.fixture
+def profiler():
+    profiler = Profiler()
+    yield profiler
+    profiler.disable()
+
+
+def test_record_histogram_and_summary(profiler):
+    profiler.record("cepat", 0.0005)
+    profiler.record("cepat", 0.003)
+    profiler.record("lambat", 2.0)
+    rows = profiler.summary()
+    assert [row["name"] for row in rows] == ["lambat", "cepat"]
+    fast = rows[1]
+    assert fast["calls"] == 2
+    assert fast["mean_ms"] == pytest.approx(1.75)
+    assert fast["max_ms"] == pytest.approx(3.0)
+    assert fast["histogram"]["<=1ms"] == 1 and fast["histogram"]["<=5ms"] == 1
+    assert rows[0]["histogram"][">1000ms"] == 1
+
+
+def test_wrap_records_only_when_enabled(profiler):
+    def fails():
+        raise ValueError("gagal")
+    add = profiler.wrap("tambah", lambda a, b: a + b)
+    broken = profiler.wrap("gagal", fails)
+    assert add(1, 2) == 3
+    assert profiler.records == {}
+
+    profiler.enable()
+    assert add(1, 2) == 3
+    with pytest.raises(ValueError):
+        broken()
+    assert profiler.records["tambah"]["calls"] == 1
+    assert profiler.records["gagal"]["calls"] == 1  # Durasi tetap dicatat saat gagal
+
+
+def test_instrument_uses_class_prefix(profiler):
+    class Penyimpan:
+        def simpan(self, value):
+            return value * 2
+    store = Penyimpan()
+    profiler.instrument(store, ["simpan"])
+    profiler.enable()
+    assert store.simpan(4) == 8
+    assert profiler.records["Penyimpan.simpan"]["calls"] == 1
+
+
+def test_record_from_many_threads(profiler):
+    def worker():
+        for _ in range(1000):
+            profiler.record("job", 0.001)
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert profiler.records["job"]["calls"] == 8000
+    assert sum(profiler.records["job"]["histogram"]) == 8000
+
+
+def test_event_loop_probe_runs_only_while_enabled(profiler):
+    root = FakeRoot()
+    profiler.monitor_event_loop(root)
+    assert not root.callbacks  # Belum aktif: tidak ada probe
+
+    profiler.enable()
+    root.run_pending()
+    root.run_pending()
+    assert profiler.records["tk.event_loop_lag"]["calls"] == 2
+
+    profiler.disable()
+    assert not root.callbacks
+
+
+def test_reset_and_exports(profiler, tmp_path):
+    profiler.enable()
+    profiler.record("simpan", 0.01)
+    path = tmp_path / "profil.json"
+    profiler.export_json(str(path))
+    assert json.loads(path.read_text())["functions"][0]["name"] == "simpan"
+    assert profiler.dump_cprofile(str(tmp_path / "profil.prof"))
+    assert profiler.enabled
+
+    profiler.reset()
+    assert profiler.records == {} and profiler.enabled
+    profiler.disable()
+    profiler.reset()
+    assert not profiler.dump_cprofile(str(tmp_path / "lagi.prof"))
@@ -0,0 +1,73 @@
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import CoPlayRecommender, Song
+
+
+def paths(*names):
+    return [f"/musik/{name}.mp3" for name in names]
+
+
+def test_session_plays_are_similar():
+    recommender = CoPlayRecommender()
+    recommender.rebuild([])
+    start = 1000.0
+    for k, path in enumerate(paths("a", "b", "a", "b", "c")):
+        recommender.observe_play(path, start + k)
+    # Jeda panjang memulai sesi baru, d tidak berdekatan dengan a/b
+    recommender.observe_play(paths("d")[0], start + CoPlayRecommender.SESSION_GAP + 100)
+    similar = dict(recommender.similar(paths("a")[0]))
+    assert max(similar, key=similar.get) == paths("b")[0]
+    assert paths("d")[0] not in similar
+    assert recommender.similar("/musik/tidak-ada.mp3") == []
+
+
+def test_plays_ignored_until_built():
+    recommender = CoPlayRecommender()
+    recommender.observe_play(paths("a")[0], 0.0)
+    assert recommender.ids == {}
+
+
+def test_rebuild_from_playlists_and_allowed_paths():
+    playlist = [Song(name, "Artis", "Album", "3:00", path)
+                for name, path in zip("abc", paths("a", "b", "c"))]
+    recommender = CoPlayRecommender()
+    recommender.rebuild([[song.file_path for song in playlist]])
+    assert {path for path, _ in recommender.similar(paths("a")[0])} == set(paths("b", "c"))
+    allowed = {paths("c")[0]}
+    assert [path for path, _ in recommender.similar(paths("a")[0], allowed_paths=allowed)] == paths("c")
+
+
+def test_compact_preserves_scores():
+    recommender = CoPlayRecommender()
+    recommender.observe_playlist(paths("a", "b", "c", "d"))
+    recommender.compact()
+    recommender.observe_playlist(paths("a", "c", "e"))  # Delta di atas CSR
+    before = dict(recommender.similar(paths("a")[0]))
+    recommender.compact()
+    after = dict(recommender.similar(paths("a")[0]))
+    assert recommender.delta == {}
+    assert before.keys() == after.keys()
+    for path in before:
+        assert after[path] == pytest.approx(before[path])
+
+
+def test_compact_prunes_rows(monkeypatch):
+    monkeypatch.setattr(CoPlayRecommender, "MAX_ROW_NNZ", 2)
+    recommender = CoPlayRecommender()
+    hub = paths("hub")[0]
+    for k, other in enumerate(paths("x", "y", "z")):
+        for _ in range(k + 1):
+            recommender.observe_playlist([hub, other])
+    recommender.compact()
+    assert [path for path, _ in recommender.similar(hub)] == paths("z", "y")
+
+
+def test_auto_mix_starts_with_seed_without_duplicates():
+    recommender = CoPlayRecommender()
+    recommender.observe_playlist(paths(*"abcdefgh"))
+    recommender.compact()
+    mix = recommender.auto_mix(paths("a")[0], length=5)
+    assert mix[0] == paths("a")[0]
+    assert len(mix) == 5 and len(set(mix)) == 5
+    assert recommender.auto_mix("/musik/baru.mp3") == ["/musik/baru.mp3"]
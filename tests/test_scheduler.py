@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import JobScheduler
+
+
+def poll_until(scheduler, condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        scheduler.poll()
+        time.sleep(0.01)
+    return condition()
+
+
+def test_process_jobs_do_not_starve_interactive_jobs():
+    scheduler = JobScheduler(thread_workers=2, process_workers=1)
+    try:
+        done = []
+        for _ in range(6):
+            scheduler.submit(time.sleep, 0.5, use_process=True, priority=JobScheduler.BACKGROUND,
+                             on_done=lambda _: done.append("proses"))
+        time.sleep(0.1)  # Semua tugas proses sudah diambil thread worker
+        start = time.monotonic()
+        scheduler.submit(lambda: "cover", priority=JobScheduler.INTERACTIVE, on_done=done.append)
+        assert poll_until(scheduler, lambda: "cover" in done)
+        assert time.monotonic() - start < 0.4
+        assert done.count("proses") < 6
+    finally:
+        scheduler.shutdown()
+
+
+def test_process_job_result_error_and_cancel():
+    scheduler = JobScheduler(thread_workers=1, process_workers=1)
+    try:
+        results, errors = [], []
+        scheduler.submit(abs, -3, use_process=True, on_done=results.append)
+        scheduler.submit(int, "bukan angka", use_process=True, on_done=results.append, on_error=errors.append)
+        cancelled = scheduler.submit(time.sleep, 0.2, use_process=True, on_done=results.append)
+        cancelled.cancel()
+        assert poll_until(scheduler, lambda: results and errors)
+        time.sleep(0.5)
+        scheduler.poll()
+        assert results == [3]
+        assert isinstance(errors[0], ValueError)
+    finally:
+        scheduler.shutdown()
+
+
+def test_default_error_handler_receives_unhandled_errors():
+    errors = []
+    scheduler = JobScheduler(thread_workers=1, process_workers=1, on_error=errors.append)
+    try:
+        handled = []
+        scheduler.submit(int, "x")
+        scheduler.submit(int, "y", on_error=handled.append)
+        assert poll_until(scheduler, lambda: errors and handled)
+        assert len(errors) == len(handled) == 1
+    finally:
+        scheduler.shutdown()
+
+
+def test_process_jobs_wait_in_priority_order_and_can_be_cancelled():
+    scheduler = JobScheduler(thread_workers=1, process_workers=1)
+    try:
+        order = []
+        scheduler.submit(time.sleep, 0.5, use_process=True, on_done=lambda _: order.append("pertama"))
+        assert poll_until(scheduler, lambda: scheduler.process_running == 1)
+        # Pool penuh: tugas berikutnya menunggu di heap, bukan di antrian pool
+        low = scheduler.submit(abs, -1, use_process=True, priority=JobScheduler.BACKGROUND,
+                               on_done=lambda _: order.append("latar"))
+        cancelled = scheduler.submit(abs, -2, use_process=True, on_done=lambda _: order.append("batal"))
+        scheduler.submit(abs, -3, use_process=True, priority=JobScheduler.INTERACTIVE,
+                         on_done=lambda _: order.append("interaktif"))
+        assert poll_until(scheduler, lambda: len(scheduler.process_jobs) == 3)
+        assert scheduler.process_running == 1
+        cancelled.cancel()
+        assert cancelled.future is None
+        assert poll_until(scheduler, lambda: len(order) == 3)
+        assert order == ["pertama", "interaktif", "latar"] and low.future is not None
+        assert scheduler.process_running == 0
+    finally:
+        scheduler.shutdown()
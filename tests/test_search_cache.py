@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import LibraryStorage, MusicPlayerApp, PlaylistManager, Song
+
+
+class Job:
+    def check(self):
+        pass
+
+
+@pytest.fixture
+def app(tmp_path):
+    manager = PlaylistManager(storage=LibraryStorage(str(tmp_path / "library"), str(tmp_path / "legacy.json")))
+    manager.create_playlist("Santai")
+    manager.current_playlist = "Santai"
+    titles = ["Hujan Pagi", "Hujan Sore", "Pagi Cerah", "Malam Sunyi", "Hujan Malam"]
+    for k, title in enumerate(titles):
+        manager.add_song(Song(title, "Artis", "Album", "3:00", f"/musik/{k}.mp3", playlist="Santai"), "Santai")
+    # Hanya logika pencarian yang diuji; jendela Tk tidak dibuat
+    app = MusicPlayerApp.__new__(MusicPlayerApp)
+    app.playlist_manager = manager
+    app.search_cache = None
+    return app
+
+
+def titles(songs):
+    return sorted(song.title for song in songs)
+
+
+def test_scan_then_narrow_from_cache(app):
+    app.search_cache = app.scan_matches("hujan", Job())
+    assert titles(app.search_cache[2]) == ["Hujan Malam", "Hujan Pagi", "Hujan Sore"]
+
+    assert app.cached_matches("hujan") is app.search_cache[2]
+    assert titles(app.cached_matches("hujan m")) == ["Hujan Malam"]
+    assert titles(app.cached_matches("hujan s")) == ["Hujan Sore"]
+
+
+def test_cache_is_not_used_for_unrelated_terms(app):
+    app.search_cache = app.scan_matches("hujan", Job())
+    assert app.cached_matches("pagi") is None   # Tidak memuat kata kunci lama
+    assert app.cached_matches("huj") is None    # Lebih pendek: bisa cocok dengan lagu lain
+
+
+def test_cache_is_dropped_when_view_changes(app):
+    app.search_cache = app.scan_matches("hujan", Job())
+    manager = app.playlist_manager
+    manager.add_song(Song("Hujan Deras", "Artis", "Album", "3:00", "/musik/5.mp3", playlist="Santai"), "Santai")
+    assert app.cached_matches("hujan d") is None
+
+    app.search_cache = app.scan_matches("hujan", Job())
+    manager.sort_criteria = "artist"
+    assert app.cached_matches("hujan d") is None
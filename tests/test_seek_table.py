@@ -0,0 +1,91 @@
+import os
+import struct
+
+import pytest
+
+uas = pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import SeekTableCache, build_seek_table
+
+# MPEG1 Layer III, 128 kbps, 44.1 kHz, tanpa padding -> 417 byte dan 1152 sampel per frame
+FRAME_HEADER = b"\xff\xfb\x90\x00"
+FRAME_LENGTH = 417
+FRAME_SECONDS = 1152 / 44100
+TAG = b"ID3\x04\x00\x00\x00\x00\x00\x10" + b"\x00" * 16  # Tag ID3 kosong 16 byte
+
+
+def mp3(frames, junk_after=None):
+    data = bytearray(TAG)
+    info = bytearray(FRAME_HEADER + b"\x00" * (FRAME_LENGTH - 4))
+    info[36:48] = b"Info" + struct.pack(">II", 1, frames)
+    data += info
+    for i in range(frames):
+        data += FRAME_HEADER + b"\x00" * (FRAME_LENGTH - 4)
+        if i == junk_after:
+            data += b"\x00\x01\x02"
+    return bytes(data)
+
+
+def test_offsets_skip_tag_info_frame_and_junk(tmp_path):
+    path = tmp_path / "lagu.mp3"
+    path.write_bytes(mp3(10, junk_after=4))
+    table = build_seek_table(str(path))
+    first = len(TAG) + FRAME_LENGTH
+    assert len(table.offsets) == 10
+    assert table.offsets[0] == first
+    assert table.offsets[5] == first + 5 * FRAME_LENGTH + 3  # Setelah sinkronisasi ulang
+    assert table.duration == pytest.approx(10 * FRAME_SECONDS)
+
+
+def test_offset_for_rounds_down_and_clamps(tmp_path):
+    path = tmp_path / "lagu.mp3"
+    path.write_bytes(mp3(10))
+    table = build_seek_table(str(path))
+    assert table.offset_for(0) == (table.offsets[0], 0.0)
+    offset, actual = table.offset_for(3.5 * FRAME_SECONDS)
+    assert offset == table.offsets[3] and actual == pytest.approx(3 * FRAME_SECONDS)
+    assert table.offset_for(-1)[0] == table.offsets[0]
+    assert table.offset_for(3600) == (table.offsets[9], pytest.approx(9 * FRAME_SECONDS))
+
+
+def test_cache_reuses_disk_table_until_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "lagu.mp3"
+    path.write_bytes(mp3(6))
+    directory = str(tmp_path / "seek")
+    cache = SeekTableCache(directory)
+    assert cache.get(str(path)) is None
+    built = cache.load_or_build(str(path))
+    assert cache.get(str(path)) is built
+
+    # Cache baru membaca dari disk tanpa memindai ulang
+    monkeypatch.setattr(uas, "build_seek_table", lambda file_path: pytest.fail("tidak boleh dipindai ulang"))
+    loaded = SeekTableCache(directory).load_or_build(str(path))
+    assert list(loaded.offsets) == list(built.offsets)
+    assert (loaded.samples, loaded.sample_rate) == (built.samples, built.sample_rate)
+    monkeypatch.undo()
+
+    path.write_bytes(mp3(8))
+    os.utime(path, (1, 1))  # mtime berubah: tabel lama tidak berlaku lagi
+    assert cache.get(str(path)) is None
+    assert len(cache.load_or_build(str(path)).offsets) == 8
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = SeekTableCache(str(tmp_path / "seek"), max_entries=2)
+    paths = []
+    for k in range(3):
+        path = tmp_path / f"{k}.mp3"
+        path.write_bytes(mp3(2))
+        paths.append(str(path))
+    cache.load_or_build(paths[0])
+    cache.load_or_build(paths[1])
+    cache.get(paths[0])
+    cache.load_or_build(paths[2])
+    assert list(cache.tables) == [paths[0], paths[2]]
+
+
+def test_not_an_mp3_is_not_cached(tmp_path):
+    path = tmp_path / "catatan.mp3"
+    path.write_bytes(b"bukan audio" * 100)
+    cache = SeekTableCache(str(tmp_path / "seek"))
+    assert cache.load_or_build(str(path)) is None
+    assert not cache.tables
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+pytest.importorskip("uas")  # Butuh pygame, eyed3 dan Pillow
+from uas import FenwickTree, ShuffleEngine
+
+
+def test_fenwick_prefix_sums_and_find():
+    rng = random.Random(3)
+    weights = [rng.choice([0, 0.5, 1, 2, 5]) for _ in range(300)]
+    tree = FenwickTree(weights)
+    assert tree.total() == pytest.approx(sum(weights))
+    for _ in range(200):
+        index = rng.randrange(len(weights))
+        weights[index] = rng.random() * 3
+        tree.update(index, weights[index])
+        target = rng.random() * sum(weights)
+        found = tree.find(target)
+        # Indeks terkecil yang jumlah prefiksnya (inklusif) melebihi target
+        assert sum(weights[:found]) <= target + 1e-9 < sum(weights[:found + 1]) + 1e-9
+        assert weights[found] > 0
+    assert tree.total() == pytest.approx(sum(weights))
+
+
+def test_fenwick_never_picks_zero_weight():
+    tree = FenwickTree([0, 3, 0, 1, 0])
+    for target in (0, 1.5, 2.999, 3, 3.5):
+        assert tree.find(target) in (1, 3)
+
+
+def test_shuffle_is_permutation_per_round():
+    engine = ShuffleEngine(50)
+    first = [engine.next() for _ in range(50)]
+    second = [engine.next() for _ in range(50)]
+    assert sorted(first) == list(range(50))
+    assert sorted(second) == list(range(50))
+
+
+def test_shuffle_prev_and_forward():
+    engine = ShuffleEngine(10)
+    played = [engine.next() for _ in range(3)]
+    assert engine.prev() == played[1]
+    assert engine.prev() == played[0]
+    # Maju lagi mengulang lagu yang dilewati dengan prev
+    assert engine.next() == played[1]
+    assert engine.next() == played[2]
+
+
+def test_weighted_shuffle_follows_weights():
+    random.seed(5)
+    weights = [0.0, 1.0, 0.0, 9.0]
+    engine = ShuffleEngine(len(weights), weights.__getitem__)
+    picks = [engine.next() for _ in range(2000)]
+    assert set(picks) <= {1, 3}
+    assert picks.count(3) > picks.count(1) * 4
+    weights[3] = 0.0
+    engine.refresh_weight(3)
+    assert all(engine.next() == 1 for _ in range(50))
@@ -0,0 +1,468 @@
+# Harness beban end-to-end untuk jalur I/O pemutar musik (tanpa GUI)
+"""Membuat korpus MP3 sintetis lalu mengukur latensi impor, rescan, cover, tabel seek dan skip,
+ditutup stress test akses PlaylistManager dari banyak thread.
+
+Contoh:
+    python load_harness.py --count 2000 --skips 500
+    python load_harness.py --dir korpus --keep --json laporan.json
+
+File MP3 berisi frame MPEG1 Layer III hening (128 kbps, 44.1 kHz) dengan
+tag ID3 yang bervariasi: v2.3/v2.4, teks latin-1/UTF-16/UTF-8, cover
+JPEG/PNG berbagai ukuran, sebagian tanpa tag atau tanpa album, sebagian
+dengan header Xing/Info dan tag ID3v1 di akhir. Audio dijalankan dengan
+driver SDL "dummy" sehingga tidak butuh perangkat suara maupun layar.
+"""
+import os
+
+# Harus diatur sebelum pygame diimpor (lewat uas)
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import io
+import json
+import random
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections import Counter
+
+import eyed3
+import pygame
+from PIL import Image
+
+from uas import (LibraryStorage, PlaylistManager, Song, build_seek_table,
+                 load_album_art, read_song_metadata)
+
+# Header frame MPEG1 Layer III, 128 kbps, 44.1 kHz, tanpa padding, stereo -> 417 byte per frame
+FRAME_HEADER = b"\xff\xfb\x90\x00"
+FRAME_LENGTH = 417
+FRAMES_PER_SECOND = 44100 / 1152
+
+_SYLLABLES = ["ka", "ri", "mo", "na", "se", "lu", "ta", "vi", "ro", "de", "an", "jo", "mi", "sa", "ku"]
+_EXTRA_NAMES = ["Café Müller", "Δelta", "Noël", "東京 Nights", "Señorita", "Ølberg"]
+
+
+# ==================================================
+# GENERATOR KORPUS
+# ==================================================
+def _synchsafe_bytes(value):
+    return bytes([(value >> 21) & 0x7F, (value >> 14) & 0x7F, (value >> 7) & 0x7F, value & 0x7F])
+
+
+def _id3_frame(frame_id, payload, version):
+    size = _synchsafe_bytes(len(payload)) if version == 4 else struct.pack(">I", len(payload))
+    return frame_id.encode("latin-1") + size + b"\x00\x00" + payload
+
+
+def _text_payload(text, version, rng):
+    """Frame teks dengan encoding bervariasi; teks non-latin selalu Unicode"""
+    try:
+        latin = text.encode("latin-1")
+    except UnicodeEncodeError:
+        latin = None
+    if latin is not None and rng.random() < 0.6:
+        return b"\x00" + latin
+    if version == 4 and rng.random() < 0.5:
+        return b"\x03" + text.encode("utf-8")
+    return b"\x01" + text.encode("utf-16")
+
+
+def _name(rng, words):
+    if rng.random() < 0.05:
+        return rng.choice(_EXTRA_NAMES)
+    return " ".join("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(1, 3))).capitalize()
+                    for _ in range(words))
+
+
+def make_cover(rng, size, image_format):
+    """Gambar cover berisi noise agar ukuran terkompresinya realistis"""
+    img = Image.frombytes("RGB", (size, size), rng.randbytes(size * size * 3))
+    buffer = io.BytesIO()
+    img.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def build_id3_tag(rng, title, artist, album, cover=None, cover_mime="image/jpeg"):
+    version = rng.choice((3, 3, 4))
+    frames = [_id3_frame("TIT2", _text_payload(title, version, rng), version)]
+    if artist:
+        frames.append(_id3_frame("TPE1", _text_payload(artist, version, rng), version))
+    if album:
+        frames.append(_id3_frame("TALB", _text_payload(album, version, rng), version))
+    frames.append(_id3_frame("TRCK", b"\x00" + str(rng.randint(1, 20)).encode(), version))
+    if cover:
+        # Encoding, MIME, null, jenis gambar (3 = cover depan), deskripsi kosong, data
+        apic = b"\x00" + cover_mime.encode("latin-1") + b"\x00\x03\x00" + cover
+        frames.append(_id3_frame("APIC", apic, version))
+    body = b"".join(frames) + b"\x00" * rng.choice((0, 256, 2048))  # Padding
+    return b"ID3" + bytes([version, 0, 0]) + _synchsafe_bytes(len(body)) + body
+
+
+def build_audio(rng, seconds, xing):
+    frame_count = max(1, int(seconds * FRAMES_PER_SECOND))
+    silent_frame = FRAME_HEADER + b"\x00" * (FRAME_LENGTH - 4)
+    if not xing:
+        return silent_frame * frame_count
+    # Frame pertama membawa header Info (offset 4 + 32 byte side info stereo MPEG1)
+    info = b"Info" + struct.pack(">II", 0x01, frame_count)
+    first = FRAME_HEADER + b"\x00" * 32 + info
+    first += b"\x00" * (FRAME_LENGTH - len(first))
+    return first + silent_frame * frame_count
+
+
+def build_id3v1(title, artist, album):
+    def field(text, length):
+        return text.encode("latin-1", "replace")[:length].ljust(length, b"\x00")
+    return b"TAG" + field(title, 30) + field(artist, 30) + field(album, 30) + b"2024" + field("", 30) + b"\xff"
+
+
+def generate_corpus(directory, count, seed=0, max_seconds=30, missing_ratio=0.1, cover_ratio=0.6,
+                    cover_sizes=(64, 300, 600, 1200)):
+    """Menulis count file MP3 ke directory; mengembalikan daftar (path, info) untuk verifikasi"""
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    artists = [_name(rng, rng.randint(1, 2)) for _ in range(max(1, count // 20))]
+    albums = {artist: [_name(rng, rng.randint(1, 3)) for _ in range(rng.randint(1, 4))] for artist in artists}
+    covers = {}  # (album, ukuran, format) -> bytes; satu album memakai cover yang sama
+    corpus = []
+    for i in range(count):
+        artist = rng.choice(artists)
+        album = rng.choice(albums[artist])
+        title = _name(rng, rng.randint(1, 4))
+        seconds = rng.uniform(2, max_seconds)
+        roll = rng.random()
+        tag = b""
+        info = {"title": None, "artist": None, "album": None, "cover": 0, "seconds": seconds}
+        if roll >= missing_ratio:
+            if roll < missing_ratio * 1.5:
+                album = None  # Tag tidak lengkap
+            cover = None
+            if album and rng.random() < cover_ratio:
+                size = rng.choice(cover_sizes)
+                image_format = rng.choice(("JPEG", "JPEG", "PNG"))
+                key = (album, size, image_format)
+                if key not in covers:
+                    covers[key] = make_cover(rng, size, image_format)
+                cover = covers[key]
+                info["cover"] = len(cover)
+            mime = "image/png" if cover and cover.startswith(b"\x89PNG") else "image/jpeg"
+            tag = build_id3_tag(rng, title, artist, album, cover, mime)
+            info.update(title=title, artist=artist, album=album)
+        data = tag + build_audio(rng, seconds, xing=rng.random() < 0.3)
+        if tag and rng.random() < 0.2:
+            data += build_id3v1(title, artist, album or "")
+        path = os.path.join(directory, f"track_{i:06d}.mp3")
+        with open(path, "wb") as f:
+            f.write(data)
+        corpus.append((path, info))
+    return corpus
+
+
+def retag(path, rng, suffix=" (remaster)"):
+    """Mengganti tag ID3v2 sebuah file dengan judul baru (untuk menguji rescan)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    audio = data
+    if data[:3] == b"ID3":
+        tag_size = ((data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]) + 10
+        audio = data[tag_size:]
+    metadata = read_song_metadata(path)
+    title = metadata["title"] + suffix
+    with open(path, "wb") as f:
+        f.write(build_id3_tag(rng, title, metadata["artist"], metadata["album"]) + audio)
+    return title
+
+
+# ==================================================
+# PENGUKURAN
+# ==================================================
+class StageTimer:
+    """Mengumpulkan latensi per item untuk tiap tahap"""
+    def __init__(self):
+        self.samples = {}   # tahap -> daftar latensi (detik)
+        self.order = []
+
+    def measure(self, stage, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        self.add(stage, time.perf_counter() - start)
+        return result
+
+    def add(self, stage, seconds):
+        if stage not in self.samples:
+            self.samples[stage] = []
+            self.order.append(stage)
+        self.samples[stage].append(seconds)
+
+    def report(self):
+        rows = []
+        for stage in self.order:
+            values = sorted(self.samples[stage])
+            def percentile(p):
+                return values[min(len(values) - 1, int(p * len(values)))]
+            rows.append({
+                "stage": stage, "count": len(values),
+                "total_s": sum(values),
+                "mean_ms": sum(values) / len(values) * 1000,
+                "p50_ms": percentile(0.50) * 1000, "p95_ms": percentile(0.95) * 1000,
+                "p99_ms": percentile(0.99) * 1000, "max_ms": values[-1] * 1000,
+            })
+        return rows
+
+
+def print_report(rows):
+    print(f"{'Tahap':<16}{'n':>7}{'total s':>10}{'rata ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'maks ms':>10}")
+    for row in rows:
+        print(f"{row['stage']:<16}{row['count']:>7}{row['total_s']:>10.2f}{row['mean_ms']:>10.3f}"
+              f"{row['p50_ms']:>10.3f}{row['p95_ms']:>10.3f}{row['p99_ms']:>10.3f}{row['max_ms']:>10.3f}")
+
+
+# ==================================================
+# TAHAP-TAHAP HARNESS
+# ==================================================
+def stage_import(timer, manager, paths, eyed3_baseline):
+    """Jalur finish_add_songs tanpa dialog: baca metadata lalu add_song"""
+    for file_path in paths:
+        metadata = timer.measure("import_meta", read_song_metadata, file_path)
+        song = Song(metadata["title"], metadata["artist"], metadata["album"], metadata["duration"], file_path)
+        timer.measure("import_add", manager.add_song, song)
+    if eyed3_baseline:
+        # Pembanding: pembacaan tag penuh dengan eyed3 seperti sebelum parser cepat
+        for file_path in paths:
+            timer.measure("import_eyed3", eyed3.load, file_path)
+    timer.measure("save", manager.save)
+
+
+def stage_rescan(timer, manager, rng, changed_ratio):
+    """Membaca ulang tag semua lagu; perubahan diterapkan dalam satu update_songs"""
+    songs = list(manager.playlists["Default"])
+    changed = rng.sample(songs, int(len(songs) * changed_ratio))
+    for song in changed:
+        retag(song.file_path, rng)
+    updates = []
+    for song in songs:
+        metadata = timer.measure("rescan_meta", read_song_metadata, song.file_path)
+        if (metadata["title"], metadata["artist"], metadata["album"]) != (song.title, song.artist, song.album):
+            updates.append((song, {"title": metadata["title"], "artist": metadata["artist"], "album": metadata["album"]}))
+    if updates:
+        timer.measure("rescan_update", manager.update_songs, updates, "Rescan")
+    return len(updates), len(changed)
+
+
+def stage_art(timer, paths):
+    found = 0
+    for file_path in paths:
+        if timer.measure("art", load_album_art, file_path) is not None:
+            found += 1
+    return found
+
+
+def stage_seek_tables(timer, paths):
+    """Membangun tabel seek tiap file (pekerjaan latar saat lagu mulai diputar)"""
+    for file_path in paths:
+        timer.measure("seek_table", build_seek_table, file_path)
+
+
+def stage_skip(timer, manager, skips, rng):
+    """Next/prev cepat seperti tombol di GUI: pindah antrian, load + play mixer, catat putar"""
+    queue = manager.playback_queue
+    queue.seed(manager.get_current_playlist_songs(), 0)
+    song = queue.current_song()
+    for _ in range(skips):
+        start = time.perf_counter()
+        song = (queue.back() if rng.random() < 0.3 else queue.advance()) or queue.current_song() or song
+        pygame.mixer.music.load(song.file_path)
+        pygame.mixer.music.play()
+        manager.record_play(song)
+        timer.add("skip", time.perf_counter() - start)
+    pygame.mixer.music.stop()
+
+
+def stage_concurrency(timer, manager, threads, operations, seed):
+    """Stress test kunci baca-tulis PlaylistManager.
+
+    Sebagian thread membaca (sort, cari fuzzy, statistik, serialisasi)
+    sementara thread lain menulis (record_play, update_song, add_song).
+    Setelah semua selesai, jumlah putar, linked list, riwayat dan indeks
+    pencarian diperiksa konsistensinya.
+    """
+    songs = list(manager.playlists["Default"])
+    before_plays = {song.file_path: manager.song_stats[song.file_path]["play_count"] for song in songs}
+    before_length = len(manager.playlists["Default"])
+    writers = max(1, threads // 4)
+    samples = []      # (tahap, detik) dari semua thread
+    plays = []        # Counter file_path -> jumlah record_play per thread penulis
+    added = []        # file_path lagu yang ditambahkan
+    errors = []
+    start_barrier = threading.Barrier(threads)
+
+    def reader(index):
+        rng = random.Random(seed * 1000 + index)
+        start_barrier.wait()
+        for _ in range(operations):
+            op = rng.randrange(4)
+            start = time.perf_counter()
+            if op == 0:
+                with manager.reading():
+                    ordered = list(manager.get_sorted_playlist_songs())
+                    expected = len(manager.playlists[manager.current_playlist])
+                if len(ordered) != expected:
+                    raise AssertionError(f"hasil sort {len(ordered)} lagu, playlist {expected} lagu")
+                stage = "rw_sort"
+            elif op == 1:
+                manager.fuzzy_search(rng.choice(songs).title[:6])
+                stage = "rw_search"
+            elif op == 2:
+                manager.get_most_played_songs(10)
+                manager.get_total_song_count()
+                stage = "rw_stats"
+            else:
+                with manager.reading():
+                    json.dumps([song.to_dict() for song in manager.get_current_playlist_songs()])
+                stage = "rw_serialize"
+            samples.append((stage, time.perf_counter() - start))
+
+    def writer(index):
+        rng = random.Random(seed * 1000 + index)
+        counts = Counter()
+        plays.append(counts)
+        start_barrier.wait()
+        for n in range(operations):
+            op = rng.randrange(3)
+            song = rng.choice(songs)
+            start = time.perf_counter()
+            if op == 0:
+                manager.record_play(song)
+                counts[song.file_path] += 1
+                stage = "rw_play"
+            elif op == 1:
+                manager.update_song(song, {"title": song.title.split(" #")[0] + f" #{index}.{n}"})
+                stage = "rw_update"
+            else:
+                file_path = f"stress/{index}/{n}.mp3"
+                manager.add_song(Song(f"Stress {index}.{n}", song.artist, song.album, song.duration, file_path))
+                added.append(file_path)
+                stage = "rw_add"
+            samples.append((stage, time.perf_counter() - start))
+
+    def guarded(fn, index):
+        try:
+            fn(index)
+        except Exception:
+            errors.append(traceback.format_exc())
+            start_barrier.abort()
+
+    workers = [threading.Thread(target=guarded, args=(writer if i < writers else reader, i), name=f"stress-{i}")
+               for i in range(threads)]
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)  # Paksa pergantian thread sesering mungkin
+    start = time.perf_counter()
+    try:
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    elapsed = time.perf_counter() - start
+    for stage, seconds in samples:
+        timer.add(stage, seconds)
+    if errors:
+        raise RuntimeError("stress test gagal:\n" + errors[0])
+
+    # Pemeriksaan konsistensi setelah semua thread selesai
+    total_plays = sum(plays, Counter())
+    for file_path, count in total_plays.items():
+        actual = manager.song_stats[file_path]["play_count"]
+        if actual != before_plays[file_path] + count:
+            raise AssertionError(f"play_count {file_path}: {actual} != {before_plays[file_path] + count}")
+    playlist = manager.playlists["Default"]
+    forward = []
+    node = playlist.head
+    while node:
+        forward.append(node.song.file_path)
+        node = node.next
+    backward = []
+    node = playlist.tail
+    while node:
+        backward.append(node.song.file_path)
+        node = node.prev
+    if not (len(forward) == len(playlist) == before_length + len(added) and forward == backward[::-1]):
+        raise AssertionError("linked list Default tidak konsisten")
+    if [record[4] for record in manager.history.state.playlists.get("Default")] != forward:
+        raise AssertionError("riwayat undo tidak sama dengan playlist Default")
+    missing = [path for path in added if path not in manager.search_index.songs and path not in manager.search_index.pending]
+    if missing:
+        raise AssertionError(f"{len(missing)} lagu baru tidak ada di indeks pencarian")
+    return len(samples) / elapsed
+
+
+def run(args):
+    workdir = args.dir or tempfile.mkdtemp(prefix="uas_harness_")
+    corpus_dir = os.path.join(workdir, "corpus")
+    timer = StageTimer()
+    rng = random.Random(args.seed)
+    try:
+        start = time.perf_counter()
+        corpus = generate_corpus(corpus_dir, args.count, args.seed, args.max_seconds,
+                                 args.missing_ratio, args.cover_ratio)
+        generate_seconds = time.perf_counter() - start
+        corpus_bytes = sum(os.path.getsize(path) for path, _ in corpus)
+        print(f"Korpus: {len(corpus)} file, {corpus_bytes / 2**20:.1f} MB dalam {generate_seconds:.1f} s ({corpus_dir})")
+
+        pygame.mixer.init()
+        storage = LibraryStorage(os.path.join(workdir, "library"), os.path.join(workdir, "music_library.json"))
+        manager = PlaylistManager(storage=storage)
+        manager.load()
+        paths = [path for path, _ in corpus]
+
+        stage_import(timer, manager, paths, args.eyed3)
+        updated, changed = stage_rescan(timer, manager, rng, args.rescan_changed)
+        covers = stage_art(timer, paths)
+        stage_seek_tables(timer, paths)
+        stage_skip(timer, manager, args.skips, rng)
+        pygame.mixer.quit()
+        throughput = 0.0
+        if args.threads:
+            throughput = stage_concurrency(timer, manager, args.threads, args.ops, args.seed)
+
+        rows = timer.report()
+        print_report(rows)
+        print(f"Rescan: {updated} lagu diperbarui ({changed} file diubah)  |  Cover ditemukan: {covers}/{len(paths)}")
+        if args.threads:
+            print(f"Konkurensi: {args.threads} thread, {throughput:.0f} operasi/s, konsisten")
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump({"count": len(corpus), "corpus_bytes": corpus_bytes,
+                           "generate_s": generate_seconds, "stages": rows}, f, indent=2)
+        return rows
+    finally:
+        if not args.keep and not args.dir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Harness beban impor/rescan/cover/skip dengan korpus MP3 sintetis")
+    parser.add_argument("--count", type=int, default=500, help="jumlah file MP3 (default: 500)")
+    parser.add_argument("--dir", help="direktori kerja; default direktori sementara yang dihapus setelah selesai")
+    parser.add_argument("--keep", action="store_true", help="jangan hapus direktori sementara")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-seconds", type=float, default=30, help="durasi maksimum lagu (detik)")
+    parser.add_argument("--missing-ratio", type=float, default=0.1, help="porsi file tanpa tag ID3")
+    parser.add_argument("--cover-ratio", type=float, default=0.6, help="porsi file ber-tag yang punya cover")
+    parser.add_argument("--rescan-changed", type=float, default=0.1, help="porsi file yang tag-nya diubah sebelum rescan")
+    parser.add_argument("--skips", type=int, default=300, help="jumlah next/prev cepat")
+    parser.add_argument("--threads", type=int, default=8, help="thread stress test kunci baca-tulis (0 = lewati)")
+    parser.add_argument("--ops", type=int, default=200, help="operasi per thread pada stress test")
+    parser.add_argument("--eyed3", action="store_true", help="ukur juga eyed3.load sebagai pembanding")
+    parser.add_argument("--json", help="tulis laporan ke file JSON")
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,114 +8,3670 @@ import eyed3
 from PIL import Image, ImageTk
 import io
 import time
+import random
+from collections import deque, Counter, OrderedDict
+import heapq
+import itertools
+import cProfile
+import functools
+import struct
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future
+import queue
+import multiprocessing
+from array import array
+import bisect
+import asyncio
+import hashlib
+import mimetypes
+import urllib.parse
+import http
+import email.utils
+import argparse
+import tempfile
+import zlib
+import pickle
+import contextlib
+import traceback
+import sys
 
-# Inisialisasi pygame mixer untuk pemutaran audio
-pygame.mixer.init()
+try:
+    import numpy as np  # Opsional: hanya dibutuhkan untuk analisis loudness
+except ImportError:
+    np = None
 
 # ==================================================
 # KELAS STRUKTUR DATA (Tidak ada perubahan signifikan)
 # ==================================================
 class SongNode:
-    """Node untuk linked list ganda yang menyimpan data lagu"""
+    """Node untuk linked list ganda yang menyimpan data lagu.
+
+    Node yang sama juga menjadi node treap implisit milik playlist
+    (left/right/parent/size), sehingga posisi bisa dicari dalam O(log n).
+    """
     def __init__(self, song, next_node=None, prev_node=None):
         self.song = song      # Menyimpan objek lagu
         self.next = next_node  # Pointer ke node berikutnya
         self.prev = prev_node  # Pointer ke node sebelumnya
+        self.priority = random.random()  # Prioritas heap treap
+        self.size = 1         # Jumlah node di subtree treap ini
+        self.left = None
+        self.right = None
+        self.parent = None
+
+
+class PlaylistLinkedList:
+    """Implementasi linked list ganda untuk playlist lagu.
+
+    Di atas node yang sama dipelihara treap implisit (order-statistic tree)
+    agar node_at/index_of/move berjalan dalam O(log n). Treap baru dibangun
+    (O(n)) saat pertama kali posisi dibutuhkan, lalu diperbarui di setiap
+    perubahan; playlist yang tidak pernah diakses per posisi tetap murni
+    linked list.
+    """
+    def __init__(self):
+        self.head = None     # Node pertama
+        self.tail = None     # Node terakhir
+        self.length = 0      # Jumlah lagu
+        self.version = 0     # Bertambah tiap perubahan, untuk cache dan cursor PlaylistView
+        self.members = Counter()  # file_path -> jumlah node, untuk cek keanggotaan O(1)
+        self.root = None     # Root treap posisi, valid hanya jika indexed
+        self.indexed = False
+
+    def _set_root(self, root):
+        if root is not None:
+            root.parent = None
+        self.root = root
+
+    def _ensure_index(self):
+        if not self.indexed:
+            self._set_root(_treap_build(self.head))
+            self.indexed = True
+
+    def node_at(self, index):
+        """Node pada posisi index dalam O(log n)"""
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("indeks playlist di luar jangkauan")
+        self._ensure_index()
+        node = self.root
+        while True:
+            left_size = _treap_size(node.left)
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node
+            else:
+                index -= left_size + 1
+                node = node.right
+
+    def __getitem__(self, index):
+        """Mengambil lagu pada posisi index dalam O(log n)"""
+        return self.node_at(index).song
+
+    def index_of(self, node):
+        """Posisi node di playlist ini dalam O(log n)"""
+        self._ensure_index()
+        index = _treap_size(node.left)
+        while node.parent is not None:
+            if node is node.parent.right:
+                index += _treap_size(node.parent.left) + 1
+            node = node.parent
+        return index
+
+    def append(self, song):
+        """Menambahkan lagu ke akhir playlist"""
+        new_node = SongNode(song)
+        if self.indexed:
+            self._set_root(_treap_merge(self.root, new_node))
+        if not self.head:  # Jika playlist kosong
+            self.head = new_node
+            self.tail = new_node
+        else:  # Jika playlist tidak kosong
+            new_node.prev = self.tail
+            self.tail.next = new_node
+            self.tail = new_node
+        self.length += 1
+        self.members[song.file_path] += 1
+        self.version += 1
+
+    def remove(self, song):
+        """Menghapus lagu dari playlist"""
+        return self.remove_index(song) >= 0
+
+    def remove_index(self, song):
+        """Menghapus lagu dan mengembalikan posisinya (-1 jika tidak ada)"""
+        current = self.head
+        index = 0
+        while current:  # Cari lagu yang akan dihapus
+            if current.song.file_path == song.file_path:
+                self._unlink(current)
+                return index
+            current = current.next
+            index += 1
+        return -1
+
+    def _unlink(self, node):
+        """Melepas node dari rantai dan memperbarui pointer tetangganya"""
+        if self.indexed:
+            left, rest = _treap_split(self.root, self.index_of(node))
+            _, right = _treap_split(rest, 1)
+            self._set_root(_treap_merge(left, right))
+            _treap_reset(node)
+        if node.prev:
+            node.prev.next = node.next
+        else:
+            self.head = node.next
+
+        if node.next:
+            node.next.prev = node.prev
+        else:
+            self.tail = node.prev
+
+        node.prev = node.next = None
+        self.length -= 1
+        self._forget(node.song.file_path)
+        self.version += 1
+
+    def _forget(self, file_path):
+        self.members[file_path] -= 1
+        if self.members[file_path] <= 0:
+            del self.members[file_path]
+
+    def _insert_before(self, node, ref):
+        """Menyisipkan node sebelum node ref (ref None berarti di akhir)"""
+        if self.indexed:
+            _treap_reset(node)
+            left, right = _treap_split(self.root, self.length if ref is None else self.index_of(ref))
+            self._set_root(_treap_merge(_treap_merge(left, node), right))
+        if ref is None:
+            node.prev = self.tail
+            node.next = None
+            if self.tail:
+                self.tail.next = node
+            else:
+                self.head = node
+            self.tail = node
+        else:
+            node.prev = ref.prev
+            node.next = ref
+            if ref.prev:
+                ref.prev.next = node
+            else:
+                self.head = node
+            ref.prev = node
+        self.length += 1
+        self.members[node.song.file_path] += 1
+        self.version += 1
+
+    def _detach_range(self, first, last, paths):
+        """Melepas rantai first..last (paths = file_path tiap nodenya) dari list ini.
+
+        Mengembalikan subtree treap rentang itu, atau None jika list belum terindeks.
+        """
+        subtree = None
+        if self.indexed:
+            left, rest = _treap_split(self.root, self.index_of(first))
+            subtree, right = _treap_split(rest, len(paths))
+            subtree.parent = None
+            self._set_root(_treap_merge(left, right))
+        if first.prev:
+            first.prev.next = last.next
+        else:
+            self.head = last.next
+        if last.next:
+            last.next.prev = first.prev
+        else:
+            self.tail = first.prev
+        first.prev = last.next = None
+        self.length -= len(paths)
+        for file_path in paths:
+            self._forget(file_path)
+        self.version += 1
+        return subtree
+
+    def _attach_range(self, first, last, paths, ref, subtree=None):
+        """Menyisipkan rantai lepas first..last sebelum node ref (None berarti di akhir).
+
+        subtree adalah treap rentang dari _detach_range; jika None dan list ini
+        terindeks, treap rentang dibangun dari rantainya dalam O(k).
+        """
+        if self.indexed:
+            if subtree is None:
+                subtree = _treap_build(first)
+            left, right = _treap_split(self.root, self.length if ref is None else self.index_of(ref))
+            self._set_root(_treap_merge(_treap_merge(left, subtree), right))
+        prev_node, next_node = (self.tail, None) if ref is None else (ref.prev, ref)
+        first.prev = prev_node
+        last.next = next_node
+        if prev_node:
+            prev_node.next = first
+        else:
+            self.head = first
+        if next_node:
+            next_node.prev = last
+        else:
+            self.tail = last
+        self.length += len(paths)
+        self.members.update(paths)
+        self.version += 1
+
+    def splice(self, first, last, target=None, ref=None):
+        """Memindahkan rentang node first..last ke target, tepat sebelum ref (None = di akhir).
+
+        target None berarti list ini sendiri (memindah blok di dalam playlist).
+        Hanya pointer ujung yang diubah; rentang cukup ditelusuri sekali untuk
+        jumlah dan keanggotaan, jadi O(k). Mengembalikan jumlah node yang dipindah.
+        """
+        target = self if target is None else target
+        paths = []
+        node = first
+        while True:
+            if node is ref and target is self:
+                raise ValueError("ref berada di dalam rentang yang dipindah")
+            paths.append(node.song.file_path)
+            if node is last:
+                break
+            node = node.next
+            if node is None:
+                raise ValueError("last tidak berada setelah first")
+        subtree = self._detach_range(first, last, paths)
+        target._attach_range(first, last, paths, ref, subtree)
+        return len(paths)
+
+    def concat(self, other):
+        """Menyambung semua node other ke akhir list ini dalam O(1); other menjadi kosong"""
+        if other is self or other.head is None:
+            return 0
+        count = other.length
+        if self.indexed and other.indexed:
+            self._set_root(_treap_merge(self.root, other.root))
+        elif self.indexed:
+            self.root, self.indexed = None, False  # Dibangun ulang saat posisi dibutuhkan
+        if self.tail:
+            self.tail.next = other.head
+            other.head.prev = self.tail
+        else:
+            self.head = other.head
+        self.tail = other.tail
+        self.length += count
+        if self.members:
+            self.members.update(other.members)
+        else:
+            self.members = other.members
+        other.head = other.tail = None
+        other.root = None
+        other.length = 0
+        other.members = Counter()
+        other.version += 1
+        self.version += 1
+        return count
+
+    def split(self, node):
+        """Memotong list tepat sebelum node; node sampai akhir dikembalikan sebagai list baru, O(k)"""
+        rest = PlaylistLinkedList()
+        rest.indexed = self.indexed  # Subtree hasil potongan langsung dipakai list baru
+        if node is not None:
+            paths = []
+            current = node
+            while current:
+                paths.append(current.song.file_path)
+                current = current.next
+            last = self.tail
+            subtree = self._detach_range(node, last, paths)
+            rest._attach_range(node, last, paths, None, subtree)
+        return rest
+
+    def __contains__(self, song):
+        return song.file_path in self.members
+
+    def clear(self):
+        """Mengosongkan playlist; objek list tetap sama sehingga view atasnya tetap berlaku"""
+        self.head = self.tail = self.root = None
+        self.length = 0
+        self.members = Counter()
+        self.indexed = False
+        self.version += 1
+
+    def move(self, node, new_index):
+        """Memindahkan node ke posisi new_index dalam O(log n); mengembalikan posisi lamanya"""
+        old_index = self.index_of(node)
+        self._unlink(node)
+        new_index = max(0, min(new_index, self.length))
+        self._insert_before(node, self.node_at(new_index) if new_index < self.length else None)
+        return old_index
+
+    def __iter__(self):
+        """Membuat playlist bisa diiterasi"""
+        current = self.head
+        while current:
+            yield current.song
+            current = current.next
+    
+    def __len__(self):
+        """Mengembalikan jumlah lagu dalam playlist"""
+        return self.length
+
+
+def _treap_size(node):
+    return node.size if node else 0
+
+
+def _treap_update(node):
+    node.size = 1 + _treap_size(node.left) + _treap_size(node.right)
+    if node.left:
+        node.left.parent = node
+    if node.right:
+        node.right.parent = node
+
+
+def _treap_reset(node):
+    node.size = 1
+    node.left = node.right = node.parent = None
+
+
+def _treap_build(node):
+    """Membangun treap dari rantai node (mengikuti next) dalam O(n) memakai tumpukan tulang punggung kanan"""
+    root = None
+    spine = []
+    while node:
+        _treap_reset(node)
+        last = None
+        while spine and spine[-1].priority < node.priority:
+            last = spine.pop()
+            _treap_update(last)
+        node.left = last
+        if spine:
+            spine[-1].right = node
+        else:
+            root = node
+        spine.append(node)
+        node = node.next
+    while spine:
+        _treap_update(spine.pop())
+    return root
+
+
+def _treap_split(node, count):
+    """Memecah treap menjadi (count elemen pertama, sisanya)"""
+    if node is None:
+        return None, None
+    if _treap_size(node.left) < count:
+        left, right = _treap_split(node.right, count - _treap_size(node.left) - 1)
+        node.right = left
+        _treap_update(node)
+        return node, right
+    left, right = _treap_split(node.left, count)
+    node.left = right
+    _treap_update(node)
+    return left, node
+
+
+def _treap_merge(left, right):
+    """Menggabungkan dua treap; semua elemen left berada sebelum right"""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _treap_merge(left.right, right)
+        _treap_update(left)
+        return left
+    right.left = _treap_merge(left, right.left)
+    _treap_update(right)
+    return right
+
+
+class PlaylistView:
+    """Tampilan lazy atas PlaylistLinkedList tanpa menyalin isinya.
+
+    Mendukung len, indeks/slice, jendela (window), pagination berbasis
+    cursor, serta filter dan urutan yang bisa digabung. Tanpa kunci urut,
+    view berjalan langsung di atas node linked list; dengan kunci urut,
+    halaman diambil dengan heap top-k sehingga memori sebanding dengan
+    jumlah lagu yang ditampilkan. Iterasi penuh atas playlist yang sangat
+    besar memakai ExternalSorter bila diberikan. Akses indeks acak pada view
+    terurut/terfilter (dan jendela yang jauh dari awal) memakai daftar yang
+    dibuat sekali per versi playlist.
+    """
+    HEAP_WINDOW = 1000  # Jendela sampai posisi ini diambil dengan heap top-k tanpa materialisasi
+
+    def __init__(self, playlist, predicate=None, key=None, reverse=False, sorter=None):
+        self.playlist = playlist
+        self.predicate = predicate  # Fungsi song -> bool, atau None
+        self.key = key              # Fungsi song -> kunci urut, atau None (urutan playlist)
+        self.reverse = reverse
+        self.sorter = sorter        # ExternalSorter untuk playlist sangat besar, atau None
+        self._count = 0
+        self._count_version = None
+        self._songs = None          # Isi view yang sudah dimaterialisasi, lihat materialize()
+        self._songs_version = None
+
+    def filter(self, predicate):
+        """View baru dengan filter tambahan (digabung dengan AND)"""
+        if self.predicate is not None:
+            previous = self.predicate
+            combined = lambda song: previous(song) and predicate(song)
+        else:
+            combined = predicate
+        return PlaylistView(self.playlist, combined, self.key, self.reverse, self.sorter)
+
+    def sorted(self, key=None, reverse=False):
+        """View baru dengan urutan lain; key None berarti urutan playlist (reverse = dari akhir)"""
+        return PlaylistView(self.playlist, self.predicate, key, reverse, self.sorter)
+
+    def _walk(self, node=None, backward=None):
+        """Node yang lolos filter, mulai dari node (atau dari ujung playlist)"""
+        if backward is None:
+            backward = self.reverse and self.key is None
+        if node is None:
+            node = self.playlist.tail if backward else self.playlist.head
+        predicate = self.predicate
+        while node:
+            if predicate is None or predicate(node.song):
+                yield node
+            node = node.prev if backward else node.next
+
+    def _decorated(self):
+        """Tuple (kunci, posisi, lagu). Untuk kunci yang sama, lagu yang lebih
+        belakang didahulukan, sama seperti hasil merge sort pada PlaylistManager."""
+        key = self.key
+        sign = 1 if self.reverse else -1
+        for position, node in enumerate(self._walk()):
+            yield (key(node.song), sign * position, node.song)
+
+    def _select(self, count, items=None):
+        if items is None:
+            items = self._decorated()
+        select = heapq.nlargest if self.reverse else heapq.nsmallest
+        return select(count, items)
+
+    def materialize(self):
+        """Seluruh isi view sebagai list; dibuat sekali per versi playlist.
+
+        Dipakai untuk akses indeks acak (shuffle, lagu di posisi tertentu)
+        agar view terurut tidak diurutkan ulang untuk setiap indeks.
+        """
+        version = self.playlist.version
+        if self._songs_version != version:
+            self._songs = list(self)
+            self._songs_version = version
+        return self._songs
+
+    def _is_materialized(self):
+        return self._songs_version == self.playlist.version
+
+    def __iter__(self):
+        if self._is_materialized():
+            yield from self._songs
+        elif self.key is None:
+            for node in self._walk():
+                yield node.song
+        elif self.sorter is not None and len(self.playlist) >= self.sorter.threshold:
+            # Kunci dihitung di sini; worker hanya menerima (kunci, posisi, indeks lagu)
+            songs = []
+
+            def keyed():
+                for key, order, song in self._decorated():
+                    songs.append(song)
+                    yield (key, order, len(songs) - 1)
+
+            for index in self.sorter.sort(keyed(), self.reverse):
+                yield songs[index]
+        else:
+            for item in sorted(self._decorated(), reverse=self.reverse):
+                yield item[2]
+
+    def __len__(self):
+        if self.predicate is None:
+            return len(self.playlist)
+        if self._is_materialized():
+            return len(self._songs)
+        if self._count_version != self.playlist.version:
+            self._count = sum(1 for _ in self._walk())
+            self._count_version = self.playlist.version
+        return self._count
+
+    def __bool__(self):
+        return next(self._walk(), None) is not None
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.start or 0, index.stop, index.step or 1
+            if step != 1 or start < 0 or stop is None or stop < 0:
+                start, stop, step = index.indices(len(self))
+                return self.window(start, stop - start)[::step] if stop > start else []
+            return self.window(start, stop - start)
+        if self.key is not None or self.predicate is not None:
+            songs = self.materialize()
+            if not -len(songs) <= index < len(songs):
+                raise IndexError("indeks view di luar jangkauan")
+            return songs[index]
+        if index < 0:
+            index += len(self)
+        songs = self.window(index, 1) if index >= 0 else []
+        if not songs:
+            raise IndexError("indeks view di luar jangkauan")
+        return songs[0]
+
+    def window(self, start, count):
+        """Mengambil paling banyak count lagu mulai dari posisi start"""
+        if count <= 0 or start < 0:
+            return []
+        if self.key is not None or self.predicate is not None:
+            if self._is_materialized() or start + count > self.HEAP_WINDOW:
+                return self.materialize()[start:start + count]
+        if self.key is not None:
+            return [item[2] for item in self._select(start + count)[start:]]
+        if self.predicate is None:
+            # Node awal dicari lewat treap posisi playlist dalam O(log n)
+            length = len(self.playlist)
+            if start >= length:
+                return []
+            node = self.playlist.node_at(length - 1 - start if self.reverse else start)
+            return [node.song for node in itertools.islice(self._walk(node), count)]
+        return [node.song for node in itertools.islice(self._walk(), start, start + count)]
+
+    def page(self, cursor=None, size=50):
+        """Pagination berbasis cursor; mengembalikan (lagu, cursor berikutnya atau None).
+
+        Tanpa urutan, cursor menyimpan node berikutnya sehingga halaman
+        selanjutnya O(size); jika playlist berubah sejak itu, posisi dipakai
+        sebagai cadangan. Dengan urutan, cursor adalah kunci terakhir (keyset).
+        """
+        if self.key is None:
+            version = self.playlist.version
+            if cursor is None:
+                nodes, index = self._walk(), 0
+            else:
+                cursor_version, node, index = cursor
+                if cursor_version == version:
+                    nodes = self._walk(node)
+                else:
+                    nodes = itertools.islice(self._walk(), index, None)
+            page_nodes = list(itertools.islice(nodes, size + 1))
+            songs = [node.song for node in page_nodes[:size]]
+            next_cursor = (version, page_nodes[size], index + size) if len(page_nodes) > size else None
+            return songs, next_cursor
+        items = self._decorated()
+        if cursor is not None:
+            if self.reverse:
+                items = (item for item in items if item[:2] < cursor)
+            else:
+                items = (item for item in items if item[:2] > cursor)
+        selected = self._select(size + 1, items)
+        songs = [item[2] for item in selected[:size]]
+        next_cursor = selected[size - 1][:2] if len(selected) > size else None
+        return songs, next_cursor
+
+    def chunks(self, size=500):
+        """Iterasi berjendela: menghasilkan list berisi paling banyak size lagu"""
+        cursor = None
+        while True:
+            songs, cursor = self.page(cursor, size)
+            if songs:
+                yield songs
+            if cursor is None:
+                return
+
+
+class PlaybackQueue:
+    """Antrian "Up Next" di atas sebuah konteks putar (view playlist yang sedang tampil).
+
+    Konteks tidak disalin: cukup view beserta posisi lagu yang sedang
+    diputar, dan lagu diambil per posisi saat maju/mundur. Hanya lagu yang
+    ditambahkan lewat enqueue/play_next yang disimpan, di linked list ganda
+    + indeks file_path -> node, sehingga enqueue, play-next, remove, reorder
+    dan maju/mundur O(1) (ditambah akses posisi view).
+    """
+    def __init__(self):
+        self.songs = PlaylistLinkedList()  # Lagu antrian eksplisit, sesuai urutan putar
+        self.nodes = {}                    # file_path -> SongNode
+        self.current = None                # Node antrian yang sedang diputar, None bila lagu konteks
+        self.source = None                 # View/list konteks, None bila belum diisi
+        self.position = 0                  # Posisi lagu konteks terakhir di source
+        self.source_song = None            # Lagu konteks terakhir
+
+    def __len__(self):
+        return len(self.songs)
+
+    def __bool__(self):
+        return bool(self.songs) or bool(self.source)
+
+    def __iter__(self):
+        return iter(self.songs)
+
+    def __contains__(self, song):
+        return song.file_path in self.nodes
+
+    def clear(self):
+        self.songs = PlaylistLinkedList()
+        self.nodes = {}
+        self.current = None
+        self.source = None
+        self.source_song = None
+
+    def seed(self, songs, start_index=0):
+        """Memakai songs sebagai konteks putar mulai dari start_index, O(1) tanpa menyalin.
+
+        Lagu antrian eksplisit yang belum diputar tetap diputar lebih dulu.
+        """
+        self.source = songs
+        self.current = None
+        self.source_song = None
+        self._play_source(start_index)
+
+    def _play_source(self, index):
+        length = len(self.source) if self.source is not None else 0
+        if not length:
+            self.source_song = None
+            return None
+        self.position = index % length
+        self.source_song = self.source[self.position]
+        return self.source_song
+
+    def jump_to(self, song):
+        """Menjadikan lagu di antrian sebagai lagu saat ini"""
+        node = self.nodes.get(song.file_path)
+        if node:
+            self.current = node
+        return node is not None
+
+    def current_song(self):
+        return self.current.song if self.current else self.source_song
+
+    def _detach(self, song):
+        """Melepas node lagu bila sudah ada di antrian (agar tidak duplikat)"""
+        node = self.nodes.pop(song.file_path, None)
+        if node:
+            if node is self.current:
+                self.current = None
+            self.songs._unlink(node)
+
+    def enqueue(self, song):
+        """Menambahkan lagu ke akhir antrian"""
+        self._detach(song)
+        node = SongNode(song)
+        self.songs._insert_before(node, None)
+        self.nodes[song.file_path] = node
+
+    def play_next(self, song):
+        """Menyisipkan lagu tepat setelah lagu yang sedang diputar"""
+        if self.current and self.current.song.file_path == song.file_path:
+            return
+        self._detach(song)
+        node = SongNode(song)
+        ref = self.current.next if self.current else self.songs.head
+        self.songs._insert_before(node, ref)
+        self.nodes[song.file_path] = node
+
+    def remove(self, song):
+        """Menghapus lagu dari antrian"""
+        was_present = song.file_path in self.nodes
+        self._detach(song)
+        return was_present
+
+    def move_before(self, song, ref_song=None):
+        """Memindahkan lagu ke sebelum ref_song (None berarti ke akhir)"""
+        node = self.nodes.get(song.file_path)
+        ref = self.nodes.get(ref_song.file_path) if ref_song else None
+        if not node or node is ref:
+            return False
+        is_current = node is self.current
+        self.songs._unlink(node)
+        self.songs._insert_before(node, ref)
+        if is_current:
+            self.current = node
+        return True
+
+    def advance(self):
+        """Maju ke lagu berikutnya: antrian eksplisit lebih dulu (lagu yang selesai
+        dikeluarkan), lalu lagu konteks berikutnya, kembali ke awal setelah yang terakhir"""
+        if self.current is not None:
+            self._detach(self.current.song)
+        if self.songs.head:
+            self.current = self.songs.head
+            return self.current.song
+        return self._play_source(self.position + 1)
+
+    def back(self):
+        """Mundur ke lagu sebelumnya; dari lagu antrian kembali ke lagu konteks terakhir"""
+        if self.current is not None and self.source_song is not None:
+            self.current = None  # Lagu antrian tetap menunggu di depan
+            return self.source_song
+        if not self.source:
+            return self.current_song()
+        self.current = None
+        return self._play_source(self.position - 1)
+
+    def to_dict(self):
+        """Mengubah antrian eksplisit menjadi dictionary untuk penyimpanan (konteks tidak disimpan)"""
+        return {
+            "songs": [song.file_path for song in self.songs],
+            "current": self.current.song.file_path if self.current else None
+        }
+
+    def load(self, data, songs_by_path):
+        """Memulihkan antrian dari hasil to_dict(); konteks diisi lagi saat lagu diputar"""
+        self.clear()
+        for file_path in data.get("songs", []):
+            song = songs_by_path.get(file_path)
+            if song:
+                self.enqueue(song)
+        current = data.get("current")
+        if current in self.nodes:
+            self.current = self.nodes[current]
+
+
+class FenwickTree:
+    """Binary indexed tree untuk jumlah prefiks bobot dan sampling O(log n)"""
+    def __init__(self, weights=()):
+        self.values = [float(w) for w in weights]  # Bobot asli tiap elemen
+        self.tree = [0.0] + self.values
+        self.size = len(self.values)
+        # Bangun dalam O(n): tiap node meneruskan nilainya ke induknya
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[i]
+
+    def update(self, index, weight):
+        """Mengganti bobot elemen ke-index (berbasis 0)"""
+        delta = float(weight) - self.values[index]
+        self.values[index] = float(weight)
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def total(self):
+        """Jumlah seluruh bobot"""
+        result = 0.0
+        i = self.size
+        while i > 0:
+            result += self.tree[i]
+            i -= i & -i
+        return result
+
+    def find(self, target):
+        """Mencari indeks terkecil yang jumlah prefiksnya melebihi target"""
+        pos = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self.tree[nxt] <= target:
+                pos = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        return min(pos, self.size - 1)
+
+
+class ShuffleEngine:
+    """Urutan acak untuk pemutaran: Fisher-Yates malas atau sampling berbobot"""
+    def __init__(self, length, weight_fn=None):
+        self.length = length        # Jumlah lagu yang diacak
+        self.weight_fn = weight_fn  # Jika ada, mode berbobot (weight_fn(index) -> bobot)
+        self.swaps = {}             # Permutasi Fisher-Yates yang baru sebagian dibuat
+        self.drawn = 0              # Banyak posisi permutasi yang sudah diambil
+        self.history = []           # Tumpukan indeks yang sudah diputar (untuk "previous")
+        self.forward = []           # Indeks yang dilewati dengan "previous"
+        self.weights = None         # FenwickTree, dibuat saat pertama dibutuhkan
+
+    def _next_permutation_index(self):
+        """Satu langkah Fisher-Yates inkremental, O(1) per lagu"""
+        if self.drawn >= self.length:  # Satu putaran habis, mulai permutasi baru
+            self.swaps.clear()
+            self.drawn = 0
+        j = random.randint(self.drawn, self.length - 1)
+        picked = self.swaps.get(j, j)
+        self.swaps[j] = self.swaps.get(self.drawn, self.drawn)
+        self.swaps.pop(self.drawn, None)
+        self.drawn += 1
+        return picked
+
+    def _next_weighted_index(self):
+        if self.weights is None:
+            self.weights = FenwickTree(self.weight_fn(i) for i in range(self.length))
+        total = self.weights.total()
+        if total <= 0:
+            return random.randrange(self.length)
+        return self.weights.find(random.random() * total)
+
+    def next(self):
+        """Mengembalikan indeks lagu berikutnya dalam urutan acak"""
+        if self.length == 0:
+            return None
+        if self.forward:
+            index = self.forward.pop()
+        elif self.weight_fn:
+            index = self._next_weighted_index()
+        else:
+            index = self._next_permutation_index()
+        self.history.append(index)
+        return index
+
+    def prev(self):
+        """Mengembalikan indeks lagu sebelumnya dari tumpukan riwayat"""
+        if len(self.history) < 2:
+            return self.history[-1] if self.history else None
+        self.forward.append(self.history.pop())
+        return self.history[-1]
+
+    def mark_played(self, index):
+        """Mencatat lagu yang dipilih langsung oleh pengguna ke riwayat"""
+        self.forward.clear()
+        self.history.append(index)
+
+    def refresh_weight(self, index):
+        """Menghitung ulang bobot satu lagu (dipanggil setelah record_play)"""
+        if self.weights is not None and 0 <= index < self.length:
+            self.weights.update(index, self.weight_fn(index))
+
+
+# ==================================================
+# SORTING EKSTERNAL (PLAYLIST SANGAT BESAR)
+# ==================================================
+def _sort_run(items, reverse, spill_path=None):
+    """Worker: mengurutkan satu chunk; ditulis ke spill_path bila diberikan, jika tidak dikembalikan"""
+    items.sort(reverse=reverse)
+    if spill_path is None:
+        return items
+    batch = ExternalSorter.BATCH_SIZE
+    with open(spill_path, 'wb') as f:
+        for start in range(0, len(items), batch):
+            pickle.dump(items[start:start + batch], f, pickle.HIGHEST_PROTOCOL)
+    return spill_path
+
+
+def _read_run(path):
+    """Membaca kembali run yang di-spill, per batch"""
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            yield from batch
+
+
+class ExternalSorter:
+    """Merge sort eksternal paralel untuk playlist yang sangat besar.
+
+    Input berupa tuple (kunci, pemutus seri, payload) dengan kunci yang
+    sudah dihitung di proses utama. Chunk diurutkan di process pool;
+    selama perkiraan memori masih di bawah memory_budget hasilnya
+    dikembalikan ke proses utama, selebihnya worker menulis run terurut ke
+    file sementara. Semua run lalu disatukan dengan heapq.merge (k-way).
+    Karena pemutus seri unik, urutan hasil sama persis dengan sorted()
+    di memori, tidak bergantung pada pembagian chunk.
+    """
+    THRESHOLD = 250_000       # Di bawah ini PlaylistView tetap memakai sorted() biasa
+    CHUNK_SIZE = 50_000
+    MEMORY_BUDGET = 64 * 1024 * 1024
+    BYTES_PER_ITEM = 160      # Perkiraan memori satu tuple beserta kuncinya
+    BATCH_SIZE = 4096         # Jumlah tuple per pickle di file run
+
+    def __init__(self, workers=None, chunk_size=CHUNK_SIZE, memory_budget=MEMORY_BUDGET,
+                 threshold=THRESHOLD, temp_dir=None):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.chunk_size = chunk_size
+        self.memory_budget = memory_budget
+        self.threshold = threshold
+        self.temp_dir = temp_dir
+        self.pool = None
+        self.pool_lock = threading.Lock()
+
+    def _get_pool(self):
+        with self.pool_lock:
+            if self.pool is None:
+                # "spawn" agar worker tidak mewarisi state SDL/Tk dari proses utama
+                context = multiprocessing.get_context("spawn")
+                self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            return self.pool
+
+    def close(self):
+        with self.pool_lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = None
+
+    def sort(self, items, reverse=False):
+        """Generator payload dari items sesuai urutan (kunci, pemutus seri)"""
+        items = iter(items)
+        first = list(itertools.islice(items, self.chunk_size))
+        if len(first) < self.chunk_size:
+            # Cukup satu chunk: tidak perlu process pool maupun file sementara
+            first.sort(reverse=reverse)
+            for item in first:
+                yield item[2]
+            return
+        with tempfile.TemporaryDirectory(prefix="uas_sort_", dir=self.temp_dir) as temp_dir:
+            runs = self._sorted_runs(itertools.chain(first, items), reverse, temp_dir)
+            del first
+            for item in heapq.merge(*runs, reverse=reverse):
+                yield item[2]
+
+    def _sorted_runs(self, items, reverse, temp_dir):
+        pool = self._get_pool()
+        pending = deque()
+        runs = []
+        resident = 0  # Perkiraan byte run yang disimpan di memori
+        max_pending = self.workers * 2  # Membatasi chunk yang menunggu di memori
+
+        def collect():
+            result = pending.popleft().result()
+            runs.append(_read_run(result) if isinstance(result, str) else result)
+
+        while True:
+            chunk = list(itertools.islice(items, self.chunk_size))
+            if not chunk:
+                break
+            size = len(chunk) * self.BYTES_PER_ITEM
+            spill_path = None
+            if resident + size > self.memory_budget:
+                spill_path = os.path.join(temp_dir, f"run_{len(runs) + len(pending)}.pkl")
+            else:
+                resident += size
+            pending.append(pool.submit(_sort_run, chunk, reverse, spill_path))
+            if len(pending) >= max_pending:
+                collect()
+        while pending:
+            collect()
+        return runs
+
+
+# ==================================================
+# STRUKTUR DATA PERSISTEN (UNTUK UNDO/REDO)
+# ==================================================
+class _PersistentNode:
+    """Node treap yang tidak pernah diubah setelah dibuat (path copying)"""
+    __slots__ = ("key", "value", "priority", "size", "left", "right")
+
+    def __init__(self, key, value, priority, left=None, right=None):
+        self.key = key
+        self.value = value
+        self.priority = priority
+        self.left = left
+        self.right = right
+        self.size = 1 + (left.size if left else 0) + (right.size if right else 0)
+
+    def copy(self, left, right):
+        return _PersistentNode(self.key, self.value, self.priority, left, right)
+
+
+def _persistent_split_at(node, count):
+    """Seperti _treap_split, tetapi menyalin node di jalur alih-alih mengubahnya"""
+    if node is None:
+        return None, None
+    left_size = node.left.size if node.left else 0
+    if left_size < count:
+        left, right = _persistent_split_at(node.right, count - left_size - 1)
+        return node.copy(node.left, left), right
+    left, right = _persistent_split_at(node.left, count)
+    return left, node.copy(right, node.right)
+
+
+def _persistent_split_key(node, key, inclusive):
+    """Memecah menjadi (kunci < key, sisanya); inclusive=True memakai <= key"""
+    if node is None:
+        return None, None
+    goes_left = node.key <= key if inclusive else node.key < key
+    if goes_left:
+        left, right = _persistent_split_key(node.right, key, inclusive)
+        return node.copy(node.left, left), right
+    left, right = _persistent_split_key(node.left, key, inclusive)
+    return left, node.copy(right, node.right)
+
+
+def _persistent_merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        return left.copy(left.left, _persistent_merge(left.right, right))
+    return right.copy(_persistent_merge(left, right.left), right.right)
+
+
+def _persistent_iter(node):
+    stack = []
+    while stack or node:
+        while node:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        yield node
+        node = node.right
+
+
+class PersistentSequence:
+    """Urutan immutable; setiap perubahan menghasilkan versi baru dengan O(log n) node baru"""
+    __slots__ = ("root",)
+
+    def __init__(self, root=None):
+        self.root = root
+
+    @classmethod
+    def from_iterable(cls, values):
+        sequence = cls()
+        for value in values:
+            sequence = sequence.append(value)
+        return sequence
+
+    def __len__(self):
+        return self.root.size if self.root else 0
+
+    def __iter__(self):
+        for node in _persistent_iter(self.root):
+            yield node.value
+
+    def insert(self, index, value):
+        left, right = _persistent_split_at(self.root, index)
+        node = _PersistentNode(None, value, random.random())
+        return PersistentSequence(_persistent_merge(_persistent_merge(left, node), right))
+
+    def append(self, value):
+        return self.insert(len(self), value)
+
+    def delete(self, index):
+        left, rest = _persistent_split_at(self.root, index)
+        _, right = _persistent_split_at(rest, 1)
+        return PersistentSequence(_persistent_merge(left, right))
+
+    def set(self, index, value):
+        return self.delete(index).insert(index, value)
+
+
+class PersistentMap:
+    """Dictionary immutable berbasis treap dengan path copying"""
+    __slots__ = ("root",)
+
+    def __init__(self, root=None):
+        self.root = root
+
+    @classmethod
+    def from_items(cls, items):
+        mapping = cls()
+        for key, value in items:
+            mapping = mapping.set(key, value)
+        return mapping
+
+    def __len__(self):
+        return self.root.size if self.root else 0
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key, default=None):
+        node = self.root
+        while node:
+            if key == node.key:
+                return node.value
+            node = node.left if key < node.key else node.right
+        return default
+
+    def set(self, key, value):
+        left, rest = _persistent_split_key(self.root, key, inclusive=False)
+        _, right = _persistent_split_key(rest, key, inclusive=True)
+        node = _PersistentNode(key, value, random.random())
+        return PersistentMap(_persistent_merge(_persistent_merge(left, node), right))
+
+    def delete(self, key):
+        left, rest = _persistent_split_key(self.root, key, inclusive=False)
+        _, right = _persistent_split_key(rest, key, inclusive=True)
+        return PersistentMap(_persistent_merge(left, right))
+
+    def items(self):
+        for node in _persistent_iter(self.root):
+            yield node.key, node.value
+
+    def keys(self):
+        for node in _persistent_iter(self.root):
+            yield node.key
+
+
+_MISSING = object()
+
+
+class LibraryState:
+    """Satu versi library: playlist, favorit, statistik; berbagi struktur dengan versi lain"""
+    __slots__ = ("playlists", "favorites", "stats", "current_playlist")
+
+    def __init__(self, playlists=None, favorites=None, stats=None, current_playlist="Default"):
+        self.playlists = playlists or PersistentMap()  # nama -> PersistentSequence rekaman lagu
+        self.favorites = favorites or PersistentMap()  # file_path -> True
+        self.stats = stats or PersistentMap()          # file_path -> (play_count, last_played)
+        self.current_playlist = current_playlist
+
+    def replace(self, **changes):
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return LibraryState(**fields)
+
+
+class LibraryHistory:
+    """Riwayat undo/redo berupa tumpukan versi LibraryState yang dibatasi max_steps"""
+    def __init__(self, max_steps=1000):
+        self.state = LibraryState()
+        self.undo_stack = deque(maxlen=max_steps)  # (label, versi sebelum perubahan)
+        self.redo_stack = []
+        self.baseline = {}  # nama -> rekaman playlist saat pertama kali dimuat dari disk
+
+    def reset(self, state):
+        self.state = state
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.baseline = {}
+
+    def commit(self, label, new_state):
+        """Mencatat versi baru; versi lama masuk ke tumpukan undo"""
+        self.undo_stack.append((label, self.state))
+        self.redo_stack.clear()
+        self.state = new_state
+
+    def track_playlist(self, name, records):
+        """Mencatat isi playlist yang pertama kali dimuat dari disk, tanpa menyentuh riwayat.
+
+        Playlist yang belum pernah dimuat berarti belum pernah berubah sejak
+        sesi dimulai, sehingga versi yang tidak mencatatnya memakai isi ini
+        (lihat sequence). Playlist yang sudah tercatat dilewati.
+        """
+        if name in self.baseline or name in self.state.playlists:
+            return
+        self.baseline[name] = PersistentSequence.from_iterable(records)
+
+    def sequence(self, playlists, name):
+        """Rekaman playlist name di peta playlist sebuah versi; None bila tidak ada"""
+        sequence = playlists.get(name, _MISSING)
+        return self.baseline.get(name) if sequence is _MISSING else sequence
+
+    def without(self, playlists, name):
+        """Peta playlist tanpa name; playlist baseline ditandai None agar tidak kembali dari baseline"""
+        return playlists.set(name, None) if name in self.baseline else playlists.delete(name)
+
+    def playlist_names(self, playlists):
+        names = [name for name, sequence in playlists.items() if sequence is not None]
+        return names + [name for name in self.baseline if name not in playlists]
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def undo(self):
+        """Mengembalikan (label, versi) yang harus dipulihkan, atau None"""
+        if not self.undo_stack:
+            return None
+        label, previous = self.undo_stack.pop()
+        self.redo_stack.append((label, self.state))
+        self.state = previous
+        return label, previous
+
+    def redo(self):
+        if not self.redo_stack:
+            return None
+        label, following = self.redo_stack.pop()
+        self.undo_stack.append((label, self.state))
+        self.state = following
+        return label, following
+
+
+class Song:
+    """Kelas untuk merepresentasikan sebuah lagu beserta metadatanya"""
+    def __init__(self, title, artist, album, duration, file_path, playlist="Default"):
+        self.title = title       # Judul lagu
+        self.artist = artist     # Nama artis
+        self.album = album       # Nama album
+        self.duration = duration # Durasi lagu (format MM:SS)
+        self.file_path = file_path # Lokasi file lagu
+        self.playlist = playlist # Nama playlist
+        self.play_count = 0      # Jumlah kali diputar
+        self.last_played = None  # Waktu terakhir diputar
+
+    def to_dict(self):
+        """Mengubah objek lagu menjadi dictionary untuk penyimpanan"""
+        return {
+            "title": self.title,
+            "artist": self.artist,
+            "album": self.album,
+            "duration": self.duration,
+            "file_path": self.file_path,
+            "playlist": self.playlist,
+            "play_count": self.play_count,
+            "last_played": self.last_played
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Kebalikan dari to_dict(); field yang hilang diberi nilai bawaan"""
+        song = cls(
+            title=data.get('title', 'Unknown Title'),
+            artist=data.get('artist', 'Unknown Artist'),
+            album=data.get('album', 'Unknown Album'),
+            duration=data.get('duration', '0:00'),
+            file_path=data.get('file_path'),
+            playlist=data.get('playlist', 'Default')
+        )
+        song.play_count = data.get('play_count', 0)
+        song.last_played = data.get('last_played', None)
+        return song
+
+    def to_record(self):
+        """Rekaman immutable metadata lagu untuk riwayat undo/redo"""
+        return (self.title, self.artist, self.album, self.duration, self.file_path)
+
+    def get_duration_seconds(self):
+        """Mengubah durasi lagu menjadi detik"""
+        try:
+            minutes, seconds = map(int, self.duration.split(':'))
+            return minutes * 60 + seconds
+        except ValueError:
+            return 0
+
+
+# ==================================================
+# PENCARIAN FUZZY (TAHAN SALAH KETIK)
+# ==================================================
+def _trigrams(text):
+    """Himpunan trigram kata-kata dalam teks (diberi spasi agar awal kata ikut terhitung)"""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def _bounded_levenshtein(a, b, limit):
+    """Jarak edit a-b; berhenti lebih awal dan mengembalikan limit+1 jika melebihi limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, char_b in enumerate(b, 1):
+            cost = 0 if char_a == char_b else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            current.append(value)
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class FuzzySearchIndex:
+    """Indeks trigram untuk pencarian fuzzy judul/artis/album.
+
+    Kandidat dicari lewat posting list trigram, lalu hanya sejumlah kecil
+    kandidat teratas yang diberi peringkat dengan jarak edit, sehingga biaya
+    peringkat tidak bertambah seiring ukuran library.
+    """
+    FIELD_WEIGHTS = (("title", 3.0), ("artist", 2.0), ("album", 1.0))
+
+    def __init__(self, max_candidates=200):
+        self.max_candidates = max_candidates
+        self.songs = {}     # file_path -> Song
+        self.grams = {}     # file_path -> trigram lagu (untuk menghapus dari posting list)
+        self.postings = {}  # trigram -> set(file_path)
+        self.pending = {}   # Lagu yang belum diindeks (indeks dibangun saat pertama dipakai)
+
+    def rebuild(self, songs):
+        """Mengganti isi indeks; pembangunan ditunda sampai pencarian fuzzy pertama"""
+        self.songs, self.grams, self.postings = {}, {}, {}
+        self.pending = {song.file_path: song for song in songs}
+
+    def _ensure_built(self):
+        pending, self.pending = self.pending, {}
+        for song in pending.values():
+            self._index(song)
+
+    def add(self, song):
+        """Menambahkan atau mengindeks ulang lagu (misalnya setelah metadata diedit)"""
+        if self.pending:
+            self.pending[song.file_path] = song
+            return
+        self._index(song)
+
+    def _index(self, song):
+        if song.file_path in self.songs:
+            self.remove(song)
+        grams = set()
+        for field, _ in self.FIELD_WEIGHTS:
+            grams |= _trigrams(getattr(song, field, "").lower())
+        self.songs[song.file_path] = song
+        self.grams[song.file_path] = grams
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(song.file_path)
+
+    def remove(self, song):
+        self.remove_path(song.file_path)
+
+    def remove_path(self, file_path):
+        self.pending.pop(file_path, None)
+        grams = self.grams.pop(file_path, ())
+        self.songs.pop(file_path, None)
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting:
+                posting.discard(file_path)
+                if not posting:
+                    del self.postings[gram]
+
+    def _field_similarity(self, query_words, text):
+        """Rata-rata kemiripan terbaik tiap kata query terhadap kata-kata di field"""
+        words = text.lower().split()
+        if not words:
+            return 0.0
+        total = 0.0
+        for query_word in query_words:
+            limit = max(1, len(query_word) // 3)  # Toleransi ~1 salah ketik per 3 huruf
+            best = 0.0
+            for word in words:
+                if word.startswith(query_word):
+                    best = 1.0
+                    break
+                distance = _bounded_levenshtein(query_word, word[:len(query_word) + limit], limit)
+                if distance <= limit:
+                    best = max(best, 1.0 - distance / (len(query_word) + 1))
+            total += best
+        return total / len(query_words)
+
+    def search(self, query, allowed_paths=None, limit=50):
+        """Mengembalikan hingga limit lagu terbaik untuk query, berurutan dari skor tertinggi"""
+        query_words = query.lower().split()
+        if not query_words:
+            return []
+        self._ensure_built()
+        query_grams = _trigrams(" ".join(query_words))
+        overlap = Counter()
+        for gram in query_grams:
+            for path in self.postings.get(gram, ()):
+                overlap[path] += 1
+        if allowed_paths is not None:
+            overlap = Counter({path: count for path, count in overlap.items() if path in allowed_paths})
+        minimum = max(1, len(query_grams) // 4)
+        candidates = heapq.nlargest(self.max_candidates,
+                                    (item for item in overlap.items() if item[1] >= minimum),
+                                    key=lambda item: item[1])
+        scored = []
+        for path, count in candidates:
+            song = self.songs[path]
+            score = max(weight * self._field_similarity(query_words, getattr(song, field, ""))
+                        for field, weight in self.FIELD_WEIGHTS)
+            if score > 0:
+                # Overlap trigram sebagai pemecah seri antar skor yang sama
+                scored.append((score + count / (10 * len(query_grams)), path))
+        return [self.songs[path] for _, path in heapq.nlargest(limit, scored)]
+
+
+# ==================================================
+# INDEKS FACET (JELAJAH ARTIS/ALBUM)
+# ==================================================
+class FacetIndex:
+    """Indeks artis -> album -> lagu dan album -> lagu untuk satu playlist.
+
+    Himpunan anggota dan jumlahnya dijaga secara inkremental, sehingga daftar
+    artis/album dan filter per facet tidak perlu memindai metadata lagu.
+    """
+    def __init__(self, songs=()):
+        self.entries = {}        # file_path -> (artis, album) saat diindeks
+        self.artists = {}        # artis -> {album -> set(file_path)}
+        self.artist_counts = {}  # artis -> jumlah lagu
+        self.albums = {}         # album -> set(file_path)
+        for song in songs:
+            self.add(song)
+
+    def add(self, song):
+        """Menambahkan lagu, atau mengindeks ulang bila artis/albumnya berubah"""
+        key = (song.artist, song.album)
+        old = self.entries.get(song.file_path)
+        if old == key:
+            return
+        if old is not None:
+            self.remove_path(song.file_path)
+        self.entries[song.file_path] = key
+        artist, album = key
+        self.artists.setdefault(artist, {}).setdefault(album, set()).add(song.file_path)
+        self.artist_counts[artist] = self.artist_counts.get(artist, 0) + 1
+        self.albums.setdefault(album, set()).add(song.file_path)
+
+    def remove_path(self, file_path):
+        key = self.entries.pop(file_path, None)
+        if key is None:
+            return
+        artist, album = key
+        artist_albums = self.artists[artist]
+        artist_albums[album].discard(file_path)
+        if not artist_albums[album]:
+            del artist_albums[album]
+        self.artist_counts[artist] -= 1
+        if not self.artist_counts[artist]:
+            del self.artist_counts[artist]
+            del self.artists[artist]
+        self.albums[album].discard(file_path)
+        if not self.albums[album]:
+            del self.albums[album]
+
+    def artist_list(self):
+        """Daftar (artis, jumlah lagu) urut abjad"""
+        return sorted(self.artist_counts.items(), key=lambda item: item[0].lower())
+
+    def album_list(self, artist=None):
+        """Daftar (album, jumlah lagu), untuk satu artis atau semua album"""
+        albums = self.artists.get(artist, {}) if artist is not None else self.albums
+        return sorted(((album, len(paths)) for album, paths in albums.items()), key=lambda item: item[0].lower())
+
+    def members(self, artist=None, album=None):
+        """Himpunan file_path untuk artis dan/atau album tertentu"""
+        if artist is None:
+            return self.albums.get(album, set())
+        artist_albums = self.artists.get(artist, {})
+        if album is None:
+            return set().union(*artist_albums.values())
+        return artist_albums.get(album, set())
+
+
+# ==================================================
+# PEMBACA METADATA MP3 CEPAT
+# ==================================================
+# Tabel bitrate (kbps) per [versi MPEG1?][layer] dan sample rate per versi
+_MPEG_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MPEG_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+_ID3_TEXT_FRAMES = {"TIT2": "title", "TPE1": "artist", "TALB": "album",
+                    "TT2": "title", "TP1": "artist", "TAL": "album"}
+_ID3_ENCODINGS = ("latin-1", "utf-16", "utf-16-be", "utf-8")
+
+
+def _synchsafe(data):
+    """Bilangan 28-bit ID3 yang tiap bytenya hanya memakai 7 bit"""
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def _decode_id3_text(payload):
+    if not payload:
+        return None
+    encoding = _ID3_ENCODINGS[payload[0]] if payload[0] < 4 else "latin-1"
+    text = payload[1:].decode(encoding, errors="replace")
+    return text.split("\x00")[0].strip() or None
+
+
+def parse_mpeg_frame_header(header):
+    """Mengurai header frame MPEG 4 byte; None jika bukan header valid.
+
+    Mengembalikan (panjang_frame, sampel_per_frame, sample_rate, bitrate_kbps, info).
+    """
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+    version_bits = (header[1] >> 3) & 0x03   # 3 = MPEG1, 2 = MPEG2, 0 = MPEG2.5
+    layer_bits = (header[1] >> 1) & 0x03     # 3 = Layer I, 2 = Layer II, 1 = Layer III
+    bitrate_index = header[2] >> 4
+    sample_rate_index = (header[2] >> 2) & 0x03
+    if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    is_mpeg1 = version_bits == 3
+    layer = 4 - layer_bits
+    padding = (header[2] >> 1) & 0x01
+    mono = (header[3] >> 6) == 3
+    bitrate = _MPEG_BITRATES[(is_mpeg1, layer)][bitrate_index]
+    sample_rate = _MPEG_SAMPLE_RATES[version_bits][sample_rate_index]
+    if layer == 1:
+        samples = 384
+        frame_length = (12 * bitrate * 1000 // sample_rate + padding) * 4
+    else:
+        samples = 1152 if (layer == 2 or is_mpeg1) else 576
+        frame_length = (samples // 8) * bitrate * 1000 // sample_rate + padding
+    return frame_length, samples, sample_rate, bitrate, {"mpeg1": is_mpeg1, "layer": layer, "mono": mono}
+
+
+def _xing_offset(info):
+    """Posisi tag Xing/Info di frame pertama: setelah header 4 byte dan side info"""
+    side_info = (17 if info["mono"] else 32) if info["mpeg1"] else (9 if info["mono"] else 17)
+    return 4 + side_info
+
+
+def read_mp3_metadata(file_path):
+    """Membaca tag ID3v2 dan durasi MP3 tanpa memindai seluruh file.
+
+    Hanya header tag, frame teks, awal frame APIC dan frame MPEG pertama
+    yang dibaca. Durasi diambil dari header Xing/Info atau VBRI, atau
+    dihitung dari ukuran file untuk MP3 CBR. Mengembalikan None jika file
+    tidak dapat diurai sehingga pemanggil bisa kembali ke eyed3.
+    """
+    result = {"title": None, "artist": None, "album": None, "duration": None,
+              "art_offset": None, "art_size": 0, "art_mime": None, "unsynchronised": False}
+    try:
+        file_size = os.path.getsize(file_path)
+        with open(file_path, "rb") as f:
+            header = f.read(10)
+            audio_start = 0
+            if header[:3] == b"ID3" and len(header) == 10:
+                major = header[3]
+                flags = header[5]
+                tag_size = _synchsafe(header[6:10])
+                audio_start = 10 + tag_size + (10 if flags & 0x10 else 0)
+                result["unsynchronised"] = bool(flags & 0x80)
+                _read_id3_frames(f, major, flags, 10 + tag_size, result)
+
+            # Cari sinkronisasi frame MPEG pertama setelah tag
+            f.seek(audio_start)
+            chunk = f.read(16384)
+            position = 0
+            frame = None
+            while position < len(chunk) - 4:
+                position = chunk.find(b"\xff", position)
+                if position < 0 or position > len(chunk) - 4:
+                    break
+                frame = parse_mpeg_frame_header(chunk[position:position + 4])
+                if frame:
+                    break
+                position += 1
+            if not frame:
+                return None
+            frame_length, samples, sample_rate, bitrate, info = frame
+            frame_data = chunk[position:position + max(frame_length, 200)]
+
+            xing_offset = _xing_offset(info)
+            frame_count = None
+            if frame_data[xing_offset:xing_offset + 4] in (b"Xing", b"Info"):
+                xing_flags = struct.unpack(">I", frame_data[xing_offset + 4:xing_offset + 8])[0]
+                if xing_flags & 0x01:
+                    frame_count = struct.unpack(">I", frame_data[xing_offset + 8:xing_offset + 12])[0]
+            elif frame_data[36:40] == b"VBRI":
+                frame_count = struct.unpack(">I", frame_data[50:54])[0]
+
+            if frame_count:
+                result["duration"] = frame_count * samples / sample_rate
+            else:
+                # MP3 CBR: durasi = ukuran data audio / bitrate (abaikan tag ID3v1 di akhir)
+                audio_end = file_size
+                if file_size >= 128:
+                    f.seek(file_size - 128)
+                    if f.read(3) == b"TAG":
+                        audio_end -= 128
+                audio_bytes = audio_end - (audio_start + position)
+                result["duration"] = audio_bytes * 8 / (bitrate * 1000)
+    except (OSError, struct.error, ValueError, IndexError):
+        return None
+    return result
+
+
+def _read_id3_frames(f, major, flags, tag_end, result):
+    """Membaca frame teks dan posisi APIC dari tag ID3v2 (v2.2 - v2.4)"""
+    position = 10
+    if flags & 0x40 and major >= 3:  # Lewati extended header
+        f.seek(10)
+        ext = f.read(4)
+        position += _synchsafe(ext) if major == 4 else 4 + struct.unpack(">I", ext)[0]
+    header_size = 6 if major == 2 else 10
+    while position + header_size <= tag_end:
+        f.seek(position)
+        frame_header = f.read(header_size)
+        if len(frame_header) < header_size or frame_header[0] == 0:
+            break  # Masuk ke area padding
+        if major == 2:
+            frame_id = frame_header[:3].decode("latin-1")
+            size = int.from_bytes(frame_header[3:6], "big")
+        else:
+            frame_id = frame_header[:4].decode("latin-1")
+            size = _synchsafe(frame_header[4:8]) if major == 4 else struct.unpack(">I", frame_header[4:8])[0]
+        data_start = position + header_size
+        if frame_id in _ID3_TEXT_FRAMES and size < 4096:
+            result[_ID3_TEXT_FRAMES[frame_id]] = _decode_id3_text(f.read(size))
+        elif frame_id in ("APIC", "PIC") and result["art_offset"] is None and not result["unsynchronised"]:
+            _read_picture_offset(f, frame_id, data_start, size, result)
+        position = data_start + size
+
+
+def _read_picture_offset(f, frame_id, data_start, size, result):
+    """Mencatat posisi data gambar APIC tanpa membaca gambarnya"""
+    head = f.read(min(size, 512))
+    encoding = head[0]
+    if frame_id == "PIC":
+        mime = "image/" + head[1:4].decode("latin-1").lower()
+        cursor = 5
+    else:
+        mime_end = head.index(b"\x00", 1)
+        mime = head[1:mime_end].decode("latin-1")
+        cursor = mime_end + 2  # Lewati null dan byte jenis gambar
+    # Deskripsi diakhiri null tunggal (latin-1/utf-8) atau null ganda (utf-16)
+    if encoding in (1, 2):
+        while head[cursor:cursor + 2] != b"\x00\x00":
+            if cursor >= len(head):
+                raise ValueError("deskripsi APIC tidak diakhiri null")
+            cursor += 2
+        cursor += 2
+    else:
+        cursor = head.index(b"\x00", cursor) + 1
+    result["art_offset"] = data_start + cursor
+    result["art_size"] = size - cursor
+    result["art_mime"] = mime
+
+
+def read_mp3_art(file_path, metadata):
+    """Membaca data gambar sampul berdasarkan art_offset dari read_mp3_metadata"""
+    if not metadata or metadata["art_offset"] is None:
+        return None
+    with open(file_path, "rb") as f:
+        f.seek(metadata["art_offset"])
+        return f.read(metadata["art_size"])
+
+
+def read_song_metadata(file_path):
+    """Metadata lagu untuk import: parser cepat dahulu, eyed3 hanya sebagai cadangan."""
+    title = os.path.splitext(os.path.basename(file_path))[0]
+    artist = "Artis Tidak Dikenal"
+    album = "Album Tidak Dikenal"
+    duration_str = "00:00"
+
+    metadata = read_mp3_metadata(file_path)
+    if metadata and not metadata["unsynchronised"]:
+        duration_sec = metadata["duration"]
+        title = metadata["title"] or title
+        artist = metadata["artist"] or artist
+        album = metadata["album"] or album
+    else:
+        duration_sec = None
+        audiofile = eyed3.load(file_path)
+        if audiofile:
+            if audiofile.info:
+                duration_sec = audiofile.info.time_secs
+            if audiofile.tag:
+                tag = audiofile.tag
+                title = tag.title or title
+                artist = tag.artist or artist
+                album = tag.album or album
+    if duration_sec:
+        duration_str = time.strftime('%M:%S', time.gmtime(duration_sec))
+    return {"title": title, "artist": artist, "album": album, "duration": duration_str}
+
+
+def load_album_art(file_path, size=(80, 80)):
+    """Membaca dan memperkecil cover album (PIL Image atau None); aman dari thread worker"""
+    image_data = None
+    metadata = read_mp3_metadata(file_path)
+    if metadata and not metadata["unsynchronised"]:
+        image_data = read_mp3_art(file_path, metadata)
+    else:
+        audiofile = eyed3.load(file_path)
+        if audiofile and audiofile.tag and audiofile.tag.images:
+            image_data = audiofile.tag.images[0].image_data
+    if not image_data:
+        return None
+    img = Image.open(io.BytesIO(image_data))
+    img.thumbnail(size)
+    return img
+
+
+def read_songs_metadata(file_paths, job):
+    """Membaca metadata banyak file untuk impor; daftar (path, metadata, error)"""
+    results = []
+    for i, file_path in enumerate(file_paths):
+        job.check()
+        try:
+            results.append((file_path, read_song_metadata(file_path), None))
+        except Exception as e:
+            results.append((file_path, None, e))
+        job.report((i + 1, len(file_paths)))
+    return results
+
+
+# ==================================================
+# TABEL SEEK MP3
+# ==================================================
+class SeekTable:
+    """Offset byte tiap frame MPEG sebuah file; seek akurat juga untuk MP3 VBR.
+
+    Semua frame dalam satu file memiliki jumlah sampel yang sama, sehingga
+    waktu frame ke-i cukup i * samples / sample_rate.
+    """
+    def __init__(self, offsets, samples, sample_rate):
+        self.offsets = offsets      # array('I') posisi byte awal tiap frame audio
+        self.samples = samples      # Sampel per frame (1152 / 576 / 384)
+        self.sample_rate = sample_rate
+
+    @property
+    def duration(self):
+        return len(self.offsets) * self.samples / self.sample_rate
+
+    def offset_for(self, seconds):
+        """(offset byte, waktu sebenarnya) dari frame yang memuat detik ke-seconds"""
+        index = int(seconds * self.sample_rate / self.samples)
+        index = max(0, min(index, len(self.offsets) - 1))
+        return self.offsets[index], index * self.samples / self.sample_rate
+
+
+def build_seek_table(file_path):
+    """Memindai semua header frame MPEG sebuah file; None jika bukan MP3 yang bisa diurai"""
+    with open(file_path, "rb") as f:
+        data = f.read()
+    position = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        position = 10 + _synchsafe(data[6:10]) + (10 if data[5] & 0x10 else 0)
+    end = len(data) - 128 if data[-128:-125] == b"TAG" else len(data)
+    offsets = array("I")
+    samples = sample_rate = None
+    while position + 4 <= end:
+        frame = parse_mpeg_frame_header(data[position:position + 4])
+        if frame is None or (samples is not None and (frame[1], frame[2]) != (samples, sample_rate)):
+            # Sinkronisasi ulang: cari byte 0xFF berikutnya
+            position = data.find(b"\xff", position + 1, end)
+            if position < 0:
+                break
+            continue
+        frame_length, frame_samples, frame_rate, _, info = frame
+        if samples is None:
+            samples, sample_rate = frame_samples, frame_rate
+            xing = position + _xing_offset(info)
+            if data[xing:xing + 4] in (b"Xing", b"Info") or data[position + 36:position + 40] == b"VBRI":
+                position += frame_length  # Frame info tidak berisi audio
+                continue
+        offsets.append(position)
+        position += frame_length
+    if not offsets:
+        return None
+    return SeekTable(offsets, samples, sample_rate)
+
+
+class SeekTableCache:
+    """Cache SeekTable per (file_path, mtime): LRU kecil di memori dan file biner di disk.
+
+    load_or_build dipanggil dari thread worker; get hanya membaca memori
+    sehingga aman dan murah di thread Tk.
+    """
+    MAX_ENTRIES = 32
+    HEADER = struct.Struct("<dII")  # mtime, sampel per frame, sample rate
+
+    def __init__(self, directory="seek_tables", max_entries=MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.tables = OrderedDict()  # file_path -> (mtime, SeekTable)
+        self.lock = threading.Lock()
+
+    def _disk_path(self, file_path):
+        name = hashlib.sha1(file_path.encode("utf-8", "surrogateescape")).hexdigest()[:20]
+        return os.path.join(self.directory, name + ".bin")
+
+    def get(self, file_path):
+        """Tabel di memori yang masih cocok dengan mtime file, atau None"""
+        with self.lock:
+            entry = self.tables.get(file_path)
+        if entry is None:
+            return None
+        try:
+            if os.path.getmtime(file_path) != entry[0]:
+                return None
+        except OSError:
+            return None
+        with self.lock:
+            if file_path in self.tables:
+                self.tables.move_to_end(file_path)
+        return entry[1]
+
+    def _read(self, file_path, mtime):
+        try:
+            with open(self._disk_path(file_path), "rb") as f:
+                raw = f.read()
+        except OSError:
+            return None
+        if len(raw) < self.HEADER.size:
+            return None
+        cached_mtime, samples, sample_rate = self.HEADER.unpack_from(raw)
+        body = raw[self.HEADER.size:]
+        if cached_mtime != mtime or not sample_rate or len(body) % array("I").itemsize:
+            return None
+        offsets = array("I")
+        offsets.frombytes(body)
+        return SeekTable(offsets, samples, sample_rate)
+
+    def _write(self, file_path, mtime, table):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._disk_path(file_path)
+        with open(path + ".tmp", "wb") as f:
+            f.write(self.HEADER.pack(mtime, table.samples, table.sample_rate))
+            f.write(table.offsets.tobytes())
+        os.replace(path + ".tmp", path)
+
+    def load_or_build(self, file_path):
+        """Memuat tabel dari disk bila mtime cocok, selain itu membangun dan menyimpannya"""
+        mtime = os.path.getmtime(file_path)
+        table = self._read(file_path, mtime)
+        if table is None:
+            table = build_seek_table(file_path)
+            if table is None:
+                return None
+            self._write(file_path, mtime, table)
+        with self.lock:
+            self.tables[file_path] = (mtime, table)
+            self.tables.move_to_end(file_path)
+            while len(self.tables) > self.max_entries:
+                self.tables.popitem(last=False)
+        return table
+
+
+class OffsetFile(io.RawIOBase):
+    """File yang dilihat mulai dari offset byte tertentu.
+
+    Dipakai untuk memuat MP3 langsung dari sebuah frame di tengah file,
+    sehingga seek tidak perlu mendekode dari awal.
+    """
+    def __init__(self, file_path, offset):
+        super().__init__()
+        self.file = open(file_path, "rb")
+        self.offset = offset
+        self.file.seek(offset)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        return self.file.readinto(buffer)
+
+    def seek(self, position, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self.file.seek(self.offset + max(0, position))
+        else:
+            self.file.seek(position, whence)
+            if self.file.tell() < self.offset:
+                self.file.seek(self.offset)
+        return self.tell()
+
+    def tell(self):
+        return self.file.tell() - self.offset
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+
+# ==================================================
+# PENJADWAL TUGAS LATAR BELAKANG
+# ==================================================
+class JobCancelled(Exception):
+    """Dilempar oleh tugas yang berhenti karena dibatalkan"""
+
+
+class Job:
+    """Satu tugas terjadwal; juga berfungsi sebagai token pembatalan kooperatif"""
+    def __init__(self, fn, args, priority, use_process, pass_job, on_done, on_error, on_progress, name, scheduler):
+        self.fn = fn
+        self.args = args
+        self.priority = priority
+        self.use_process = use_process
+        self.pass_job = pass_job    # fn dipanggil dengan argumen job= untuk cek batal/progres
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.name = name or getattr(fn, "__name__", "tugas")
+        self.scheduler = scheduler
+        self.future = None
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Membatalkan tugas; hasil yang sudah terlanjur dikirim tidak akan diproses"""
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def check(self):
+        """Dipanggil berkala oleh tugas panjang untuk berhenti bila dibatalkan"""
+        if self.cancelled:
+            raise JobCancelled()
+
+    def report(self, value):
+        """Mengirim progres ke thread utama"""
+        self.scheduler._post(self, self.on_progress, value)
+
+
+class JobScheduler:
+    """Menjalankan tugas di thread worker (atau process pool) berdasarkan prioritas.
+
+    Tugas interaktif selalu diambil lebih dulu daripada tugas latar. Tugas
+    proses menunggu di heap tersendiri dan baru dikirim ke process pool bila
+    ada slot kosong (paling banyak process_workers yang berjalan), sehingga
+    prioritas dan pembatalan tetap berlaku sampai tugas benar-benar dimulai.
+    Hasil, error, dan progres dikirim lewat queue.Queue yang dikuras di thread
+    utama (Tk) oleh poll(), sehingga callback aman menyentuh widget.
+    """
+    INTERACTIVE = 0
+    NORMAL = 5
+    BACKGROUND = 10
+
+    def __init__(self, thread_workers=4, process_workers=None, process_initializer=None, on_error=None):
+        self.jobs = queue.PriorityQueue()   # (prioritas, nomor urut, Job)
+        self.results = queue.Queue()        # (Job, callback, nilai) untuk thread utama
+        self.sequence = itertools.count()
+        self.process_workers = process_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.process_initializer = process_initializer
+        self.on_error = on_error            # Penerima error tugas yang tidak punya on_error sendiri
+        self.process_pool = None
+        self.pool_lock = threading.Lock()
+        self.process_jobs = []              # Heap (prioritas, nomor urut, Job) yang menunggu slot proses
+        self.process_running = 0            # Tugas proses yang sedang berada di pool
+        self.process_lock = threading.Lock()
+        self.closed = False
+        self.threads = []
+        for i in range(thread_workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, fn, *args, priority=NORMAL, use_process=False, pass_job=False,
+               on_done=None, on_error=None, on_progress=None, name=None):
+        """Menjadwalkan fn(*args); mengembalikan Job yang bisa dibatalkan"""
+        job = Job(fn, args, priority, use_process, pass_job, on_done, on_error, on_progress, name, self)
+        if self.closed:
+            job.cancel()
+        else:
+            self.jobs.put((priority, next(self.sequence), job))
+        return job
+
+    def _get_process_pool(self):
+        with self.pool_lock:
+            if self.process_pool is None:
+                # "spawn" agar worker tidak mewarisi state SDL/Tk dari proses utama
+                context = multiprocessing.get_context("spawn")
+                self.process_pool = ProcessPoolExecutor(max_workers=self.process_workers, mp_context=context,
+                                                        initializer=self.process_initializer)
+            return self.process_pool
+
+    def _worker(self):
+        while True:
+            _, _, job = self.jobs.get()
+            if job is None:
+                return
+            if job.cancelled:
+                continue
+            if job.use_process:
+                # Thread worker tidak ikut menunggu proses: tugas masuk heap proses dan
+                # dikirim ke pool saat ada slot, sehingga antrian proses tidak menahan tugas interaktif
+                with self.process_lock:
+                    heapq.heappush(self.process_jobs, (job.priority, next(self.sequence), job))
+                self._feed_processes()
+                continue
+            try:
+                if job.pass_job:
+                    result = job.fn(*job.args, job=job)
+                else:
+                    result = job.fn(*job.args)
+            except JobCancelled:
+                continue
+            except Exception as e:
+                self._post(job, job.on_error or self.on_error, e)
+                continue
+            self._post(job, job.on_done, result)
+
+    def _feed_processes(self):
+        """Mengirim tugas proses berprioritas tertinggi ke pool selama slotnya masih ada"""
+        while True:
+            with self.process_lock:
+                job = None
+                while self.process_jobs and self.process_running < self.process_workers and not self.closed:
+                    _, _, candidate = heapq.heappop(self.process_jobs)
+                    if not candidate.cancelled:
+                        job = candidate
+                        self.process_running += 1
+                        break
+            if job is None:
+                return
+            # Dikirim di luar kunci: callback future bisa langsung dijalankan di thread ini
+            try:
+                job.future = self._get_process_pool().submit(job.fn, *job.args)
+            except Exception as e:  # Pool sudah dihentikan atau rusak
+                with self.process_lock:
+                    self.process_running -= 1
+                self._post(job, job.on_error or self.on_error, e)
+                continue
+            job.future.add_done_callback(functools.partial(self._process_done, job))
+            if job.cancelled:
+                job.future.cancel()
+
+    def _process_done(self, job, future):
+        """Callback future process pool (dijalankan di thread internal executor)"""
+        with self.process_lock:
+            self.process_running -= 1
+        if not future.cancelled():
+            error = future.exception()
+            if error is not None:
+                self._post(job, job.on_error or self.on_error, error)
+            else:
+                self._post(job, job.on_done, future.result())
+        self._feed_processes()
+
+    def _post(self, job, callback, value):
+        if callback is not None and not job.cancelled:
+            self.results.put((job, callback, value))
+
+    def poll(self, max_items=200):
+        """Menjalankan callback yang tertunda; hanya dipanggil dari thread utama"""
+        for _ in range(max_items):
+            try:
+                job, callback, value = self.results.get_nowait()
+            except queue.Empty:
+                return
+            if job is None or not job.cancelled:
+                callback(value)
+
+    def call_in_main(self, fn):
+        """Menjalankan fn() di thread utama pada poll() berikutnya; mengembalikan Future hasilnya"""
+        future = Future()
+        def run(_):
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn())
+                except Exception as e:
+                    future.set_exception(e)
+        if self.closed:
+            future.set_exception(RuntimeError("Scheduler sudah dihentikan"))
+        else:
+            self.results.put((None, run, None))
+        return future
+
+    def attach(self, root, interval=30):
+        """Menguras hasil secara berkala lewat root.after"""
+        def tick():
+            # Jadwalkan dulu: callback boleh membuka dialog modal (event loop bersarang)
+            if not self.closed:
+                root.after(interval, tick)
+            self.poll()
+        tick()
+
+    def shutdown(self):
+        """Membatalkan tugas yang belum berjalan dan menghentikan worker"""
+        self.closed = True
+        while True:
+            try:
+                _, _, job = self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job.cancel()
+        with self.process_lock:
+            waiting, self.process_jobs = self.process_jobs, []
+        for _, _, job in waiting:
+            job.cancel()
+        for _ in self.threads:
+            self.jobs.put((float("inf"), next(self.sequence), None))
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ==================================================
+# ANALISIS LOUDNESS (NORMALISASI VOLUME)
+# ==================================================
+TARGET_LOUDNESS_DB = -18.0   # Target loudness (dBFS RMS), mirip referensi ReplayGain
+MAX_GAIN_DB = 12.0           # Batas penguatan/pelemahan per lagu
+
+
+def _init_loudness_worker():
+    """Initializer proses worker: mixer tanpa perangkat audio, mono 22 kHz agar decode cepat"""
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    pygame.mixer.init(frequency=22050, size=-16, channels=1)
+
+
+def analyze_loudness(file_path, block_seconds=0.05):
+    """Mendekode lagu dan menghitung loudness ala ReplayGain dengan NumPy (dijalankan di worker).
+
+    Sinyal dipecah menjadi blok 50 ms, RMS tiap blok dihitung secara
+    vektor, blok hening dibuang, lalu persentil ke-95 dipakai sebagai
+    loudness. Mengembalikan dictionary loudness_db, peak dan gain_db.
+    """
+    sound = pygame.mixer.Sound(file_path)
+    samples = pygame.sndarray.array(sound).astype(np.float32) / 32768.0
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    frequency = pygame.mixer.get_init()[0]
+    block = max(1, int(frequency * block_seconds))
+    usable = len(samples) - len(samples) % block
+    if usable == 0:
+        return {"loudness_db": None, "peak": 0.0, "gain_db": 0.0}
+    blocks = samples[:usable].reshape(-1, block)
+    rms = np.sqrt(np.mean(np.square(blocks), axis=1))
+    rms_db = 20 * np.log10(np.maximum(rms, 1e-10))
+    audible = rms_db[rms_db > -70]
+    if audible.size == 0:
+        return {"loudness_db": None, "peak": 0.0, "gain_db": 0.0}
+    loudness_db = float(np.percentile(audible, 95))
+    peak = float(np.max(np.abs(samples)))
+    gain_db = max(-MAX_GAIN_DB, min(MAX_GAIN_DB, TARGET_LOUDNESS_DB - loudness_db))
+    if peak > 0:
+        # Jangan sampai penguatan membuat puncak sinyal terpotong
+        gain_db = min(gain_db, -20 * np.log10(peak))
+    return {"loudness_db": loudness_db, "peak": peak, "gain_db": float(gain_db)}
+
+
+class LoudnessCache:
+    """Cache hasil analisis loudness per (file_path, mtime), disimpan di samping library"""
+    def __init__(self, filename="loudness_cache.json"):
+        self.filename = filename
+        self.entries = {}  # file_path -> {"mtime", "loudness_db", "peak", "gain_db"}
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()  # save() bisa dipanggil dari thread worker
+        try:
+            with open(filename, 'r') as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+    def _mtime(self, file_path):
+        try:
+            return os.path.getmtime(file_path)
+        except OSError:
+            return None
+
+    def is_fresh(self, file_path):
+        entry = self.entries.get(file_path)
+        return entry is not None and entry["mtime"] == self._mtime(file_path)
+
+    def get_gain(self, file_path):
+        """Gain (dB) untuk lagu, 0 jika belum dianalisis atau file berubah"""
+        entry = self.entries.get(file_path)
+        if entry is None or entry["mtime"] != self._mtime(file_path):
+            return 0.0
+        return entry["gain_db"]
+
+    def store(self, file_path, mtime, result):
+        with self.lock:
+            self.entries[file_path] = dict(result, mtime=mtime)
+
+    def save(self):
+        """Menulis cache secara atomik agar tidak rusak jika aplikasi ditutup paksa"""
+        with self.lock:
+            data = dict(self.entries)
+        with self.save_lock:
+            temp_name = self.filename + ".tmp"
+            with open(temp_name, 'w') as f:
+                json.dump(data, f)
+            os.replace(temp_name, self.filename)
+
+
+def _analyze_loudness_job(file_path):
+    """Dijalankan di process worker: (path, mtime, loudness)"""
+    mtime = os.path.getmtime(file_path)
+    return file_path, mtime, analyze_loudness(file_path)
+
+
+class LoudnessAnalyzer:
+    """Menganalisis seluruh library sebagai tugas latar di JobScheduler.
+
+    Hasil langsung disimpan ke LoudnessCache secara berkala, sehingga bila
+    analisis terhenti, analisis berikutnya melanjutkan dari lagu yang belum
+    memiliki hasil.
+    """
+    def __init__(self, cache, scheduler, flush_every=20):
+        self.cache = cache
+        self.scheduler = scheduler
+        self.flush_every = flush_every
+        self.jobs = []
+        self.done = 0       # Jumlah lagu yang selesai diproses pada sesi ini (termasuk gagal)
+        self.total = 0      # Jumlah lagu yang perlu dianalisis pada sesi ini
+        self.errors = 0
+
+    @staticmethod
+    def is_available():
+        return np is not None
+
+    def is_running(self):
+        return self.done < self.total
+
+    def start(self, file_paths):
+        """Mulai analisis lagu yang belum ada di cache; mengembalikan jumlah lagu yang dijadwalkan"""
+        if self.is_running():
+            return 0
+        pending = [path for path in dict.fromkeys(file_paths) if not self.cache.is_fresh(path)]
+        self.done, self.errors, self.total = 0, 0, len(pending)
+        self.jobs = [
+            self.scheduler.submit(_analyze_loudness_job, path, priority=JobScheduler.BACKGROUND,
+                                  use_process=True, on_done=self._store, on_error=self._failed,
+                                  name="analisis loudness")
+            for path in pending
+        ]
+        return len(pending)
+
+    def stop(self):
+        for job in self.jobs:
+            job.cancel()
+        self.jobs = []
+        if self.is_running():
+            self.total = self.done
+            self.cache.save()
+
+    def _store(self, result):
+        file_path, mtime, loudness = result
+        self.cache.store(file_path, mtime, loudness)
+        self._finish_one()
+
+    def _failed(self, error):
+        self.errors += 1
+        self._finish_one()
+
+    def _finish_one(self):
+        self.done += 1
+        if self.done % self.flush_every == 0 or self.done == self.total:
+            self.scheduler.submit(self.cache.save, priority=JobScheduler.BACKGROUND, name="simpan cache loudness")
+
+
+# ==================================================
+# LOG PEMUTARAN (APPEND-ONLY, KOLUMNAR)
+# ==================================================
+def _day_index(timestamp):
+    """Nomor hari lokal sejak 1970-01-01; offset UTC dihitung per timestamp agar benar melewati DST"""
+    return int((timestamp + time.localtime(timestamp).tm_gmtoff) // 86400)
+
+
+def _day_indices(timestamps):
+    """Versi NumPy _day_index; localtime cukup dipanggil sekali per jam unik yang muncul"""
+    hours, inverse = np.unique(np.floor(timestamps / 3600).astype(np.int64), return_inverse=True)
+    offsets = np.array([time.localtime(hour * 3600).tm_gmtoff for hour in hours.tolist()], dtype=np.float64)
+    return ((timestamps + offsets[inverse]) // 86400).astype(np.int64)
+
+
+def _week_index(day):
+    """Nomor minggu (Senin sebagai awal minggu); 1970-01-01 adalah hari Kamis"""
+    return (day + 3) // 7
+
+
+class PlayEventLog:
+    """Log kejadian pemutaran (song_id, timestamp, detik didengar) dalam file biner kolumnar.
+
+    Tiap kolom disimpan di file tersendiri dan hanya pernah ditambah di
+    akhir. Rollup harian dan mingguan dijaga secara inkremental; agregasi
+    rentang waktu bebas memakai NumPy bila tersedia. Baris ditulis saat
+    lagu selesai sehingga timestamp (waktu mulai) biasanya terurut; bila
+    tidak (jam sistem mundur), pencarian rentang jatuh ke pemindaian penuh.
+    """
+    COLUMNS = (("song_id", "I"), ("timestamp", "d"), ("seconds", "f"))
+
+    def __init__(self, directory="play_events"):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.paths = []     # song_id -> file_path
+        self.ids = {}       # file_path -> song_id
+        self.columns = {name: array(code) for name, code in self.COLUMNS}
+        self.daily = {}     # hari -> [jumlah pemutaran, detik]
+        self.weekly = {}    # minggu -> Counter(song_id -> jumlah pemutaran)
+        self.ordered = True  # timestamp tidak pernah turun sehingga rentang bisa dicari dengan bisect
+        self._load()
+
+    def _column_file(self, name):
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def _load(self):
+        songs_file = os.path.join(self.directory, "songs.jsonl")
+        if os.path.exists(songs_file):
+            with open(songs_file, 'r') as f:
+                for line in f:
+                    file_path = json.loads(line)
+                    self.ids[file_path] = len(self.paths)
+                    self.paths.append(file_path)
+        for name, column in self.columns.items():
+            filename = self._column_file(name)
+            if os.path.exists(filename):
+                with open(filename, 'rb') as f:
+                    data = f.read()
+                column.frombytes(data[:len(data) - len(data) % column.itemsize])
+        # Jika aplikasi tertutup di tengah penulisan, potong ke baris lengkap terakhir
+        complete = min(len(column) for column in self.columns.values())
+        for name, column in self.columns.items():
+            del column[complete:]
+            filename = self._column_file(name)
+            if os.path.exists(filename) and os.path.getsize(filename) != complete * column.itemsize:
+                with open(filename, 'r+b') as f:
+                    f.truncate(complete * column.itemsize)
+        timestamps = self.columns["timestamp"]
+        if np is not None and len(timestamps):
+            self.ordered = bool(np.all(np.diff(np.frombuffer(timestamps, dtype=np.float64)) >= 0))
+        else:
+            self.ordered = all(a <= b for a, b in zip(timestamps, itertools.islice(timestamps, 1, None)))
+        self._rebuild_rollups()
+
+    def _rebuild_rollups(self):
+        song_ids, timestamps, seconds = (self.columns[name] for name, _ in self.COLUMNS)
+        self.daily, self.weekly = {}, {}
+        if np is not None and len(timestamps):
+            days = _day_indices(np.frombuffer(timestamps, dtype=np.float64))
+            ids = np.frombuffer(song_ids, dtype=np.uint32)
+            secs = np.frombuffer(seconds, dtype=np.float32)
+            unique_days, inverse = np.unique(days, return_inverse=True)
+            counts = np.bincount(inverse)
+            totals = np.bincount(inverse, weights=secs)
+            for day, count, total in zip(unique_days.tolist(), counts.tolist(), totals.tolist()):
+                self.daily[day] = [count, total]
+            weeks = (days + 3) // 7
+            for week in np.unique(weeks).tolist():
+                week_ids = ids[weeks == week]
+                unique_ids, id_counts = np.unique(week_ids, return_counts=True)
+                self.weekly[week] = Counter(dict(zip(unique_ids.tolist(), id_counts.tolist())))
+        else:
+            for song_id, timestamp, secs in zip(song_ids, timestamps, seconds):
+                self._add_to_rollups(song_id, timestamp, secs)
+
+    def _add_to_rollups(self, song_id, timestamp, seconds):
+        day = _day_index(timestamp)
+        entry = self.daily.setdefault(day, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        self.weekly.setdefault(_week_index(day), Counter())[song_id] += 1
+
+    def __len__(self):
+        return len(self.columns["timestamp"])
+
+    def _song_id(self, file_path):
+        song_id = self.ids.get(file_path)
+        if song_id is None:
+            song_id = self.ids[file_path] = len(self.paths)
+            self.paths.append(file_path)
+            with open(os.path.join(self.directory, "songs.jsonl"), 'a') as f:
+                f.write(json.dumps(file_path) + "\n")
+        return song_id
+
+    def append(self, file_path, timestamp, seconds):
+        """Mencatat satu kejadian pemutaran dan memperbarui rollup"""
+        song_id = self._song_id(file_path)
+        timestamps = self.columns["timestamp"]
+        if timestamps and timestamp < timestamps[-1]:
+            self.ordered = False
+        for (name, code), value in zip(self.COLUMNS, (song_id, timestamp, seconds)):
+            self.columns[name].append(value)
+            with open(self._column_file(name), 'ab') as f:
+                f.write(array(code, [value]).tobytes())
+        self._add_to_rollups(song_id, timestamp, seconds)
+
+    def _range(self, start, end):
+        """Baris untuk rentang waktu [start, end): slice lewat bisect bila timestamp terurut,
+        selain itu daftar indeks hasil pemindaian"""
+        timestamps = self.columns["timestamp"]
+        if self.ordered:
+            return slice(bisect.bisect_left(timestamps, start), bisect.bisect_left(timestamps, end))
+        if np is not None:
+            values = np.frombuffer(timestamps, dtype=np.float64)
+            return np.nonzero((values >= start) & (values < end))[0]
+        return [i for i, timestamp in enumerate(timestamps) if start <= timestamp < end]
+
+    def aggregate(self, start, end):
+        """Mengembalikan (Counter file_path -> jumlah putar, total detik) untuk rentang waktu"""
+        rows = self._range(start, end)
+        if np is not None:
+            ids = np.frombuffer(self.columns["song_id"], dtype=np.uint32)[rows]
+            if not len(ids):
+                return Counter(), 0.0
+            secs = np.frombuffer(self.columns["seconds"], dtype=np.float32)[rows]
+            counts = np.bincount(ids)
+            nonzero = np.nonzero(counts)[0]
+            plays = Counter({self.paths[i]: int(counts[i]) for i in nonzero.tolist()})
+            return plays, float(secs.sum(dtype=np.float64))
+        if isinstance(rows, slice):
+            ids, secs = self.columns["song_id"][rows], self.columns["seconds"][rows]
+        else:
+            ids = [self.columns["song_id"][i] for i in rows]
+            secs = [self.columns["seconds"][i] for i in rows]
+        plays = Counter(self.paths[i] for i in ids)
+        return plays, float(sum(secs))
+
+    def top_songs(self, start, end, n=10):
+        plays, _ = self.aggregate(start, end)
+        return plays.most_common(n)
+
+    def top_songs_this_week(self, n=10):
+        """Langsung dari rollup mingguan, tanpa memindai log"""
+        week = _week_index(_day_index(time.time()))
+        counts = self.weekly.get(week, Counter())
+        return [(self.paths[song_id], count) for song_id, count in counts.most_common(n)]
+
+    def daily_listening(self, days=14):
+        """Daftar (tanggal, jam didengar) untuk beberapa hari terakhir dari rollup harian"""
+        today = _day_index(time.time())
+        result = []
+        for day in range(today - days + 1, today + 1):
+            _, seconds = self.daily.get(day, (0, 0.0))
+            date_str = time.strftime("%m-%d", time.gmtime(day * 86400))
+            result.append((date_str, seconds / 3600))
+        return result
+
+
+# ==================================================
+# REKOMENDASI LAGU SERUPA (CO-PLAY)
+# ==================================================
+class CoPlayRecommender:
+    """Rekomendasi item-item dari lagu yang sering diputar berdekatan.
+
+    Bobot co-occurrence disimpan sebagai matriks jarang CSR (indptr/indices/
+    data dalam `array`), ditambah buffer delta berbasis dict untuk pembaruan
+    inkremental yang sesekali dipadatkan. Kemiripan adalah cosine antar
+    vektor kemunculan: C[i][j] / sqrt(n_i * n_j).
+    """
+    SESSION_GAP = 30 * 60     # Jeda lebih dari ini memulai sesi baru
+    SESSION_WINDOW = 5        # Lagu sebelumnya dalam sesi yang dianggap berdekatan
+    PLAYLIST_WINDOW = 10      # Tetangga di urutan playlist
+    PLAYLIST_WEIGHT = 0.5     # Keanggotaan playlist lebih lemah daripada pemutaran
+    MAX_ROW_NNZ = 256         # Batas tetangga per baris saat pemadatan
+    COMPACT_THRESHOLD = 50000
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.ids = {}                  # file_path -> id baris
+        self.paths = []                # id -> file_path
+        self.occurrences = array('f')  # n_i: bobot kemunculan tiap lagu
+        self.indptr = array('q', [0])
+        self.indices = array('I')
+        self.data = array('f')
+        self.delta = {}                # id -> {id: bobot} yang belum dipadatkan
+        self.delta_size = 0
+        self.session = deque(maxlen=self.SESSION_WINDOW)
+        self.last_play_at = None
+        self.built = False
+
+    def _song_id(self, file_path):
+        song_id = self.ids.get(file_path)
+        if song_id is None:
+            song_id = self.ids[file_path] = len(self.paths)
+            self.paths.append(file_path)
+            self.occurrences.append(0.0)
+        return song_id
+
+    def _add_pair(self, i, j, weight):
+        for a, b in ((i, j), (j, i)):
+            row = self.delta.get(a)
+            if row is None:
+                row = self.delta[a] = {}
+            if b not in row:
+                self.delta_size += 1
+            row[b] = row.get(b, 0.0) + weight
+
+    def rebuild(self, playlists, play_log=None):
+        """Membangun ulang dari urutan file_path tiap playlist dan sesi di log pemutaran"""
+        self.reset()
+        for file_paths in playlists:
+            self.observe_playlist(file_paths)
+        if play_log is not None:
+            song_ids = play_log.columns["song_id"]
+            for song_id, timestamp in zip(song_ids, play_log.columns["timestamp"]):
+                self._observe(play_log.paths[song_id], timestamp)
+        self.compact()
+        self.built = True
+
+    def observe_playlist(self, file_paths):
+        """Lagu yang berdekatan di sebuah playlist dianggap mirip"""
+        window = deque(maxlen=self.PLAYLIST_WINDOW)
+        for file_path in file_paths:
+            i = self._song_id(file_path)
+            self.occurrences[i] += self.PLAYLIST_WEIGHT
+            for j in window:
+                if j != i:
+                    self._add_pair(i, j, self.PLAYLIST_WEIGHT)
+            window.append(i)
+
+    def observe_play(self, file_path, timestamp):
+        """Pembaruan inkremental dari record_play; diabaikan sebelum indeks dibangun"""
+        if self.built:
+            self._observe(file_path, timestamp)
+            if self.delta_size > self.COMPACT_THRESHOLD:
+                self.compact()
+
+    def _observe(self, file_path, timestamp):
+        if self.last_play_at is None or timestamp - self.last_play_at > self.SESSION_GAP:
+            self.session.clear()
+        self.last_play_at = timestamp
+        i = self._song_id(file_path)
+        self.occurrences[i] += 1.0
+        for j in self.session:
+            if j != i:
+                self._add_pair(i, j, 1.0)
+        if i in self.session:
+            self.session.remove(i)
+        self.session.append(i)
+
+    def compact(self):
+        """Menggabungkan delta ke CSR; baris dipangkas ke MAX_ROW_NNZ bobot terbesar"""
+        indptr = array('q', [0])
+        indices = array('I')
+        data = array('f')
+        old_rows = len(self.indptr) - 1
+        for i in range(len(self.paths)):
+            row = {}
+            if i < old_rows:
+                start, end = self.indptr[i], self.indptr[i + 1]
+                row = dict(zip(self.indices[start:end], self.data[start:end]))
+            for j, weight in self.delta.get(i, {}).items():
+                row[j] = row.get(j, 0.0) + weight
+            items = row.items()
+            if len(row) > self.MAX_ROW_NNZ:
+                items = heapq.nlargest(self.MAX_ROW_NNZ, items, key=lambda item: item[1])
+            for j, weight in items:
+                indices.append(j)
+                data.append(weight)
+            indptr.append(len(indices))
+        self.indptr, self.indices, self.data = indptr, indices, data
+        self.delta = {}
+        self.delta_size = 0
+
+    def _row_scores(self, i):
+        """Kemiripan cosine baris i terhadap semua tetangganya"""
+        row = {}
+        if i < len(self.indptr) - 1:
+            start, end = self.indptr[i], self.indptr[i + 1]
+            row = dict(zip(self.indices[start:end], self.data[start:end]))
+        for j, weight in self.delta.get(i, {}).items():
+            row[j] = row.get(j, 0.0) + weight
+        n_i = self.occurrences[i]
+        occurrences = self.occurrences
+        return {j: weight / ((n_i * occurrences[j]) ** 0.5) for j, weight in row.items() if occurrences[j]}
+
+    def similar(self, file_path, n=10, allowed_paths=None):
+        """Daftar (file_path, skor) lagu paling mirip dengan file_path"""
+        i = self.ids.get(file_path)
+        if i is None:
+            return []
+        scores = self._row_scores(i)
+        candidates = ((self.paths[j], score) for j, score in scores.items())
+        if allowed_paths is not None:
+            candidates = ((path, score) for path, score in candidates if path in allowed_paths)
+        return heapq.nlargest(n, candidates, key=lambda item: item[1])
+
+    def auto_mix(self, seed_path, length=25, allowed_paths=None):
+        """Menyusun mix secara serakah: tiap langkah memilih lagu dengan skor
+        gabungan tertinggi terhadap lagu-lagu yang sudah terpilih (seed berbobot ganda)."""
+        seed = self.ids.get(seed_path)
+        if seed is None:
+            return [seed_path]
+        mix = [seed]
+        used = {seed}
+        scores = {}
+        heap = []
+        current, weight = seed, 2.0
+        while len(mix) < length:
+            for j, score in self._row_scores(current).items():
+                if j in used:
+                    continue
+                scores[j] = scores.get(j, 0.0) + weight * score
+                heapq.heappush(heap, (-scores[j], j))
+            weight = 1.0
+            current = None
+            while heap:
+                neg_score, j = heapq.heappop(heap)
+                # Lewati entri usang di heap (skor sudah naik atau lagu sudah dipakai)
+                if j in used or -neg_score != scores[j]:
+                    continue
+                if allowed_paths is not None and self.paths[j] not in allowed_paths:
+                    continue
+                current = j
+                break
+            if current is None:
+                break
+            mix.append(current)
+            used.add(current)
+        return [self.paths[i] for i in mix]
+
+
+# ==================================================
+# INSTRUMENTASI (PROFILING OPSIONAL)
+# ==================================================
+class Profiler:
+    """Mencatat jumlah panggilan, waktu kumulatif dan histogram latensi fungsi penting.
+
+    Nonaktif secara default; aktifkan lewat variabel lingkungan UAS_PROFILE=1
+    atau dari panel Debug.
+    """
+    # Batas atas tiap bucket histogram dalam milidetik (bucket terakhir = tak hingga)
+    BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, float("inf"))
+
+    def __init__(self, enabled=False):
+        self.enabled = False
+        self.records = {}        # nama -> statistik panggilan
+        self.lock = threading.Lock()  # record dipanggil juga dari job di thread worker
+        self.cprofile = None     # cProfile.Profile saat profiling aktif
+        self.lag_interval = 100  # Interval probe event loop Tk (ms)
+        self.root = None         # Root Tk yang dipantau, diisi monitor_event_loop
+        self.lag_after = None    # id after() probe yang sedang menunggu
+        if enabled:
+            self.enable()
+
+    def enable(self):
+        if not self.enabled:
+            self.enabled = True
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+            self._schedule_probe()
+
+    def disable(self):
+        if self.enabled:
+            self.enabled = False
+            self.cprofile.disable()
+            if self.lag_after is not None:
+                self.root.after_cancel(self.lag_after)
+                self.lag_after = None
+
+    def reset(self):
+        self.records = {}
+        if self.cprofile:
+            was_enabled = self.enabled
+            self.disable()
+            self.cprofile = None
+            if was_enabled:
+                self.enable()
+
+    def record(self, name, seconds):
+        """Menambahkan satu sampel durasi ke statistik nama (aman dari thread worker)"""
+        with self.lock:
+            rec = self.records.get(name)
+            if rec is None:
+                rec = self.records[name] = {
+                    "calls": 0, "total": 0.0, "max": 0.0,
+                    "histogram": [0] * len(self.BUCKETS_MS)
+                }
+            rec["calls"] += 1
+            rec["total"] += seconds
+            rec["max"] = max(rec["max"], seconds)
+            ms = seconds * 1000
+            for i, limit in enumerate(self.BUCKETS_MS):
+                if ms <= limit:
+                    rec["histogram"][i] += 1
+                    break
+
+    def wrap(self, name, func):
+        """Membungkus fungsi agar durasinya dicatat ketika profiler aktif"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start)
+        return wrapper
+
+    def instrument(self, obj, method_names):
+        """Mengganti method pada instance obj dengan versi yang diukur"""
+        prefix = type(obj).__name__
+        for method_name in method_names:
+            method = getattr(obj, method_name)
+            setattr(obj, method_name, self.wrap(f"{prefix}.{method_name}", method))
+
+    def monitor_event_loop(self, root):
+        """Mengukur seberapa terlambat callback after() dijalankan oleh event loop Tk.
+
+        Probe hanya dijadwalkan selama profiler aktif.
+        """
+        self.root = root
+        self._schedule_probe()
+
+    def _schedule_probe(self):
+        if self.root is None or self.lag_after is not None or not self.enabled:
+            return
+        expected = time.perf_counter() + self.lag_interval / 1000
+
+        def probe():
+            self.lag_after = None
+            if self.enabled:
+                self.record("tk.event_loop_lag", max(0.0, time.perf_counter() - expected))
+                self._schedule_probe()
+
+        self.lag_after = self.root.after(self.lag_interval, probe)
+
+    def summary(self):
+        """Daftar statistik per fungsi, diurutkan dari waktu kumulatif terbesar"""
+        rows = []
+        with self.lock:
+            records = [(name, dict(rec, histogram=list(rec["histogram"]))) for name, rec in self.records.items()]
+        for name, rec in records:
+            rows.append({
+                "name": name,
+                "calls": rec["calls"],
+                "total_ms": rec["total"] * 1000,
+                "mean_ms": rec["total"] * 1000 / rec["calls"] if rec["calls"] else 0.0,
+                "max_ms": rec["max"] * 1000,
+                "histogram": dict(zip(
+                    [f"<={limit}ms" if limit != float("inf") else ">1000ms" for limit in self.BUCKETS_MS],
+                    rec["histogram"]
+                ))
+            })
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def export_json(self, filename):
+        with open(filename, 'w') as f:
+            json.dump({"generated_at": time.time(), "functions": self.summary()}, f, indent=4)
+
+    def dump_cprofile(self, filename):
+        """Menyimpan data cProfile (bisa dibuka dengan pstats/snakeviz)"""
+        if self.cprofile is None:
+            return False
+        self.cprofile.dump_stats(filename)
+        if self.enabled:
+            # dump_stats menghentikan pengumpulan data, lanjutkan kembali
+            self.cprofile.enable()
+        return True
+
+
+# ==================================================
+# PENYIMPANAN PLAYLIST (DIMUAT SAAT DIBUTUHKAN)
+# ==================================================
+class LibraryStorage:
+    """Library di disk: index.json (ringkasan + data global) dan satu file per playlist.
+
+    Aman dipanggil dari thread worker. Tiap file mengingat nomor snapshot
+    terakhir yang menulisnya, sehingga snapshot lama yang terlambat ditulis
+    tidak menimpa data yang lebih baru.
+    """
+    FORMAT_VERSION = 2
+    INDEX_FILE = "index.json"
+
+    def __init__(self, directory="music_library", legacy_file="music_library.json"):
+        self.directory = directory
+        self.legacy_file = legacy_file  # Format lama satu-berkas, dimigrasi otomatis
+        self.lock = threading.Lock()
+        self.sequence = 0   # Nomor snapshot terakhir (hanya dinaikkan di thread utama)
+        self.written = {}   # nama file -> nomor snapshot terakhir yang menulisnya
+        self.pending = {}   # nama file -> (nomor, data) yang sudah dijadwalkan tapi belum tertulis
+
+    def _path(self, file_name):
+        return os.path.join(self.directory, file_name)
+
+    def next_sequence(self):
+        self.sequence += 1
+        return self.sequence
+
+    def stage(self, files, sequence):
+        """Mencatat data yang akan ditulis agar read_playlist tidak membaca versi lama"""
+        with self.lock:
+            for file_name, data in files.items():
+                self.pending[file_name] = (sequence, data)
+
+    def write(self, files, sequence):
+        """Menulis file (data None berarti hapus) secara atomik, sesuai urutan dict"""
+        os.makedirs(self.directory, exist_ok=True)
+        with self.lock:
+            for file_name, data in files.items():
+                if self.written.get(file_name, -1) > sequence:
+                    continue
+                path = self._path(file_name)
+                if data is None:
+                    if os.path.exists(path):
+                        os.remove(path)
+                else:
+                    temp_name = path + ".tmp"
+                    with open(temp_name, 'w') as f:
+                        json.dump(data, f, indent=1)
+                    os.replace(temp_name, path)
+                self.written[file_name] = sequence
+                if self.pending.get(file_name, (None,))[0] == sequence:
+                    del self.pending[file_name]
+
+    def read_playlist(self, file_name):
+        """Daftar dict lagu dalam sebuah file playlist"""
+        with self.lock:
+            staged = self.pending.get(file_name)
+        if staged is not None and staged[1] is not None:
+            return staged[1]
+        try:
+            with open(self._path(file_name), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def read_index(self):
+        """Membaca index; memigrasi file format lama bila ada. None untuk library baru."""
+        try:
+            with open(self._path(self.INDEX_FILE), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError:
+            return None
+        try:
+            with open(self.legacy_file, 'r') as f:
+                legacy = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return self._migrate(legacy)
+
+    def _migrate(self, legacy):
+        """Memecah file lama satu-berkas menjadi file per playlist + index"""
+        files = {}
+        entries = []
+        song_stats = dict(legacy.get("song_stats", {}))
+        songs_by_path = {}
+        for i, (name, songs_data) in enumerate(legacy.get("playlists", {}).items()):
+            file_name = f"playlist_{i}.json"
+            songs_data = [song_data for song_data in songs_data if song_data.get("file_path")]
+            files[file_name] = songs_data
+            songs = [Song.from_dict(song_data) for song_data in songs_data]
+            for song in songs:
+                songs_by_path.setdefault(song.file_path, song)
+                song_stats.setdefault(song.file_path, {'play_count': song.play_count, 'last_played': song.last_played})
+            entries.append({"name": name, "file": file_name, "count": len(songs),
+                            "duration": sum(song.get_duration_seconds() for song in songs)})
+        queue = legacy.get("queue", {})
+        files[self.INDEX_FILE] = {
+            "version": self.FORMAT_VERSION,
+            "playlists": entries,
+            "next_file_id": len(entries),
+            "favorites": legacy.get("favorites", []),
+            "song_stats": song_stats,
+            "current_playlist": legacy.get("current_playlist", "Default"),
+            "queue": queue,
+            "queue_songs": [songs_by_path[path].to_dict() for path in queue.get("songs", []) if path in songs_by_path]
+        }
+        self.write(files, 0)
+        os.replace(self.legacy_file, self.legacy_file + ".bak")
+        return files[self.INDEX_FILE]
+
+
+class PlaylistStore:
+    """Kumpulan playlist yang dimuat saat dibutuhkan dan dibuang (LRU) bila
+    perkiraan memori melebihi anggaran.
+
+    Berperilaku seperti dict nama -> PlaylistLinkedList; urutan nama selalu
+    tersedia, dan ringkasan (jumlah lagu, total durasi) bisa dibaca tanpa
+    memuat isinya. Playlist yang berubah ditulis dulu sebelum dibuang.
+    """
+    BYTES_PER_SONG = 1024  # Perkiraan kasar per lagu (Song, node, string metadata)
+
+    def __init__(self, storage, max_bytes=None, on_load=None, on_evict=None):
+        self.storage = storage
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("UAS_PLAYLIST_BUDGET_MB", "256")) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.on_load = on_load      # Dipanggil (nama, playlist) setelah dimuat dari disk
+        self.on_evict = on_evict    # Dipanggil (nama, playlist) setelah dibuang dari memori
+        self.lru_lock = threading.Lock()  # Urutan LRU juga diubah oleh pembaca yang berjalan bersamaan
+        self.reset()
+
+    def reset(self, entries=(), next_file_id=0, song_files=None):
+        self.meta = {}                  # nama -> {"file", "count", "duration"}; urutan playlist
+        for entry in entries:
+            self.meta[entry["name"]] = {"file": entry["file"], "count": entry.get("count", 0),
+                                        "duration": entry.get("duration", 0)}
+        # file_path -> nama file playlist yang memuatnya saat terakhir disimpan, untuk
+        # menemukan playlist sebuah lagu tanpa memuat semua playlist
+        self.song_files = {}
+        self.saved_paths = {}           # nama -> file_path di file playlist saat dimuat/disimpan
+        if song_files is None:
+            for meta in self.meta.values():
+                # Index lama tanpa song_files: dibangun sekali dari file playlist
+                paths = {song_data["file_path"] for song_data in self.storage.read_playlist(meta["file"])
+                         if song_data.get("file_path")}
+                self._index_paths(meta["file"], (), paths)
+        else:
+            for file_path, file_names in song_files.items():
+                self.song_files[file_path] = set(file_names)
+        self.loaded = OrderedDict()     # nama -> PlaylistLinkedList, urut dari yang paling lama dipakai
+        self.saved_versions = {}        # nama -> versi playlist saat terakhir disimpan
+        self.materialized = set()       # Nama yang isinya pernah ada di memori pada sesi ini
+        self.deleted_files = set()
+        self.pinned = set()             # Tidak pernah dibuang (playlist aktif)
+        self.next_file_id = max(next_file_id, len(self.meta))
+
+    def __contains__(self, name):
+        return name in self.meta
+
+    def __iter__(self):
+        return iter(list(self.meta))
+
+    def __len__(self):
+        return len(self.meta)
+
+    def keys(self):
+        return list(self.meta)
+
+    def __getitem__(self, name):
+        with self.lru_lock:
+            playlist = self.loaded.get(name)
+            if playlist is not None:
+                self.loaded.move_to_end(name)
+        if playlist is not None:
+            return playlist
+        if name not in self.meta:
+            raise KeyError(name)
+        return self._load(name)
+
+    def get(self, name, default=None):
+        return self[name] if name in self.meta else default
+
+    def __setitem__(self, name, playlist):
+        if name not in self.meta:
+            self.meta[name] = {"file": f"playlist_{self.next_file_id}.json", "count": 0, "duration": 0}
+            self.next_file_id += 1
+        self.loaded[name] = playlist
+        self.loaded.move_to_end(name)
+        self.saved_versions[name] = None  # Belum tersimpan
+        self.materialized.add(name)
+        self._evict(keep=name)
+
+    def pop(self, name):
+        playlist = self[name]
+        self.discard(name)
+        return playlist
+
+    def __delitem__(self, name):
+        if name not in self.meta:
+            raise KeyError(name)
+        self.discard(name)
+
+    def discard(self, name):
+        """Menghapus playlist tanpa memuat isinya; filenya dihapus saat penyimpanan berikutnya"""
+        meta = self.meta.pop(name, None)
+        if meta is not None:
+            self.deleted_files.add(meta["file"])
+            self._index_paths(meta["file"], self._saved_paths(name, meta["file"]), ())
+        self.loaded.pop(name, None)
+        self.saved_versions.pop(name, None)
+        self.saved_paths.pop(name, None)
+
+    def values(self):
+        """Iterasi semua playlist; yang belum dimuat dimuat satu per satu sesuai anggaran"""
+        for name in list(self.meta):
+            if name in self.meta:
+                yield self[name]
+
+    def items(self):
+        for name in list(self.meta):
+            if name in self.meta:
+                yield name, self[name]
+
+    def is_loaded(self, name):
+        return name in self.loaded
+
+    def _saved_paths(self, name, file_name):
+        paths = self.saved_paths.get(name)
+        if paths is None:
+            paths = {song_data["file_path"] for song_data in self.storage.read_playlist(file_name)
+                     if song_data.get("file_path")}
+        return paths
+
+    def _index_paths(self, file_name, old_paths, new_paths):
+        for file_path in set(old_paths).difference(new_paths):
+            file_names = self.song_files.get(file_path)
+            if file_names is not None:
+                file_names.discard(file_name)
+                if not file_names:
+                    del self.song_files[file_path]
+        for file_path in set(new_paths).difference(old_paths):
+            self.song_files.setdefault(file_path, set()).add(file_name)
+
+    def playlists_with(self, file_paths):
+        """Nama playlist yang memuat salah satu file_paths, tanpa memuat playlist lain.
+
+        Playlist yang sedang dimuat dicek lewat members; yang lain lewat
+        song_files, yang sesuai dengan isi file-nya.
+        """
+        file_paths = list(file_paths)
+        names = set()
+        for name, playlist in self.loaded_items():
+            if any(file_path in playlist.members for file_path in file_paths):
+                names.add(name)
+        names_by_file = {meta["file"]: name for name, meta in self.meta.items()}
+        for file_path in file_paths:
+            for file_name in self.song_files.get(file_path, ()):
+                name = names_by_file.get(file_name)
+                if name is not None and name not in self.loaded:
+                    names.add(name)
+        return [name for name in self.meta if name in names]
+
+    def all_paths(self):
+        """Himpunan file_path seluruh library tanpa memuat playlist"""
+        loaded = self.loaded_items()
+        loaded_files = {self.meta[name]["file"] for name, _ in loaded}
+        paths = {file_path for file_path, file_names in self.song_files.items()
+                 if not file_names <= loaded_files}
+        for _, playlist in loaded:
+            paths.update(playlist.members)
+        return paths
+
+    def peek(self, name):
+        """Isi playlist sebagai list dict lagu tanpa memuatnya ke memori (LRU tidak berubah)"""
+        playlist = self.loaded.get(name)
+        if playlist is not None:
+            return [song.to_dict() for song in playlist]
+        return [song_data for song_data in self.storage.read_playlist(self.meta[name]["file"])
+                if song_data.get("file_path")]
+
+    def file_paths(self, name):
+        """file_path lagu-lagu playlist sesuai urutan, tanpa memuatnya ke memori"""
+        playlist = self.loaded.get(name)
+        if playlist is not None:
+            return [song.file_path for song in playlist]
+        return [song_data["file_path"] for song_data in self.peek(name)]
+
+    def loaded_items(self):
+        """Salinan (nama, playlist) yang sedang dimuat, aman selagi pembaca lain mengubah urutan LRU"""
+        with self.lru_lock:
+            return list(self.loaded.items())
+
+    def summary(self, name):
+        """(jumlah lagu, total durasi detik) tanpa memuat playlist"""
+        playlist = self.loaded.get(name)
+        if playlist is not None and self.is_dirty(name):
+            return len(playlist), sum(song.get_duration_seconds() for song in playlist)
+        meta = self.meta[name]
+        return meta["count"], meta["duration"]
+
+    def is_dirty(self, name):
+        return self.saved_versions.get(name) != self.loaded[name].version
+
+    def _load(self, name):
+        playlist = PlaylistLinkedList()
+        for song_data in self.storage.read_playlist(self.meta[name]["file"]):
+            if song_data.get("file_path"):
+                song = Song.from_dict(song_data)
+                song.playlist = name
+                playlist.append(song)
+        self.loaded[name] = playlist
+        self.saved_versions[name] = playlist.version
+        self.saved_paths[name] = set(playlist.members)
+        self.materialized.add(name)
+        if self.on_load:
+            self.on_load(name, playlist)
+        self._evict(keep=name)
+        return playlist
+
+    def _dump(self, name, playlist):
+        """Data file playlist; juga memperbarui ringkasan di index"""
+        songs = [song.to_dict() for song in playlist]
+        meta = self.meta[name]
+        meta["count"] = len(songs)
+        meta["duration"] = sum(song.get_duration_seconds() for song in playlist)
+        self.saved_versions[name] = playlist.version
+        paths = set(playlist.members)
+        self._index_paths(meta["file"], self._saved_paths(name, meta["file"]), paths)
+        self.saved_paths[name] = paths
+        return songs
+
+    def _evict(self, keep):
+        used = sum(len(playlist) for playlist in self.loaded.values()) * self.BYTES_PER_SONG
+        for name in list(self.loaded):
+            if used <= self.max_bytes:
+                break
+            if name == keep or name in self.pinned:
+                continue
+            playlist = self.loaded[name]
+            if self.is_dirty(name):
+                file_name = self.meta[name]["file"]
+                self.storage.write({file_name: self._dump(name, playlist)}, self.storage.next_sequence())
+            del self.loaded[name]
+            del self.saved_versions[name]
+            self.saved_paths.pop(name, None)
+            used -= len(playlist) * self.BYTES_PER_SONG
+            if self.on_evict:
+                self.on_evict(name, playlist)
+
+    def snapshot(self):
+        """File playlist yang berubah (dan yang dihapus) sejak snapshot sebelumnya"""
+        files = {}
+        for name, playlist in self.loaded.items():
+            if self.is_dirty(name):
+                files[self.meta[name]["file"]] = self._dump(name, playlist)
+        for file_name in self.deleted_files:
+            files[file_name] = None
+        self.deleted_files = set()
+        return files
+
+    def index_entries(self):
+        return [dict(meta, name=name) for name, meta in self.meta.items()]
+
+    def song_files_entries(self):
+        return {file_path: sorted(file_names) for file_path, file_names in self.song_files.items()}
 
 
-class PlaylistLinkedList:
-    """Implementasi linked list ganda untuk playlist lagu"""
-    def __init__(self):
-        self.head = None     # Node pertama
-        self.tail = None     # Node terakhir
-        self.length = 0      # Jumlah lagu
+# ==================================================
+# PENGGABUNGAN LIBRARY DARI BEBERAPA MESIN
+# ==================================================
+class JsonStreamReader:
+    """Pembaca JSON bertahap di atas JSONDecoder.raw_decode.
 
-    def append(self, song):
-        """Menambahkan lagu ke akhir playlist"""
-        new_node = SongNode(song)
-        if not self.head:  # Jika playlist kosong
-            self.head = new_node
-            self.tail = new_node
-        else:  # Jika playlist tidak kosong
-            new_node.prev = self.tail
-            self.tail.next = new_node
-            self.tail = new_node
-        self.length += 1
+    Objek dan array besar ditelusuri elemen demi elemen lewat iter_object
+    dan iter_array, sehingga yang perlu muat di buffer hanya satu nilai
+    (mis. satu lagu), bukan seluruh file.
+    """
+    CHUNK_SIZE = 1 << 16
 
-    def remove(self, song):
-        """Menghapus lagu dari playlist"""
-        current = self.head
-        while current:  # Cari lagu yang akan dihapus
-            if current.song.file_path == song.file_path:
-                # Perbarui pointer node sebelum dan sesudah
-                if current.prev:
-                    current.prev.next = current.next
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.file = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """Menambah isi buffer dan membuang bagian yang sudah dibaca; False bila file habis"""
+        if self.eof:
+            return False
+        # Ukuran baca ikut membesar agar nilai yang sangat panjang tidak di-decode berulang kali
+        chunk = self.file.read(max(self.chunk_size, len(self.buffer) - self.pos))
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+        return bool(chunk)
+
+    def peek(self):
+        """Karakter bukan spasi berikutnya tanpa mengonsumsinya; '' di akhir file"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON tidak valid: '{char}' diharapkan, ditemukan '{found}'")
+        self.pos += 1
+
+    def read_value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Angka di ujung buffer mungkin terpotong batas chunk ("2" dari "2.5"): baca lagi lalu ulangi
+            if not self.buffer[end:].strip("0123456789+-.eE") and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def skip_value(self):
+        char = self.peek()
+        if char == "{":
+            for _ in self.iter_object():
+                self.skip_value()
+        elif char == "[":
+            for _ in self.iter_array():
+                self.skip_value()
+        else:
+            self.read_value()
+
+    def _iter_items(self, open_char, close_char, read_key):
+        self._expect(open_char)
+        if self.peek() == close_char:
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            if read_key:
+                key = self.read_value()
+                self._expect(":")
+                yield key
+            else:
+                yield index
+                index += 1
+            separator = self.peek()
+            self.pos += 1
+            if separator == close_char:
+                return
+            if separator != ",":
+                raise ValueError(f"JSON tidak valid: ',' atau '{close_char}' diharapkan, ditemukan '{separator}'")
+
+    def iter_object(self):
+        """Menghasilkan tiap kunci objek; nilainya harus dibaca pemanggil sebelum lanjut"""
+        return self._iter_items("{", "}", True)
+
+    def iter_array(self):
+        """Menghasilkan indeks tiap elemen array; elemennya harus dibaca pemanggil sebelum lanjut"""
+        return self._iter_items("[", "]", False)
+
+
+def iter_library_records(source):
+    """Rekaman satu library secara streaming, dari file format lama atau direktori index.
+
+    Menghasilkan ("playlist", nama), ("song", nama, posisi, data),
+    ("stat", file_path, stats), ("favorite", file_path) dan
+    ("meta", kunci, nilai) untuk current_playlist/queue/queue_songs.
+    """
+    directory = source if os.path.isdir(source) else None
+    index_path = os.path.join(source, LibraryStorage.INDEX_FILE) if directory else source
+    entries = []
+    with open(index_path, 'r') as f:
+        reader = JsonStreamReader(f)
+        for key in reader.iter_object():
+            if key == "playlists" and reader.peek() == "{":
+                # Format lama: nama playlist -> daftar lagu di file yang sama
+                for name in reader.iter_object():
+                    yield ("playlist", name)
+                    for position in reader.iter_array():
+                        yield ("song", name, position, reader.read_value())
+            elif key == "playlists":
+                entries = reader.read_value()  # Index: hanya nama dan file per playlist
+            elif key == "song_stats":
+                for file_path in reader.iter_object():
+                    yield ("stat", file_path, reader.read_value())
+            elif key == "favorites":
+                for _ in reader.iter_array():
+                    yield ("favorite", reader.read_value())
+            elif key in ("current_playlist", "queue", "queue_songs"):
+                yield ("meta", key, reader.read_value())
+            else:
+                reader.skip_value()
+    for entry in entries:
+        yield ("playlist", entry["name"])
+        try:
+            with open(os.path.join(directory, entry["file"]), 'r') as f:
+                reader = JsonStreamReader(f)
+                for position in reader.iter_array():
+                    yield ("song", entry["name"], position, reader.read_value())
+        except FileNotFoundError:
+            continue
+
+
+@functools.lru_cache(maxsize=65536)
+def content_key(file_path, sample=1 << 16):
+    """Kunci isi file: SHA-1 dari ukuran + 64 KB awal dan akhir; file_path bila tidak terbaca"""
+    try:
+        with open(file_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            digest = hashlib.sha1(str(size).encode())
+            digest.update(f.read(sample))
+            if size > sample:
+                f.seek(max(sample, size - sample))
+                digest.update(f.read(sample))
+    except OSError:
+        return file_path
+    return "sha1:" + digest.hexdigest()
+
+
+class LibraryMerger:
+    """Menggabungkan beberapa library (file format lama atau direktori index) dengan grace hash join.
+
+    Rekaman dari semua sumber dipartisi ke file sementara menurut hash
+    kunci join (file_path, atau hash isi file bila match="content"), lalu
+    tiap partisi digabung di memori dengan dict. Urutan playlist ditulis
+    sebagai run terurut per partisi dan disatukan dengan heapq.merge,
+    sehingga memori dibatasi ukuran satu partisi, bukan ukuran library.
+
+    Aturan penggabungan: play_count dijumlah ("sum") atau diambil terbesar
+    ("max", aman bila library berasal dari salinan yang sama), last_played
+    diambil yang terbaru, favorit digabung, dan metadata lagu diambil dari
+    sumber paling awal. Posisi lagu di playlist adalah rata-rata posisi
+    relatifnya di tiap sumber. Lagu yang di sumber lain sudah berada di
+    playlist selain Default tidak ikut diduplikasi di Default.
+    """
+    MEMORY_BUDGET = 64 * 1024 * 1024
+    MAX_PARTITIONS = 256
+    BYTES_PER_RECORD_BYTE = 4  # Perkiraan memori dict Python per byte rekaman di disk
+
+    def __init__(self, sources, play_counts="max", match="path", memory_budget=MEMORY_BUDGET, temp_dir=None):
+        if play_counts not in ("max", "sum"):
+            raise ValueError("play_counts harus 'max' atau 'sum'")
+        if match not in ("path", "content"):
+            raise ValueError("match harus 'path' atau 'content'")
+        self.sources = list(sources)
+        self.play_counts = play_counts
+        self.match = match
+        self.memory_budget = memory_budget
+        self.temp_dir = temp_dir
+        self.playlist_names = []   # Urutan kemunculan pertama di semua sumber
+        self.playlist_rank = {}
+        self.playlist_lengths = {}  # (sumber, playlist) -> jumlah lagu
+        self.meta = {}              # current_playlist/queue/queue_songs dari sumber pertama yang punya
+
+    def _key(self, file_path):
+        return content_key(file_path) if self.match == "content" else file_path
+
+    def _partition_count(self):
+        total = 0
+        for source in self.sources:
+            if os.path.isdir(source):
+                total += sum(entry.stat().st_size for entry in os.scandir(source) if entry.is_file())
+            else:
+                total += os.path.getsize(source)
+        needed = total * self.BYTES_PER_RECORD_BYTE // max(1, self.memory_budget) + 1
+        return min(self.MAX_PARTITIONS, needed)
+
+    def _partition(self, temp_dir, count):
+        """Tahap 1: satu lintasan per sumber, rekaman disebar ke file partisi menurut hash kunci"""
+        paths = [os.path.join(temp_dir, f"part_{i}.jsonl") for i in range(count)]
+        outputs = [open(path, 'w') for path in paths]
+        try:
+            def emit(key, record):
+                outputs[zlib.crc32(key.encode("utf-8", "surrogateescape")) % count].write(
+                    json.dumps([record[0], key, *record[1:]], separators=(",", ":")) + "\n")
+            for source_index, source in enumerate(self.sources):
+                for record in iter_library_records(source):
+                    kind = record[0]
+                    if kind == "playlist":
+                        name = record[1]
+                        if name not in self.playlist_rank:
+                            self.playlist_rank[name] = len(self.playlist_names)
+                            self.playlist_names.append(name)
+                        self.playlist_lengths[(source_index, name)] = 0
+                    elif kind == "song":
+                        _, name, position, data = record
+                        if data.get("file_path"):
+                            self.playlist_lengths[(source_index, name)] = position + 1
+                            emit(self._key(data["file_path"]), ("s", source_index, name, position, data))
+                    elif kind == "stat":
+                        _, file_path, stats = record
+                        emit(self._key(file_path), ("t", source_index, file_path,
+                                                    stats.get("play_count") or 0, stats.get("last_played")))
+                    elif kind == "favorite":
+                        emit(self._key(record[1]), ("f", source_index, record[1]))
+                    else:
+                        self.meta.setdefault(record[1], record[2])
+        finally:
+            for output in outputs:
+                output.close()
+        return paths
+
+    def _join_partition(self, part_path, run_path, stats_out, favorites_out):
+        """Tahap 2: hash join satu partisi; statistik & favorit langsung ditulis, lagu ke run terurut"""
+        songs = {}        # kunci -> data lagu dari sumber paling awal
+        other_paths = {}  # kunci -> file_path dari statistik/favorit (bila tidak ada lagu)
+        plays = {}        # kunci -> {sumber: play_count terbesar di sumber itu}
+        last_played = {}  # kunci -> waktu terakhir diputar paling baru
+        favorites = set()
+        placements = {}   # kunci -> {playlist: {sumber: (posisi relatif, posisi)}}
+
+        def touch(key, source_index, play_count, played_at):
+            source_plays = plays.setdefault(key, {})
+            source_plays[source_index] = max(source_plays.get(source_index, 0), play_count or 0)
+            if played_at and played_at > (last_played.get(key) or 0):
+                last_played[key] = played_at
+
+        with open(part_path, 'r') as f:
+            for line in f:
+                record = json.loads(line)
+                kind, key, source_index = record[0], record[1], record[2]
+                if kind == "s":
+                    name, position, data = record[3], record[4], record[5]
+                    songs.setdefault(key, data)
+                    touch(key, source_index, data.get("play_count"), data.get("last_played"))
+                    length = self.playlist_lengths[(source_index, name)]
+                    by_source = placements.setdefault(key, {}).setdefault(name, {})
+                    by_source.setdefault(source_index, ((position + 0.5) / length, position))
+                elif kind == "t":
+                    other_paths.setdefault(key, record[3])
+                    touch(key, source_index, record[4], record[5])
                 else:
-                    self.head = current.next
-                
-                if current.next:
-                    current.next.prev = current.prev
+                    other_paths.setdefault(key, record[3])
+                    favorites.add(key)
+
+        run = []
+        for key in plays.keys() | favorites:
+            data = songs.get(key)
+            file_path = data["file_path"] if data else other_paths[key]
+            if key in favorites:
+                favorites_out.write(json.dumps(file_path) + "\n")
+            if key not in plays:
+                continue
+            counts = plays[key].values()
+            play_count = sum(counts) if self.play_counts == "sum" else max(counts)
+            stats = {"play_count": play_count, "last_played": last_played.get(key)}
+            stats_out.write(json.dumps([file_path, stats]) + "\n")
+            if data is None:
+                continue
+            song = dict(data, **stats)
+            in_playlists = placements[key]
+            if len(in_playlists) > 1:
+                in_playlists.pop("Default", None)
+            for name, by_source in in_playlists.items():
+                first_source = min(by_source)
+                order = sum(relative for relative, _ in by_source.values()) / len(by_source)
+                run.append((self.playlist_rank[name], order, first_source, by_source[first_source][1],
+                            dict(song, playlist=name)))
+        run.sort(key=lambda item: item[:4])
+        with open(run_path, 'w') as f:
+            for item in run:
+                f.write(json.dumps(item) + "\n")
+
+    def _merged_playlists(self, run_files):
+        """Tahap 3: k-way merge run per partisi -> (nama, iterator lagu) sesuai urutan playlist"""
+        merged = heapq.merge(*(map(json.loads, f) for f in run_files), key=lambda item: item[:4])
+        groups = itertools.groupby(merged, key=lambda item: item[0])
+        pending = next(groups, None)
+        for rank, name in enumerate(self.playlist_names):
+            if pending is not None and pending[0] == rank:
+                yield name, (item[4] for item in pending[1])
+                pending = next(groups, None)
+            else:
+                yield name, iter(())
+
+    @staticmethod
+    def _write_array(out, items):
+        """Menulis array JSON dari string JSON yang sudah jadi, satu per baris"""
+        out.write("[")
+        count = 0
+        for item in items:
+            out.write(("," if count else "") + "\n" + item)
+            count += 1
+        out.write("\n]")
+        return count
+
+    def _write_common(self, out, stats_path, favorites_path):
+        out.write(',\n"favorites": ')
+        with open(favorites_path, 'r') as f:
+            favorites = self._write_array(out, (line.rstrip("\n") for line in f))
+        out.write(',\n"song_stats": {')
+        unique = 0
+        with open(stats_path, 'r') as f:
+            for line in f:
+                file_path, stats = json.loads(line)
+                out.write(("," if unique else "") + "\n" + json.dumps(file_path) + ": " + json.dumps(stats))
+                unique += 1
+        out.write("\n}")
+        current = self.meta.get("current_playlist", "Default")
+        out.write(',\n"current_playlist": ' + json.dumps(current if current in self.playlist_rank else "Default"))
+        out.write(',\n"queue": ' + json.dumps(self.meta.get("queue", {})))
+        return unique, favorites
+
+    def _write_legacy(self, output, run_files, stats_path, favorites_path):
+        summary = {"playlists": 0, "songs": 0}
+        temp_name = output + ".tmp"
+        with open(temp_name, 'w') as out:
+            out.write('{\n"playlists": {')
+            for name, songs in self._merged_playlists(run_files):
+                out.write(("," if summary["playlists"] else "") + "\n" + json.dumps(name) + ": ")
+                summary["songs"] += self._write_array(out, map(json.dumps, songs))
+                summary["playlists"] += 1
+            out.write("\n}")
+            summary["unique_songs"], summary["favorites"] = self._write_common(out, stats_path, favorites_path)
+            out.write("\n}\n")
+        os.replace(temp_name, output)
+        return summary
+
+    def _write_directory(self, output, run_files, stats_path, favorites_path):
+        if os.path.exists(os.path.join(output, LibraryStorage.INDEX_FILE)):
+            raise ValueError(f"Direktori '{output}' sudah berisi library")
+        os.makedirs(output, exist_ok=True)
+        summary = {"playlists": 0, "songs": 0}
+        entries = []
+        for i, (name, songs) in enumerate(self._merged_playlists(run_files)):
+            duration = [0]
+            def encoded(songs=songs, duration=duration):
+                for song in songs:
+                    duration[0] += Song.from_dict(song).get_duration_seconds()
+                    yield json.dumps(song)
+            file_name = f"playlist_{i}.json"
+            with open(os.path.join(output, file_name), 'w') as out:
+                count = self._write_array(out, encoded())
+            entries.append({"name": name, "file": file_name, "count": count, "duration": duration[0]})
+            summary["songs"] += count
+            summary["playlists"] += 1
+        # index.json ditulis terakhir: library baru dianggap ada setelah semua playlist lengkap
+        temp_name = os.path.join(output, LibraryStorage.INDEX_FILE + ".tmp")
+        with open(temp_name, 'w') as out:
+            out.write('{\n"version": ' + json.dumps(LibraryStorage.FORMAT_VERSION))
+            out.write(',\n"playlists": ' + json.dumps(entries))
+            out.write(',\n"next_file_id": ' + json.dumps(len(entries)))
+            summary["unique_songs"], summary["favorites"] = self._write_common(out, stats_path, favorites_path)
+            out.write(',\n"queue_songs": ' + json.dumps(self.meta.get("queue_songs", [])))
+            out.write("\n}\n")
+        os.replace(temp_name, os.path.join(output, LibraryStorage.INDEX_FILE))
+        return summary
+
+    def merge(self, output):
+        """Menulis hasil gabungan ke output: file .json (format lama) atau direktori (format index).
+
+        Mengembalikan ringkasan jumlah playlist, lagu, lagu unik, favorit dan partisi.
+        """
+        with tempfile.TemporaryDirectory(dir=self.temp_dir) as temp_dir:
+            count = self._partition_count()
+            part_paths = self._partition(temp_dir, count)
+            stats_path = os.path.join(temp_dir, "stats.jsonl")
+            favorites_path = os.path.join(temp_dir, "favorites.jsonl")
+            run_paths = []
+            with open(stats_path, 'w') as stats_out, open(favorites_path, 'w') as favorites_out:
+                for i, part_path in enumerate(part_paths):
+                    run_paths.append(os.path.join(temp_dir, f"run_{i}.jsonl"))
+                    self._join_partition(part_path, run_paths[-1], stats_out, favorites_out)
+                    os.remove(part_path)
+            run_files = [open(path, 'r') for path in run_paths]
+            try:
+                if output.endswith(".json"):
+                    summary = self._write_legacy(output, run_files, stats_path, favorites_path)
                 else:
-                    self.tail = current.prev
-                
-                self.length -= 1
-                return True
-            current = current.next
-        return False
+                    summary = self._write_directory(output, run_files, stats_path, favorites_path)
+            finally:
+                for f in run_files:
+                    f.close()
+        summary["partitions"] = count
+        return summary
 
-    def __iter__(self):
-        """Membuat playlist bisa diiterasi"""
-        current = self.head
-        while current:
-            yield current.song
-            current = current.next
-    
-    def __len__(self):
-        """Mengembalikan jumlah lagu dalam playlist"""
-        return self.length
 
+def merge_libraries(sources, output, play_counts="max", match="path", memory_budget=LibraryMerger.MEMORY_BUDGET):
+    """Menggabungkan beberapa library ke output; lihat LibraryMerger."""
+    return LibraryMerger(sources, play_counts, match, memory_budget).merge(output)
 
-class Song:
-    """Kelas untuk merepresentasikan sebuah lagu beserta metadatanya"""
-    def __init__(self, title, artist, album, duration, file_path, playlist="Default"):
-        self.title = title       # Judul lagu
-        self.artist = artist     # Nama artis
-        self.album = album       # Nama album
-        self.duration = duration # Durasi lagu (format MM:SS)
-        self.file_path = file_path # Lokasi file lagu
-        self.playlist = playlist # Nama playlist
-        self.play_count = 0      # Jumlah kali diputar
-        self.last_played = None  # Waktu terakhir diputar
 
-    def to_dict(self):
-        """Mengubah objek lagu menjadi dictionary untuk penyimpanan"""
-        return {
-            "title": self.title,
-            "artist": self.artist,
-            "album": self.album,
-            "duration": self.duration,
-            "file_path": self.file_path,
-            "playlist": self.playlist,
-            "play_count": self.play_count,
-            "last_played": self.last_played
-        }
+# ==================================================
+# KUNCI BACA-TULIS (AKSES DARI BANYAK THREAD)
+# ==================================================
+class ReadWriteLock:
+    """Kunci baca-tulis re-entrant dengan prioritas penulis.
 
-    def get_duration_seconds(self):
-        """Mengubah durasi lagu menjadi detik"""
+    Banyak pembaca boleh masuk bersamaan; penulis masuk sendirian. Pembaca
+    baru menunggu bila ada penulis yang antre agar penulis tidak kelaparan.
+    Thread yang memegang kunci tulis boleh mengambil kunci baca (dan tulis)
+    lagi; naik dari kunci baca ke kunci tulis tidak didukung karena dua
+    pembaca yang sama-sama naik akan saling menunggu.
+    """
+    def __init__(self):
+        self.condition = threading.Condition(threading.Lock())
+        self.readers = {}          # ident thread -> kedalaman kunci baca
+        self.writer = None         # ident thread pemegang kunci tulis
+        self.write_depth = 0
+        self.waiting_writers = 0
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self.condition:
+            if self.writer != me and me not in self.readers:
+                while self.writer is not None or self.waiting_writers:
+                    self.condition.wait()
+            self.readers[me] = self.readers.get(me, 0) + 1
+
+    def release_read(self):
+        me = threading.get_ident()
+        with self.condition:
+            depth = self.readers[me] - 1
+            if depth:
+                self.readers[me] = depth
+            else:
+                del self.readers[me]
+                if not self.readers:
+                    self.condition.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self.condition:
+            if self.writer == me:
+                self.write_depth += 1
+                return
+            if me in self.readers:
+                raise RuntimeError("kunci baca tidak bisa dinaikkan menjadi kunci tulis")
+            self.waiting_writers += 1
+            try:
+                while self.writer is not None or self.readers:
+                    self.condition.wait()
+            finally:
+                self.waiting_writers -= 1
+            self.writer = me
+            self.write_depth = 1
+
+    def release_write(self):
+        with self.condition:
+            self.write_depth -= 1
+            if not self.write_depth:
+                self.writer = None
+                self.condition.notify_all()
+
+    @contextlib.contextmanager
+    def read(self):
+        self.acquire_read()
         try:
-            minutes, seconds = map(int, self.duration.split(':'))
-            return minutes * 60 + seconds
-        except ValueError:
-            return 0
+            yield
+        finally:
+            self.release_read()
+
+    @contextlib.contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+def _library_reader(method):
+    """Method PlaylistManager yang hanya membaca state yang sudah ada di memori"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock.read():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _library_writer(method):
+    """Method PlaylistManager yang mengubah state; dijalankan sendirian"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock.write():
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 # ==================================================
 # KELAS MANAJEMEN PLAYLIST
 # ==================================================
 class PlaylistManager:
-    """Kelas untuk mengelola semua playlist dan operasinya"""
-    def __init__(self):
-        self.playlists = {"Default": PlaylistLinkedList()}  # Daftar playlist
+    """Kelas untuk mengelola semua playlist dan operasinya.
+
+    Aman dipakai dari beberapa thread: method yang mengubah library memegang
+    kunci tulis, method baca memegang kunci baca sehingga bisa berjalan
+    bersamaan. View yang dikembalikan bersifat lazy; thread lain yang
+    mengiterasinya perlu membungkus iterasi dengan reading().
+    """
+    def __init__(self, storage=None, max_bytes=None):
+        self.lock = ReadWriteLock()  # Melindungi playlist, statistik, favorit, indeks dan riwayat
+        self.storage = storage or LibraryStorage()  # index + satu file per playlist
+        # Daftar playlist; isi playlist dimuat saat dibutuhkan dan dibuang bila melebihi anggaran
+        self.playlists = PlaylistStore(self.storage, max_bytes,
+                                       on_load=self._on_playlist_loaded, on_evict=self._on_playlist_evicted)
+        self.playlists["Default"] = PlaylistLinkedList()
         self.current_playlist = "Default"  # Playlist aktif
         self.current_song_index = 0      # Indeks lagu yang sedang diputar
         self.playing = False             # Status pemutaran
@@ -124,134 +3680,593 @@ class PlaylistManager:
         self.recently_played = []        # Riwayat lagu yang diputar
         self.favorite_songs = set()      # Daftar lagu favorit
         self.song_stats = {}             # Statistik lagu
+        self.playback_queue = PlaybackQueue()  # Antrian "Up Next"
+        self.history = LibraryHistory()  # Riwayat undo/redo (versi persisten)
+        self.history.reset(self._build_state())
+        self.search_index = FuzzySearchIndex()  # Indeks trigram untuk pencarian fuzzy
+        self.facets = {}  # nama playlist -> FacetIndex, dibangun saat pertama kali dijelajah
+        self.sorter = ExternalSorter()  # Sorting paralel/eksternal untuk playlist sangat besar
+        self.play_log = None  # PlayEventLog opsional, diisi oleh aplikasi
+        self.recommender = CoPlayRecommender()  # Dibangun saat rekomendasi pertama diminta
+
+    @property
+    def current_playlist(self):
+        return self._current_playlist
+
+    @current_playlist.setter
+    def current_playlist(self, name):
+        # Playlist aktif tidak pernah dibuang dari memori, dan dimuat di sini di bawah kunci tulis
+        # agar pembaca berikutnya cukup memegang kunci baca
+        with self.lock.write():
+            self._current_playlist = name
+            self.playlists.pinned = {name}
+            if name in self.playlists and not self.playlists.is_loaded(name):
+                self.playlists[name]
+
+    @contextlib.contextmanager
+    def reading(self, names=None):
+        """Akses baca ke library, mis. untuk mengiterasi view dari thread lain.
+
+        Memuat playlist dari disk mengubah state (statistik, indeks, LRU),
+        jadi bila playlist yang dibutuhkan (default: semua) belum dimuat,
+        kunci tulis yang dipakai.
+        """
+        self.lock.acquire_read()
+        try:
+            needed = self.playlists.keys() if names is None else names
+            loaded = all(name not in self.playlists or self.playlists.is_loaded(name) for name in needed)
+        except BaseException:
+            self.lock.release_read()
+            raise
+        if loaded:
+            try:
+                yield
+            finally:
+                self.lock.release_read()
+        else:
+            self.lock.release_read()
+            with self.lock.write():
+                yield
 
+    def _on_playlist_loaded(self, name, playlist):
+        """Dipanggil PlaylistStore setelah sebuah playlist dimuat dari disk"""
+        for song in playlist:
+            stats = self.song_stats.setdefault(
+                song.file_path, {'play_count': song.play_count, 'last_played': song.last_played})
+            song.play_count = stats['play_count']
+            song.last_played = stats['last_played']
+            self.search_index.add(song)
+        self.history.track_playlist(name, (song.to_record() for song in playlist))
+
+    def _on_playlist_evicted(self, name, playlist):
+        """Lagu yang tidak ada di playlist lain yang masih dimuat dikeluarkan dari indeks pencarian"""
+        others = list(self.playlists.loaded.values())
+        for song in playlist:
+            if not any(song.file_path in other.members for other in others):
+                self.search_index.remove_path(song.file_path)
+        self.facets.pop(name, None)
+
+    def _build_state(self):
+        """Membangun LibraryState dari playlist yang sedang dimuat (hanya saat memuat library).
+        Playlist lain ditambahkan ke riwayat saat pertama kali dimuat (track_playlist)."""
+        return LibraryState(
+            playlists=PersistentMap.from_items(
+                (name, PersistentSequence.from_iterable(song.to_record() for song in playlist))
+                for name, playlist in self.playlists.loaded.items()
+            ),
+            favorites=PersistentMap.from_items((path, True) for path in self.favorite_songs),
+            stats=PersistentMap.from_items(
+                (path, (stats['play_count'], stats['last_played']))
+                for path, stats in self.song_stats.items()
+            ),
+            current_playlist=self.current_playlist
+        )
+
+    def _state_playlist(self, state, name):
+        return self.history.sequence(state.playlists, name) or PersistentSequence()
+
+    @_library_writer
     def add_song(self, song, playlist=None):
         if playlist is None:
             playlist = self.current_playlist
         if playlist not in self.playlists:
             self.playlists[playlist] = PlaylistLinkedList()
         self.playlists[playlist].append(song)
+        self.search_index.add(song)
+        if playlist in self.facets:
+            self.facets[playlist].add(song)
+        state = self.history.state
+        sequence = self._state_playlist(state, playlist).append(song.to_record())
+        stats = state.stats
         if song.file_path not in self.song_stats:
             self.song_stats[song.file_path] = {
                 'play_count': 0, 'last_played': None
             }
+            stats = stats.set(song.file_path, (0, None))
+        self.history.commit("Tambah lagu", state.replace(
+            playlists=state.playlists.set(playlist, sequence), stats=stats))
 
+    @_library_writer
     def create_playlist(self, name):
         if name not in self.playlists:
             self.playlists[name] = PlaylistLinkedList()
+            state = self.history.state
+            self.history.commit("Buat playlist", state.replace(
+                playlists=state.playlists.set(name, PersistentSequence())))
             return True
         return False
 
+    @_library_writer
     def rename_playlist(self, old_name, new_name):
         if old_name in self.playlists and new_name not in self.playlists:
             self.playlists[new_name] = self.playlists.pop(old_name)
+            if old_name in self.facets:
+                self.facets[new_name] = self.facets.pop(old_name)
             for song in self.playlists[new_name]:
                 song.playlist = new_name
             if self.current_playlist == old_name:
                 self.current_playlist = new_name
+            state = self.history.state
+            sequence = self._state_playlist(state, old_name)
+            self.history.commit("Ganti nama playlist", state.replace(
+                playlists=self.history.without(state.playlists, old_name).set(new_name, sequence),
+                current_playlist=self.current_playlist))
             return True
         return False
 
+    @_library_writer
     def delete_playlist(self, name):
-        if name in self.playlists and name != "Default":
-            for song in self.playlists[name]:
-                song.playlist = "Default"
-                self.playlists["Default"].append(song)
-            del self.playlists[name]
-            if self.current_playlist == name:
-                self.current_playlist = "Default"
-            return True
-        return False
+        """Menghapus playlist; lagunya dipindah ke Default tanpa duplikat."""
+        if name == "Default":
+            return False
+        return self.merge_playlist(name, "Default", label="Hapus playlist")
 
+    @_library_writer
+    def merge_playlist(self, name, target, label="Gabung playlist"):
+        """Memindahkan semua lagu playlist name ke akhir target lalu menghapus name.
+
+        Lagu yang sudah ada di target dilewati; sisanya disambung sekaligus
+        dengan concat, tanpa menyisipkan node satu per satu.
+        """
+        if name == target or name not in self.playlists or target not in self.playlists:
+            return False
+        state = self.history.state
+        source = self.playlists[name]
+        destination = self.playlists[target]
+        target_sequence = self._state_playlist(state, target)
+        facets = self.facets.get(target)
+        seen = set()
+        node = source.head
+        while node:
+            next_node = node.next
+            song = node.song
+            if song in destination or song.file_path in seen:
+                source._unlink(node)  # Duplikat di target atau di playlist itu sendiri
+            else:
+                seen.add(song.file_path)
+                song.playlist = target
+                target_sequence = target_sequence.append(song.to_record())
+                if facets:
+                    facets.add(song)
+            node = next_node
+        destination.concat(source)
+        del self.playlists[name]
+        self.facets.pop(name, None)
+        if self.current_playlist == name:
+            self.current_playlist = target
+        self.history.commit(label, state.replace(
+            playlists=self.history.without(state.playlists, name).set(target, target_sequence),
+            current_playlist=self.current_playlist))
+        return True
+
+    @_library_writer
     def update_song(self, old_song, new_song_data):
-        for playlist in self.playlists.values():
-            playlist.remove(old_song)
-        new_playlist = new_song_data.get("playlist", self.current_playlist)
-        if new_playlist not in self.playlists:
-            self.playlists[new_playlist] = PlaylistLinkedList()
-        updated_song = Song(
-            title=new_song_data["title"], artist=new_song_data["artist"],
-            album=new_song_data["album"], duration=old_song.duration,
-            file_path=old_song.file_path, playlist=new_playlist
-        )
-        if old_song.file_path in self.song_stats:
-            updated_song.play_count = old_song.play_count
-            updated_song.last_played = old_song.last_played
-            self.song_stats[updated_song.file_path] = {
-                'play_count': updated_song.play_count, 'last_played': updated_song.last_played
-            }
-        self.playlists[new_playlist].append(updated_song)
+        self.update_songs([(old_song, new_song_data)])
+
+    @_library_writer
+    def update_songs(self, updates, label="Edit lagu"):
+        """Memperbarui banyak lagu sekaligus dalam satu kali penelusuran playlist.
+
+        updates berisi pasangan (lagu, data); kunci yang kosong atau tidak ada
+        di data (title/artist/album/playlist) dipertahankan. Lagu yang tetap
+        di playlist yang sama tidak berpindah posisi.
+        """
+        targets = {}  # file_path -> (lagu, playlist tujuan atau None jika tidak pindah, field baru)
+        for song, data in updates:
+            new_playlist = data.get("playlist") or None
+            if new_playlist:
+                if new_playlist not in self.playlists:
+                    self.playlists[new_playlist] = PlaylistLinkedList()
+                song.playlist = new_playlist
+            fields = {field: data[field] for field in ("title", "artist", "album") if data.get(field)}
+            for field, value in fields.items():
+                setattr(song, field, value)
+            targets[song.file_path] = (song, new_playlist, fields)
+        if not targets:
+            return
+
+        state = self.history.state
+        state_playlists = state.playlists
+        placed = set()  # file_path yang sudah ada di playlist tujuannya
+        kept = {}       # file_path -> objek Song yang tetap berada di sebuah playlist
+        # Hanya playlist yang memuat lagu-lagu ini yang dimuat dan ditelusuri
+        for name in self.playlists.playlists_with(targets):
+            playlist = self.playlists[name]
+            sequence = self._state_playlist(state, name)
+            facets = self.facets.get(name)
+            changed = False
+            node = playlist.head
+            index = 0
+            while node:
+                next_node = node.next
+                target = targets.get(node.song.file_path)
+                if target:
+                    song, new_playlist, fields = target
+                    if new_playlist is None or (name == new_playlist and song.file_path not in placed):
+                        # Perbarui objek Song milik playlist ini di tempat agar posisinya tidak berubah
+                        own = node.song
+                        for field, value in fields.items():
+                            setattr(own, field, value)
+                        sequence = sequence.set(index, own.to_record())
+                        placed.add(song.file_path)
+                        kept.setdefault(song.file_path, own)
+                        index += 1
+                        if facets:
+                            facets.add(own)
+                    else:
+                        playlist._unlink(node)
+                        sequence = sequence.delete(index)
+                        if facets:
+                            facets.remove_path(song.file_path)
+                    changed = True
+                else:
+                    index += 1
+                node = next_node
+            if changed:
+                playlist.version += 1  # Field lagu bisa berubah tanpa relink
+                state_playlists = state_playlists.set(name, sequence)
+
+        # Lagu yang pindah playlist ditambahkan di akhir playlist tujuan
+        for file_path, (song, new_playlist, fields) in targets.items():
+            if new_playlist and file_path not in placed:
+                self.playlists[new_playlist].append(song)
+                if new_playlist in self.facets:
+                    self.facets[new_playlist].add(song)
+                sequence = self.history.sequence(state_playlists, new_playlist) or PersistentSequence()
+                state_playlists = state_playlists.set(new_playlist, sequence.append(song.to_record()))
+                kept[file_path] = song
+            queued = self.playback_queue.nodes.get(file_path)
+            if queued is not None:
+                # Antrian bisa memegang objek Song dari playlist lain atau dari playlist yang belum dimuat
+                for field, value in fields.items():
+                    setattr(queued.song, field, value)
+            self.search_index.add(kept.get(file_path, song))
+        self.history.commit(label, state.replace(playlists=state_playlists))
 
+    @_library_writer
+    def move_songs(self, songs, playlist):
+        """Memindahkan banyak lagu ke satu playlist dalam satu operasi."""
+        self.update_songs([(song, {"playlist": playlist}) for song in songs], label="Pindah playlist")
+
+    @_library_writer
     def delete_song(self, song_to_delete):
-        for playlist_name in self.playlists:
-            self.playlists[playlist_name].remove(song_to_delete)
-        if song_to_delete.file_path in self.favorite_songs:
-            self.favorite_songs.remove(song_to_delete.file_path)
-        if song_to_delete.file_path in self.song_stats:
-            del self.song_stats[song_to_delete.file_path]
+        self.delete_songs([song_to_delete])
+
+    @_library_writer
+    def delete_songs(self, songs_to_delete):
+        """Menghapus banyak lagu dari semua playlist dalam satu kali penelusuran."""
+        paths = {song.file_path for song in songs_to_delete}
+        if not paths:
+            return
+        state = self.history.state
+        state_playlists = state.playlists
+        for name in self.playlists.playlists_with(paths):
+            playlist = self.playlists[name]
+            sequence = self._state_playlist(state, name)
+            facets = self.facets.get(name)
+            changed = False
+            node = playlist.head
+            index = 0
+            while node:
+                next_node = node.next
+                if node.song.file_path in paths:
+                    playlist._unlink(node)
+                    if facets:
+                        facets.remove_path(node.song.file_path)
+                    sequence = sequence.delete(index)
+                    changed = True
+                else:
+                    index += 1
+                node = next_node
+            if changed:
+                state_playlists = state_playlists.set(name, sequence)
+
+        favorites = state.favorites
+        stats = state.stats
+        for song in songs_to_delete:
+            self.playback_queue.remove(song)
+            self.search_index.remove(song)
+            if song.file_path in self.favorite_songs:
+                self.favorite_songs.remove(song.file_path)
+                favorites = favorites.delete(song.file_path)
+            if song.file_path in self.song_stats:
+                del self.song_stats[song.file_path]
+                # Statistik lagu tetap ada di versi sebelumnya sehingga bisa dipulihkan
+                stats = stats.delete(song.file_path)
+        self.history.commit("Hapus lagu", state.replace(
+            playlists=state_playlists, favorites=favorites, stats=stats))
+
+    def _restore_state(self, state, before):
+        """Menyamakan playlist di memori dengan sebuah versi LibraryState.
+
+        before adalah versi yang aktif sebelum undo/redo. Berkat berbagi
+        struktur, playlist yang tidak berubah memegang PersistentSequence yang
+        sama di kedua versi, jadi hanya playlist yang berbeda yang dibangun
+        ulang. Playlist itu diisi ulang di objek yang sama dan memakai ulang
+        objek Song per file_path, sehingga view, antrian dan lagu yang sedang
+        diputar tetap valid.
+        """
+        history = self.history
+        names = history.playlist_names(state.playlists)
+        names += [name for name in history.playlist_names(before.playlists) if name not in names]
+        changed = [name for name in names
+                   if history.sequence(before.playlists, name) is not history.sequence(state.playlists, name)]
+        old_songs = {}  # (nama, file_path) -> objek Song yang ada sebelum undo/redo
+        before_paths = set()
+        for name in changed:
+            before_paths.update(record[4] for record in history.sequence(before.playlists, name) or ())
+            if name in self.playlists and self.playlists.is_loaded(name):
+                for song in self.playlists[name]:
+                    old_songs.setdefault((name, song.file_path), []).append(song)
+
+        # Lagu dipasangkan dulu dengan objek lama di playlist yang sama
+        entries = {}
+        for name in changed:
+            sequence = history.sequence(state.playlists, name)
+            if sequence is None:
+                continue
+            entries[name] = []
+            for record in sequence:
+                songs = old_songs.get((name, record[4]))
+                entries[name].append((record, songs.pop() if songs else None))
+        # Sisanya (mis. lagu yang dipindah antar playlist) memakai objek dari playlist asalnya
+        leftovers = {}
+        for (_, file_path), songs in old_songs.items():
+            leftovers.setdefault(file_path, []).extend(songs)
+
+        restored = {}
+        created = {}  # file_path -> objek Song baru
+        for name in changed:
+            self.facets.pop(name, None)
+            if name not in entries:
+                if name in self.playlists:
+                    self.playlists.discard(name)
+                continue
+            if name in self.playlists and self.playlists.is_loaded(name):
+                playlist = self.playlists[name]
+                playlist.clear()
+            else:
+                playlist = self.playlists[name] = PlaylistLinkedList()
+            for (title, artist, album, duration, file_path), song in entries[name]:
+                if song is None and leftovers.get(file_path):
+                    song = leftovers[file_path].pop()
+                if song is None:
+                    song = Song(title=title, artist=artist, album=album, duration=duration, file_path=file_path)
+                    # Statistik pemutaran tidak ikut di-undo: pakai yang terbaru bila ada
+                    stats = self.song_stats.get(file_path)
+                    if stats is None:
+                        play_count, last_played = state.stats.get(file_path, (0, None))
+                        stats = self.song_stats[file_path] = {'play_count': play_count, 'last_played': last_played}
+                    song.play_count = stats['play_count']
+                    song.last_played = stats['last_played']
+                    created[file_path] = song
+                else:
+                    song.title, song.artist, song.album, song.duration = title, artist, album, duration
+                song.playlist = name
+                playlist.append(song)
+                restored[file_path] = song
+        if "Default" not in self.playlists:
+            self.playlists["Default"] = PlaylistLinkedList()
+        self.favorite_songs = set(state.favorites.keys())
+        # Tetap di playlist yang sedang dibuka bila masih ada
+        if self.current_playlist not in self.playlists:
+            self.current_playlist = state.current_playlist if state.current_playlist in self.playlists else "Default"
+
+        # Lagu yang tidak lagi ada di playlist mana pun yang dimuat dikeluarkan
+        loaded = [playlist for _, playlist in self.playlists.loaded_items()]
+        gone = {file_path for file_path in before_paths - restored.keys()
+                if not any(file_path in playlist.members for playlist in loaded)}
+        for file_path in gone:
+            self.search_index.remove_path(file_path)
+            self.song_stats.pop(file_path, None)
+            queued = self.playback_queue.nodes.get(file_path)
+            if queued is not None:
+                self.playback_queue.remove(queued.song)
+        for song in restored.values():
+            self.search_index.add(song)
+        for file_path, song in created.items():
+            queued = self.playback_queue.nodes.get(file_path)
+            if queued is not None:
+                queued.song = song
+        self.recently_played = [created.get(s.file_path, s) for s in self.recently_played if s.file_path not in gone]
+
+    @_library_writer
+    def undo(self):
+        """Membatalkan perubahan terakhir; mengembalikan labelnya atau None."""
+        before = self.history.state
+        result = self.history.undo()
+        if result is None:
+            return None
+        label, state = result
+        self._restore_state(state, before)
+        return label
+
+    @_library_writer
+    def redo(self):
+        """Mengulangi perubahan yang dibatalkan; mengembalikan labelnya atau None."""
+        before = self.history.state
+        result = self.history.redo()
+        if result is None:
+            return None
+        label, state = result
+        self._restore_state(state, before)
+        return label
+
+    def get_playlist_view(self, name=None):
+        """View lazy atas sebuah playlist (default: playlist aktif), tanpa menyalin."""
+        if name is None:
+            name = self.current_playlist
+        with self.reading([name]):
+            playlist = self.playlists.get(name)
+            if playlist is None:
+                playlist = PlaylistLinkedList()
+            return PlaylistView(playlist, sorter=self.sorter)
 
     def get_current_playlist_songs(self):
-        songs = list(self.playlists.get(self.current_playlist, PlaylistLinkedList()))
-        # Untuk mendapatkan lagu tanpa diurutkan, panggil langsung
-        return songs
+        # Urutan asli playlist, tanpa diurutkan; kunci dipegang oleh get_playlist_view
+        return self.get_playlist_view()
     
     def get_sorted_playlist_songs(self):
-        """Mendapatkan daftar lagu di playlist aktif dan mengurutkannya."""
-        songs = list(self.playlists.get(self.current_playlist, PlaylistLinkedList()))
-        # Panggil merge_sort biasa (non-generator) untuk hasil akhir
-        return self._merge_sort_final(songs, self.sort_criteria, self.sort_order)
+        """View lagu di playlist aktif sesuai kriteria dan urutan yang dipilih."""
+        view = self.get_playlist_view()
+        descending = self.sort_order == "descending"
+        if self.sort_criteria == "manual":
+            # Urutan manual mengikuti urutan linked list apa adanya
+            return view.sorted(reverse=descending)
+        criteria = self.sort_criteria
+        return view.sorted(key=lambda song: self._get_song_value(song, criteria), reverse=descending)
+
+    def get_facets(self, name=None):
+        """FacetIndex untuk sebuah playlist (default: playlist aktif); dibangun sekali lalu dijaga."""
+        if name is None:
+            name = self.current_playlist
+        with self.reading([name]):
+            facets = self.facets.get(name)
+            if facets is None:
+                # Dua pembaca bisa sama-sama membangun; hasilnya sama, yang terakhir dipakai
+                facets = self.facets[name] = FacetIndex(self.playlists.get(name) or ())
+            return facets
+
+    def fuzzy_search(self, query, limit=50):
+        """Pencarian fuzzy di playlist aktif, hasil diurutkan berdasarkan relevansi."""
+        if self.search_index.pending:
+            # Indeks dibangun sekali di bawah kunci tulis; pencarian berikutnya cukup membaca
+            with self.lock.write():
+                self.search_index._ensure_built()
+        name = self.current_playlist
+        with self.reading([name]):
+            playlist = self.playlists.get(name, PlaylistLinkedList())
+            allowed_paths = {song.file_path for song in playlist}
+            return self.search_index.search(query, allowed_paths, limit)
+
+    @_library_writer
+    def move_song(self, old_index, new_index, playlist=None):
+        """Memindahkan lagu dari old_index ke new_index di playlist (untuk urutan manual), O(log n)."""
+        if playlist is None:
+            playlist = self.current_playlist
+        if playlist not in self.playlists:
+            return False
+        songs = self.playlists[playlist]
+        if not 0 <= old_index < len(songs):
+            return False
+        new_index = max(0, min(new_index, len(songs) - 1))
+        node = songs.node_at(old_index)
+        songs.move(node, new_index)
+        state = self.history.state
+        song_record = node.song.to_record()
+        sequence = self._state_playlist(state, playlist).delete(old_index).insert(new_index, song_record)
+        self.history.commit("Pindah lagu", state.replace(playlists=state.playlists.set(playlist, sequence)))
+        return True
 
 
+    @_library_reader
     def get_total_song_count(self):
-        unique_songs = set()
-        for playlist in self.playlists.values():
-            for song in playlist:
-                unique_songs.add(song.file_path)
-        return len(unique_songs)
+        # song_stats memuat setiap lagu di library, termasuk di playlist yang belum dimuat
+        return len(self.song_stats)
 
-    def save_to_file(self, filename):
-        data = {
-            "playlists": {
-                name: [song.to_dict() for song in playlist]
-                for name, playlist in self.playlists.items()
-            },
+    @_library_reader
+    def get_playlist_summaries(self):
+        """Daftar (nama, jumlah lagu, total durasi detik) tanpa memuat playlist"""
+        return [(name, *self.playlists.summary(name)) for name in self.playlists.keys()]
+
+    @_library_writer
+    def snapshot_library(self):
+        """Menyiapkan file yang perlu ditulis: playlist yang berubah lalu index.json.
+
+        Mengembalikan (files, nomor snapshot) untuk LibraryStorage.write, yang
+        aman dijalankan di thread worker.
+        """
+        sequence = self.storage.next_sequence()
+        files = self.playlists.snapshot()
+        files[LibraryStorage.INDEX_FILE] = {
+            "version": LibraryStorage.FORMAT_VERSION,
+            "playlists": self.playlists.index_entries(),
+            "next_file_id": self.playlists.next_file_id,
+            "song_files": self.playlists.song_files_entries(),
             "favorites": list(self.favorite_songs),
-            "song_stats": self.song_stats,
-            "current_playlist": self.current_playlist
+            "song_stats": {path: dict(stats) for path, stats in self.song_stats.items()},
+            "current_playlist": self.current_playlist,
+            "queue": self.playback_queue.to_dict(),
+            # Lagu di antrian bisa berasal dari playlist yang belum dimuat
+            "queue_songs": [song.to_dict() for song in self.playback_queue]
         }
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=4)
+        self.storage.stage(files, sequence)
+        return files, sequence
 
-    def load_from_file(self, filename):
-        try:
-            with open(filename, 'r') as f:
-                data = json.load(f)
-                for playlist_name, songs_data in data.get("playlists", {}).items():
-                    self.playlists[playlist_name] = PlaylistLinkedList()
-                    for song_data in songs_data:
-                        song = Song(
-                            title=song_data.get('title', 'Unknown Title'),
-                            artist=song_data.get('artist', 'Unknown Artist'),
-                            album=song_data.get('album', 'Unknown Album'),
-                            duration=song_data.get('duration', '0:00'),
-                            file_path=song_data.get('file_path'),
-                            playlist=song_data.get('playlist', 'Default')
-                        )
-                        song.play_count = song_data.get('play_count', 0)
-                        song.last_played = song_data.get('last_played', None)
-                        if song.file_path:
-                            self.playlists[playlist_name].append(song)
-                            if song.file_path not in self.song_stats:
-                                self.song_stats[song.file_path] = {
-                                    'play_count': song.play_count,
-                                    'last_played': song.last_played
-                                }
-                self.favorite_songs = set(data.get("favorites", []))
-                self.current_playlist = data.get("current_playlist", "Default")
-                if self.current_playlist not in self.playlists:
-                    self.current_playlist = "Default"
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.save_to_file(filename)
+    @_library_writer
+    def save(self):
+        """Menyimpan perubahan secara sinkron (misalnya saat aplikasi ditutup)"""
+        self.storage.write(*self.snapshot_library())
+
+    @_library_writer
+    def load(self):
+        self.apply_library_index(self.storage.read_index())
+
+    @_library_writer
+    def apply_library_index(self, index):
+        """Memasang index hasil LibraryStorage.read_index; hanya playlist aktif yang dimuat."""
+        if index is None:
+            self.save()
+            return
+        self.search_index.rebuild([])
+        self.facets = {}
+        self.song_stats = {path: dict(stats) for path, stats in index.get("song_stats", {}).items()}
+        self.favorite_songs = set(index.get("favorites", []))
+        self.playlists.reset(index.get("playlists", []), index.get("next_file_id", 0), index.get("song_files"))
+        if "Default" not in self.playlists:
+            self.playlists["Default"] = PlaylistLinkedList()
+        current = index.get("current_playlist", "Default")
+        self.current_playlist = current if current in self.playlists else "Default"
+        self.history.reset(LibraryState())
+        current_songs = self.playlists[self.current_playlist]
+        self.history.reset(self._build_state())
+        songs_by_path = {}
+        for song_data in index.get("queue_songs", []):
+            if song_data.get("file_path"):
+                songs_by_path[song_data["file_path"]] = Song.from_dict(song_data)
+        for song in current_songs:
+            songs_by_path[song.file_path] = song
+        self.playback_queue.load(index.get("queue", {}), songs_by_path)
+
+    @_library_reader
+    def save_to_file(self, filename):
+        """Mengekspor seluruh library ke satu file JSON (format lama).
+
+        Playlist ditulis satu per satu; yang belum dimuat dibaca langsung dari
+        filenya tanpa dimuat ke memori.
+        """
+        with open(filename, 'w') as f:
+            f.write('{"playlists": {')
+            for i, name in enumerate(self.playlists.keys()):
+                f.write(f'{", " if i else ""}{json.dumps(name)}: {json.dumps(self.playlists.peek(name))}')
+            f.write('}, ')
+            rest = json.dumps({
+                "favorites": list(self.favorite_songs),
+                "song_stats": {path: dict(stats) for path, stats in self.song_stats.items()},
+                "current_playlist": self.current_playlist,
+                "queue": self.playback_queue.to_dict()
+            })
+            f.write(rest[1:])
 
     # --- PERUBAHAN UNTUK ANIMASI SORTING ---
     def merge_sort_for_animation(self, arr, criteria, order, start_index=0):
@@ -341,6 +4356,7 @@ class PlaylistManager:
         return merged
 
     # ... (Sisa fungsi PlaylistManager tidak berubah) ...
+    @_library_writer
     def record_play(self, song):
         song.play_count += 1
         song.last_played = time.time()
@@ -353,31 +4369,537 @@ class PlaylistManager:
         self.recently_played.insert(0, song)
         if len(self.recently_played) > 10:
             self.recently_played = self.recently_played[:10]
+        self.recommender.observe_play(song.file_path, song.last_played)
+
+    def _ensure_recommender(self):
+        if not self.recommender.built:
+            with self.lock.write():
+                if not self.recommender.built:
+                    # Urutan file_path dibaca tanpa memuat playlist ke memori
+                    self.recommender.rebuild(
+                        (self.playlists.file_paths(name) for name in self.playlists.keys()), self.play_log)
+
+    def get_similar_songs(self, song, n=10):
+        self._ensure_recommender()
+        with self.lock.read():
+            similar = self.recommender.similar(song.file_path, n, allowed_paths=self.playlists.all_paths())
+            songs_by_path = self.get_songs_by_path(path for path, _ in similar)
+            return [songs_by_path[path] for path, _ in similar if path in songs_by_path]
+
+    @_library_writer
+    def create_auto_mix(self, seed_song, length=25):
+        """Membuat playlist baru dari lagu-lagu yang mirip dengan seed_song.
+        Mengembalikan (nama playlist, jumlah lagu)."""
+        self._ensure_recommender()
+        paths = self.recommender.auto_mix(seed_song.file_path, length, allowed_paths=self.playlists.all_paths())
+        songs_by_path = self.get_songs_by_path(paths)
+        base_name = f"Mix: {seed_song.title}"
+        name, suffix = base_name, 2
+        while name in self.playlists:
+            name, suffix = f"{base_name} ({suffix})", suffix + 1
+        playlist = PlaylistLinkedList()
+        for file_path in paths:
+            source = songs_by_path.get(file_path, seed_song)
+            song = Song(*source.to_record()[:4], file_path=source.file_path, playlist=name)
+            song.play_count = source.play_count
+            song.last_played = source.last_played
+            playlist.append(song)
+        self.playlists[name] = playlist
+        state = self.history.state
+        sequence = PersistentSequence.from_iterable(song.to_record() for song in playlist)
+        self.history.commit("Buat auto-mix", state.replace(
+            playlists=state.playlists.set(name, sequence)))
+        return name, len(playlist)
+
+    @_library_writer
+    def log_listen(self, song, started_at, seconds):
+        """Mencatat berapa lama sebuah lagu benar-benar didengarkan."""
+        if self.play_log is not None and seconds >= 1:
+            self.play_log.append(song.file_path, started_at, seconds)
+
+    def get_songs_by_path(self, file_paths):
+        """file_path -> Song untuk file_paths yang ada di library.
+
+        Hanya playlist yang memuat lagu-lagu itu yang dibaca; playlist yang
+        belum dimuat dibaca dari filenya tanpa masuk ke memori, dan lagunya
+        memakai statistik dari song_stats.
+        """
+        wanted = set(file_paths)
+        songs_by_path = {}
+        with self.lock.read():
+            for name in self.playlists.playlists_with(wanted):
+                if self.playlists.is_loaded(name):
+                    for song in self.playlists[name]:
+                        if song.file_path in wanted:
+                            songs_by_path.setdefault(song.file_path, song)
+                    continue
+                for song_data in self.playlists.peek(name):
+                    file_path = song_data["file_path"]
+                    if file_path in wanted and file_path not in songs_by_path:
+                        song = songs_by_path[file_path] = Song.from_dict(song_data)
+                        song.playlist = name
+                        stats = self.song_stats.get(file_path)
+                        if stats:
+                            song.play_count = stats['play_count']
+                            song.last_played = stats['last_played']
+        return songs_by_path
 
+    @_library_reader
+    def get_library_paths(self):
+        """Semua file_path di library tanpa memuat playlist"""
+        return self.playlists.all_paths()
+
+    @_library_writer
     def toggle_favorite(self, song):
+        state = self.history.state
         if song.file_path in self.favorite_songs:
             self.favorite_songs.remove(song.file_path)
+            self.history.commit("Hapus favorit", state.replace(favorites=state.favorites.delete(song.file_path)))
+            return False
+        else:
+            self.favorite_songs.add(song.file_path)
+            self.history.commit("Tambah favorit", state.replace(favorites=state.favorites.set(song.file_path, True)))
+            return True
+
+    @_library_reader
+    def is_favorite(self, song):
+        return song.file_path in self.favorite_songs
+
+    @_library_reader
+    def get_shuffle_weight(self, song):
+        """Bobot mode acak berbobot: utamakan lagu jarang diputar & lama tidak diputar."""
+        stats = self.song_stats.get(song.file_path, {})
+        play_count = stats.get('play_count', song.play_count)
+        last_played = stats.get('last_played', song.last_played)
+        weight = 1.0 / (1 + play_count)
+        if last_played:
+            # Lagu yang baru saja diputar bobotnya kecil, pulih penuh setelah 7 hari
+            days_since = (time.time() - last_played) / 86400
+            weight *= 0.05 + min(days_since / 7, 1.0)
+        if song.file_path in self.favorite_songs:
+            weight *= 2
+        return weight
+
+    @_library_reader
+    def get_most_played_songs(self, n=10):
+        """Lagu paling sering diputar, dihitung dari song_stats tanpa menelusuri playlist."""
+        count = n
+        while True:
+            top = heapq.nlargest(count, self.song_stats.items(), key=lambda item: item[1]['play_count'])
+            songs_by_path = self.get_songs_by_path(path for path, _ in top)
+            songs = [songs_by_path[path] for path, _ in top if path in songs_by_path]
+            if len(songs) >= n or len(top) < count:
+                return songs[:n]
+            count *= 2  # Sebagian statistik milik lagu yang sudah tidak ada
+
+    @_library_reader
+    def get_recently_played(self, n=10):
+        return self.recently_played[:n]
+
+
+# ==================================================
+# SERVER HTTP LOKAL (STREAMING KE JARINGAN)
+# ==================================================
+class LibraryServer:
+    """Server HTTP asyncio agar library bisa dijelajah dan diputar dari mesin lain di LAN.
+
+    Endpoint JSON: /api/playlists, /api/playlists/<nama>, /api/search dan
+    /api/stats. Audio dialirkan lewat /stream/<id> dengan dukungan Range,
+    If-Range dan ETag; isi file dikirim dengan loop.sendfile (zero-copy
+    bila soketnya mendukung). Semua akses ke PlaylistManager lewat
+    dispatch: None berarti manager dimiliki satu thread executor milik
+    server (event loop tidak pernah ikut terblokir), selain itu dispatch(fn)
+    harus mengembalikan concurrent.futures.Future, mis.
+    JobScheduler.call_in_main saat berjalan bersama GUI. Default host hanya
+    127.0.0.1; membuka ke LAN harus diminta secara eksplisit.
+    """
+    MAX_HEADER_BYTES = 16384
+    KEEPALIVE_TIMEOUT = 15
+    PAGE_SIZE = 100
+    MAX_PAGE_SIZE = 1000
+    MAX_CURSORS = 1024
+    SORT_FIELDS = ("title", "artist", "album", "duration", "play_count", "last_played")
+
+    def __init__(self, manager, host="127.0.0.1", port=8765, dispatch=None):
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self.dispatch = dispatch
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="library-server") if dispatch is None else None
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.paths_by_id = {}  # id lagu -> file_path, hanya file di library yang boleh dialirkan
+        self.cursors = OrderedDict()  # token -> (playlist, sort, reverse, cursor PlaylistView.page)
+        self.cursor_tokens = itertools.count(1)
+        self.connections = {}  # Task handler -> StreamWriter koneksi yang masih terbuka
+        self.heads_sent = set()  # StreamWriter yang header respons permintaannya sudah terkirim
+        self.active_streams = 0
+
+    @staticmethod
+    def song_id(file_path):
+        return hashlib.sha1(file_path.encode("utf-8", "surrogateescape")).hexdigest()[:16]
+
+    # --- Siklus hidup ---
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                 limit=self.MAX_HEADER_BYTES, backlog=1024)
+        self.port = self.server.sockets[0].getsockname()[1]  # port=0 berarti dipilih OS
+        return self.port
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        try:
+            await self.server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        # Putus koneksi keep-alive dan stream yang tersisa agar handler selesai dengan rapi
+        for writer in list(self.connections.values()):
+            writer.transport.abort()
+        if self.connections:
+            await asyncio.wait(list(self.connections), timeout=1)
+
+    def run(self):
+        """Menjalankan server di thread ini sampai dihentikan (mode --serve)"""
+        async def main():
+            await self.start()
+            print(f"Server library berjalan di http://{self.host}:{self.port}/")
+            await self.serve_forever()
+        try:
+            asyncio.run(main())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False)
+
+    def start_in_thread(self):
+        """Menjalankan server di thread latar; mengembalikan port setelah siap menerima koneksi"""
+        ready = Future()
+        async def main():
+            try:
+                await self.start()
+            except Exception as e:
+                ready.set_exception(e)
+                return
+            ready.set_result(self.port)
+            await self.serve_forever()
+        self.thread = threading.Thread(target=asyncio.run, args=(main(),), name="library-server", daemon=True)
+        self.thread.start()
+        return ready.result(timeout=10)
+
+    def stop(self):
+        """Berhenti menerima koneksi; stream yang berjalan dibatalkan saat loop selesai"""
+        if self.loop is not None and self.server is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.server.close)
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
+        self.server = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+
+    async def _call(self, fn, *args):
+        if self.dispatch is None:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(fn, *args))
+        return await asyncio.wrap_future(self.dispatch(functools.partial(fn, *args)))
+
+    # --- HTTP ---
+    async def _handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self.connections[task] = writer
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.KEEPALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    return
+                request = self._parse_request(head)
+                if request is None:
+                    await self._send_json(None, writer, False, {"error": "Permintaan tidak valid"}, 400)
+                    return
+                self.heads_sent.discard(writer)
+                if not await self._respond(request, writer):
+                    return
+        except ConnectionError:
+            pass
+        except Exception:
+            print("Permintaan ke server library gagal:", file=sys.stderr)
+            traceback.print_exc()
+            if writer not in self.heads_sent:
+                with contextlib.suppress(ConnectionError):
+                    await self._send_json(None, writer, False, {"error": "Kesalahan internal server"}, 500)
+        finally:
+            self.connections.pop(task, None)
+            self.heads_sent.discard(writer)
+            writer.close()
+
+    @staticmethod
+    def _parse_request(head):
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            return None
+        headers = {}
+        for line in lines[1:]:
+            name, separator, value = line.partition(":")
+            if separator:
+                headers[name.strip().lower()] = value.strip()
+        url = urllib.parse.urlsplit(target)
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.1":
+            keep_alive = connection != "close"
+        else:
+            keep_alive = connection == "keep-alive"
+        return {
+            "method": method,
+            "segments": [urllib.parse.unquote(part) for part in url.path.split("/") if part],
+            "query": urllib.parse.parse_qs(url.query),
+            "headers": headers,
+            "keep_alive": keep_alive,
+        }
+
+    def _write_head(self, writer, status, headers, keep_alive):
+        lines = [f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}",
+                 f"Date: {email.utils.formatdate(usegmt=True)}",
+                 "Server: uas-strukturdata"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        self.heads_sent.add(writer)
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    @staticmethod
+    def _etag_matches(request, etag):
+        if request is None:
+            return False
+        header = request["headers"].get("if-none-match")
+        if not header:
             return False
+        tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+        return "*" in tags or etag in tags
+
+    async def _send_json(self, request, writer, keep_alive, data, status=200):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if status == 200 and self._etag_matches(request, etag):
+            self._write_head(writer, 304, headers, keep_alive)
+        else:
+            headers["Content-Type"] = "application/json; charset=utf-8"
+            headers["Content-Length"] = len(body)
+            self._write_head(writer, status, headers, keep_alive)
+            if request is None or request["method"] != "HEAD":
+                writer.write(body)
+        await writer.drain()
+        return keep_alive
+
+    async def _respond(self, request, writer):
+        keep_alive = request["keep_alive"]
+        if request["method"] not in ("GET", "HEAD"):
+            return await self._send_json(request, writer, False, {"error": "Hanya GET dan HEAD"}, 405)
+        segments, query = request["segments"], request["query"]
+        try:
+            if len(segments) == 2 and segments[0] == "stream":
+                return await self._stream(request, writer, keep_alive, segments[1])
+            if segments == ["api", "playlists"]:
+                data = await self._call(self._playlists_json)
+            elif len(segments) == 3 and segments[:2] == ["api", "playlists"]:
+                data = await self._call(self._playlist_page_json, segments[2], query)
+            elif segments == ["api", "search"]:
+                data = await self._call(self._search_json, query)
+            elif segments == ["api", "stats"]:
+                data = await self._call(self._stats_json)
+            elif not segments:
+                data = {"endpoints": ["/api/playlists", "/api/playlists/<nama>?size=&cursor=&sort=&order=",
+                                      "/api/search?q=&playlist=&limit=", "/api/stats", "/stream/<id>"]}
+            else:
+                data = None
+        except ValueError as e:
+            return await self._send_json(request, writer, keep_alive, {"error": str(e)}, 400)
+        if data is None:
+            return await self._send_json(request, writer, keep_alive, {"error": "Tidak ditemukan"}, 404)
+        return await self._send_json(request, writer, keep_alive, data)
+
+    # --- Data JSON (dijalankan di thread pemilik manager) ---
+    def _song_json(self, song):
+        song_id = self.song_id(song.file_path)
+        self.paths_by_id[song_id] = song.file_path
+        return {
+            "id": song_id,
+            "title": song.title,
+            "artist": song.artist,
+            "album": song.album,
+            "duration": song.duration,
+            "play_count": song.play_count,
+            "favorite": song.file_path in self.manager.favorite_songs,
+            "stream": f"/stream/{song_id}",
+        }
+
+    def _playlists_json(self):
+        return {"current": self.manager.current_playlist,
+                "playlists": [{"name": name, "songs": count, "seconds": seconds}
+                              for name, count, seconds in self.manager.get_playlist_summaries()]}
+
+    def _playlist_page_json(self, name, query):
+        size = int(query.get("size", [self.PAGE_SIZE])[0])
+        size = max(1, min(size, self.MAX_PAGE_SIZE))
+        token = query.get("cursor", [None])[0]
+        if token:
+            # Token menyimpan playlist dan urutan halaman pertama agar cursor tetap konsisten
+            entry = self.cursors.get(token)
+            if entry is None:
+                raise ValueError("Cursor tidak dikenal atau sudah kedaluwarsa")
+            self.cursors.move_to_end(token)
+            name, sort, reverse, cursor = entry
         else:
-            self.favorite_songs.add(song.file_path)
-            return True
+            sort = query.get("sort", [None])[0]
+            if sort is not None and sort not in self.SORT_FIELDS:
+                raise ValueError(f"sort harus salah satu dari {', '.join(self.SORT_FIELDS)}")
+            reverse = query.get("order", ["ascending"])[0] == "descending"
+            cursor = None
+        with self.manager.reading([name]):
+            if name not in self.manager.playlists:
+                return None
+            view = self.manager.get_playlist_view(name)
+            if sort is not None:
+                view = view.sorted(key=lambda song: self.manager._get_song_value(song, sort), reverse=reverse)
+            songs, next_cursor = view.page(cursor, size)
+            data = {"playlist": name, "total": self.manager.playlists.summary(name)[0],
+                    "songs": [self._song_json(song) for song in songs]}
+        next_token = None
+        if next_cursor is not None:
+            next_token = format(next(self.cursor_tokens), "x")
+            self.cursors[next_token] = (name, sort, reverse, next_cursor)
+            if len(self.cursors) > self.MAX_CURSORS:
+                self.cursors.popitem(last=False)
+        data["next"] = next_token
+        return data
 
-    def is_favorite(self, song):
-        return song.file_path in self.favorite_songs
+    def _search_json(self, query):
+        text = query.get("q", [""])[0]
+        limit = max(1, min(int(query.get("limit", [50])[0]), self.MAX_PAGE_SIZE))
+        name = query.get("playlist", [self.manager.current_playlist])[0]
+        with self.manager.reading([name]):
+            playlist = self.manager.playlists.get(name)
+            if playlist is None:
+                return None
+            allowed_paths = {song.file_path for song in playlist}
+            songs = self.manager.search_index.search(text, allowed_paths, limit)
+            return {"query": text, "playlist": name, "songs": [self._song_json(song) for song in songs]}
 
-    def get_most_played_songs(self, n=10):
-        all_songs = []
-        unique_paths = set()
-        for playlist in self.playlists.values():
-            for song in playlist:
-                if song.file_path not in unique_paths:
-                    all_songs.append(song)
-                    unique_paths.add(song.file_path)
-        sorted_songs = sorted(all_songs, key=lambda x: x.play_count, reverse=True)
-        return sorted_songs[:n]
+    def _stats_json(self):
+        manager = self.manager
+        with manager.lock.read():
+            # Judul diambil dari playlist yang sudah dimuat; statistik sendiri mencakup seluruh library
+            loaded_songs = {song.file_path: song for _, playlist in manager.playlists.loaded_items()
+                            for song in playlist}
+            def entry(file_path, **extra):
+                song = loaded_songs.get(file_path)
+                song_id = self.song_id(file_path)
+                self.paths_by_id[song_id] = file_path
+                title = song.title if song else os.path.splitext(os.path.basename(file_path))[0]
+                return {"id": song_id, "title": title, "stream": f"/stream/{song_id}", **extra}
+            most_played = heapq.nlargest(10, manager.song_stats.items(), key=lambda item: item[1].get("play_count", 0))
+            data = {
+                "total_songs": manager.get_total_song_count(),
+                "playlists": len(manager.playlists.keys()),
+                "favorites": len(manager.favorite_songs),
+                "most_played": [entry(path, play_count=stats.get("play_count", 0))
+                                for path, stats in most_played if stats.get("play_count", 0)],
+            }
+            if manager.play_log is not None:
+                data["top_this_week"] = [entry(path, plays=count) for path, count in manager.play_log.top_songs_this_week()]
+                data["daily_hours"] = [{"date": date, "hours": round(hours, 2)}
+                                       for date, hours in manager.play_log.daily_listening()]
+            return data
 
-    def get_recently_played(self, n=10):
-        return self.recently_played[:n]
+    def _library_paths(self):
+        with self.manager.lock.read():
+            return {self.song_id(path): path for path in self.manager.song_stats}
+
+    # --- Streaming audio ---
+    @staticmethod
+    def _parse_range(value, size):
+        """Satu rentang 'bytes=a-b', 'bytes=a-' atau 'bytes=-n' -> (awal, akhir) atau None bila di luar file.
+
+        Sintaks yang tidak didukung (mis. banyak rentang) memunculkan ValueError
+        sehingga header Range diabaikan dan seluruh file dikirim.
+        """
+        unit, _, spec = value.partition("=")
+        if unit.strip().lower() != "bytes" or "," in spec:
+            raise ValueError(value)
+        first, _, last = spec.strip().partition("-")
+        if not first:
+            suffix = int(last)
+            if suffix <= 0:
+                return None
+            start, end = max(0, size - suffix), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+            if last and end < start:
+                raise ValueError(value)
+            end = min(end, size - 1)
+        if start >= size:
+            return None
+        return start, end
+
+    async def _stream(self, request, writer, keep_alive, song_id):
+        file_path = self.paths_by_id.get(song_id)
+        if file_path is None:
+            self.paths_by_id.update(await self._call(self._library_paths))
+            file_path = self.paths_by_id.get(song_id)
+        try:
+            audio_file = open(file_path, "rb") if file_path else None
+        except OSError:
+            audio_file = None
+        if audio_file is None:
+            return await self._send_json(request, writer, keep_alive, {"error": "Lagu tidak ditemukan"}, 404)
+        with audio_file:
+            stat = os.fstat(audio_file.fileno())
+            size = stat.st_size
+            etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+            headers = {"Accept-Ranges": "bytes", "ETag": etag, "Cache-Control": "no-cache",
+                       "Last-Modified": email.utils.formatdate(stat.st_mtime, usegmt=True)}
+            if self._etag_matches(request, etag):
+                self._write_head(writer, 304, headers, keep_alive)
+                await writer.drain()
+                return keep_alive
+            headers["Content-Type"] = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+            start, end, status = 0, size - 1, 200
+            range_header = request["headers"].get("range")
+            if_range = request["headers"].get("if-range")
+            if range_header and (not if_range or if_range == etag):
+                try:
+                    byte_range = self._parse_range(range_header, size)
+                except ValueError:
+                    byte_range = (start, end)
+                else:
+                    status = 206
+                if byte_range is None:
+                    headers["Content-Range"] = f"bytes */{size}"
+                    headers["Content-Length"] = 0
+                    self._write_head(writer, 416, headers, keep_alive)
+                    await writer.drain()
+                    return keep_alive
+                start, end = byte_range
+                if status == 206:
+                    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            length = end - start + 1
+            headers["Content-Length"] = length
+            self._write_head(writer, status, headers, keep_alive)
+            await writer.drain()
+            if request["method"] == "GET" and length > 0:
+                self.active_streams += 1
+                try:
+                    # Zero-copy os.sendfile bila tersedia, selain itu baca/tulis bertahap
+                    await self.loop.sendfile(writer.transport, audio_file, start, length)
+                finally:
+                    self.active_streams -= 1
+        return keep_alive
 
 
 # ==================================================
@@ -386,9 +4908,10 @@ class PlaylistManager:
 
 class SongMetadataDialog(tk.Toplevel):
     """Dialog untuk mengedit metadata lagu"""
-    def __init__(self, parent, default_title="", default_artist="", default_album="", playlists=[], current_playlist=""):
+    def __init__(self, parent, default_title="", default_artist="", default_album="", playlists=[], current_playlist="", multiple=False):
         super().__init__(parent)
         self.title("Edit Metadata Lagu")
+        self.multiple = multiple  # Edit banyak lagu: kolom kosong berarti tidak diubah
         self.geometry("400x250")
         self.resizable(False, False)
         self.transient(parent) # Tetap di atas parent
@@ -416,8 +4939,10 @@ class SongMetadataDialog(tk.Toplevel):
         
         ttk.Label(main_frame, text="Playlist:").grid(row=3, column=0, padx=5, pady=5, sticky="e")
         self.playlist_var = tk.StringVar(value=current_playlist)
-        self.playlist_dropdown = ttk.Combobox(main_frame, textvariable=self.playlist_var, values=playlists, state="readonly")
+        self.playlist_dropdown = ttk.Combobox(main_frame, textvariable=self.playlist_var, values=([""] if multiple else []) + list(playlists), state="readonly")
         self.playlist_dropdown.grid(row=3, column=1, padx=5, pady=5, sticky="ew")
+        if multiple:
+            ttk.Label(main_frame, text="Kosongkan kolom untuk mempertahankan nilai lama.").grid(row=5, column=0, columnspan=2)
         
         button_frame = ttk.Frame(main_frame)
         button_frame.grid(row=4, column=0, columnspan=2, pady=15)
@@ -428,6 +4953,15 @@ class SongMetadataDialog(tk.Toplevel):
         main_frame.grid_columnconfigure(1, weight=1)
 
     def on_ok(self):
+        if self.multiple:
+            self.result = {
+                "title": self.title_entry.get(),
+                "artist": self.artist_entry.get(),
+                "album": self.album_entry.get(),
+                "playlist": self.playlist_var.get()
+            }
+            self.destroy()
+            return
         self.result = {
             "title": self.title_entry.get() or "Unknown Title",
             "artist": self.artist_entry.get() or "Unknown Artist",
@@ -516,34 +5050,279 @@ class PlaylistManagerDialog(tk.Toplevel):
                 self.result = ("delete", name)
                 self.destroy()
 
+class MoveSongsDialog(tk.Toplevel):
+    """Dialog untuk memilih playlist tujuan saat memindahkan banyak lagu"""
+    def __init__(self, parent, playlists, song_count):
+        super().__init__(parent)
+        self.title("Pindahkan Lagu")
+        self.geometry("320x130")
+        self.resizable(False, False)
+        self.transient(parent)
+        self.grab_set()
+
+        self.result = None
+
+        main_frame = ttk.Frame(self, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(main_frame, text=f"Pindahkan {song_count} lagu ke playlist:").pack(anchor='w')
+        self.playlist_var = tk.StringVar()
+        ttk.Combobox(main_frame, textvariable=self.playlist_var, values=list(playlists), state="readonly").pack(fill=tk.X, pady=5)
+
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(pady=5)
+        ttk.Button(button_frame, text="OK", command=self.on_ok).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Batal", command=self.destroy).pack(side=tk.LEFT, padx=5)
+
+    def on_ok(self):
+        if not self.playlist_var.get():
+            messagebox.showwarning("Peringatan", "Harap pilih playlist tujuan", parent=self)
+            return
+        self.result = self.playlist_var.get()
+        self.destroy()
+
+class QueueDialog(tk.Toplevel):
+    """Dialog untuk melihat dan mengatur antrian Up Next"""
+    def __init__(self, parent, queue):
+        super().__init__(parent)
+        self.title("Antrian Putar")
+        self.geometry("450x400")
+        self.transient(parent)
+        self.grab_set()
+
+        self.result = None  # Lagu yang dipilih untuk langsung diputar
+        self.queue = queue
+
+        main_frame = ttk.Frame(self, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        self.listbox = tk.Listbox(main_frame, activestyle="none")
+        self.listbox.pack(fill=tk.BOTH, expand=True)
+        self.listbox.bind("<Double-1>", lambda e: self.play_selected())
+
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, pady=(10, 0))
+        ttk.Button(button_frame, text="▶ Putar", command=self.play_selected).pack(side=tk.LEFT, padx=2)
+        ttk.Button(button_frame, text="▲ Naik", command=lambda: self.move_selected(-1)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(button_frame, text="▼ Turun", command=lambda: self.move_selected(1)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(button_frame, text="❌ Hapus", command=self.remove_selected).pack(side=tk.LEFT, padx=2)
+        ttk.Button(button_frame, text="Tutup", command=self.destroy).pack(side=tk.RIGHT, padx=2)
+
+        self.refresh()
+
+    def refresh(self, select_index=None):
+        self.songs = list(self.queue)
+        current = self.queue.current_song()
+        self.listbox.delete(0, tk.END)
+        for song in self.songs:
+            marker = "▶ " if current is not None and song.file_path == current.file_path else "   "
+            self.listbox.insert(tk.END, f"{marker}{song.title} — {song.artist}")
+        if select_index is not None and 0 <= select_index < len(self.songs):
+            self.listbox.selection_set(select_index)
+            self.listbox.see(select_index)
+
+    def get_selected_index(self):
+        selection = self.listbox.curselection()
+        return selection[0] if selection else None
+
+    def play_selected(self):
+        index = self.get_selected_index()
+        if index is None: return
+        self.queue.jump_to(self.songs[index])
+        self.result = self.songs[index]
+        self.destroy()
+
+    def move_selected(self, offset):
+        index = self.get_selected_index()
+        if index is None: return
+        new_index = index + offset
+        if not 0 <= new_index < len(self.songs): return
+        # Sisipkan sebelum lagu yang akan menjadi tetangga berikutnya
+        ref_index = new_index if offset < 0 else new_index + 1
+        ref_song = self.songs[ref_index] if ref_index < len(self.songs) else None
+        self.queue.move_before(self.songs[index], ref_song)
+        self.refresh(new_index)
+
+    def remove_selected(self):
+        index = self.get_selected_index()
+        if index is None: return
+        self.queue.remove(self.songs[index])
+        self.refresh(min(index, len(self.songs) - 2))
+
+class DebugDialog(tk.Toplevel):
+    """Panel debug yang menampilkan hasil Profiler"""
+    def __init__(self, parent, profiler):
+        super().__init__(parent)
+        self.title("Debug - Profiling")
+        self.geometry("750x400")
+        self.transient(parent)
+
+        self.profiler = profiler
+
+        main_frame = ttk.Frame(self, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        self.enabled_var = tk.BooleanVar(value=profiler.enabled)
+        ttk.Checkbutton(main_frame, text="Aktifkan profiling", variable=self.enabled_var,
+                        command=self.toggle_enabled).pack(anchor='w')
+
+        self.tree = ttk.Treeview(main_frame, columns=("nama", "panggilan", "total", "rata", "maks", "p"), show="headings")
+        for column, text, width in [("nama", "Fungsi", 230), ("panggilan", "Panggilan", 70),
+                                    ("total", "Total (ms)", 90), ("rata", "Rata-rata (ms)", 100),
+                                    ("maks", "Maks (ms)", 80), ("p", "Histogram", 150)]:
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=width, anchor=tk.W if column in ("nama", "p") else tk.E)
+        self.tree.pack(fill=tk.BOTH, expand=True, pady=5)
+
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X)
+        ttk.Button(button_frame, text="Segarkan", command=self.refresh).pack(side=tk.LEFT, padx=2)
+        ttk.Button(button_frame, text="Reset", command=self.reset).pack(side=tk.LEFT, padx=2)
+        ttk.Button(button_frame, text="Ekspor JSON", command=self.export_json).pack(side=tk.LEFT, padx=2)
+        ttk.Button(button_frame, text="Ekspor cProfile", command=self.export_cprofile).pack(side=tk.LEFT, padx=2)
+        ttk.Button(button_frame, text="Tutup", command=self.destroy).pack(side=tk.RIGHT, padx=2)
+
+        self.refresh()
+
+    def toggle_enabled(self):
+        if self.enabled_var.get():
+            self.profiler.enable()
+        else:
+            self.profiler.disable()
+
+    def refresh(self):
+        self.tree.delete(*self.tree.get_children())
+        for row in self.profiler.summary():
+            # Histogram ringkas: hanya bucket yang terisi
+            histogram = " ".join(f"{bucket}:{count}" for bucket, count in row["histogram"].items() if count)
+            self.tree.insert("", tk.END, values=(
+                row["name"], row["calls"], f"{row['total_ms']:.1f}",
+                f"{row['mean_ms']:.2f}", f"{row['max_ms']:.1f}", histogram
+            ))
+
+    def reset(self):
+        self.profiler.reset()
+        self.refresh()
+
+    def export_json(self):
+        filename = filedialog.asksaveasfilename(parent=self, defaultextension=".json",
+                                                filetypes=[("JSON", "*.json")])
+        if filename:
+            self.profiler.export_json(filename)
+
+    def export_cprofile(self):
+        filename = filedialog.asksaveasfilename(parent=self, defaultextension=".prof",
+                                                filetypes=[("cProfile", "*.prof")])
+        if not filename: return
+        if not self.profiler.dump_cprofile(filename):
+            messagebox.showwarning("Peringatan", "Profiling belum pernah diaktifkan.", parent=self)
+
 # ==================================================
 # KELAS APLIKASI UTAMA
 # ==================================================
 
 class MusicPlayerApp:
     """Kelas utama aplikasi pemutar musik"""
+    ROWS_PER_PAGE = 200  # Jumlah baris Treeview yang dimuat per halaman
+    SEARCH_DEBOUNCE_MS = 200  # Jeda ketik sebelum pencarian dijalankan
+
     def __init__(self, root):
         self.root = root
         self.root.title("Pemutar Musik dengan Animasi Sorting")
         self.root.geometry("950x700")
         
+        # Profiler dipasang sebelum library dimuat agar apply_library_index ikut terukur
+        self.profiler = Profiler(enabled=os.environ.get("UAS_PROFILE") == "1")
         self.playlist_manager = PlaylistManager()
-        self.playlist_manager.load_from_file("music_library.json")
+        self.playlist_manager.play_log = PlayEventLog("play_events")
+        self.profiler.instrument(self.playlist_manager, ["snapshot_library", "apply_library_index"])
+        # I/O disk; read_index dan write berjalan sebagai job di thread worker
+        self.profiler.instrument(self.playlist_manager.storage, ["read_index", "write", "read_playlist"])
+        # load_more_rows mengambil halaman dari view (di sinilah view diurutkan/difilter)
+        self.profiler.instrument(self, [
+            "refresh_song_list", "load_more_rows", "animate_sort_step", "scan_matches"
+        ])
+        self.profiler.monitor_event_loop(self.root)
+        # Tugas berat (muat/simpan, impor, cover, loudness) dijalankan di luar thread Tk
+        self.scheduler = JobScheduler(process_initializer=_init_loudness_worker, on_error=self.report_job_error)
+        self.scheduler.attach(self.root)
+        self.save_scheduled = False
+        self.album_art_job = None
+        self.import_job = None
+        self.library_server = None  # LibraryServer saat berbagi library ke LAN
+        self.seek_tables = SeekTableCache("seek_tables")
+        self.profiler.instrument(self.seek_tables, ["load_or_build"])
+        self.seek_job = None
+        self.search_after = None  # id after() pencarian yang menunggu jeda ketik
+        self.search_job = None    # Pemindaian playlist untuk pencarian di thread worker
+        self.search_text = ""     # Teks pencarian terakhir yang dijadwalkan
+        self.search_cache = None  # (kunci view, kata kunci, lagu yang cocok) untuk penyempitan hasil
+        self.music_file = None        # OffsetFile yang sedang dimuat mixer setelah seek
+        self.position_base = 0.0      # Posisi lagu (detik) saat pemutaran terakhir dimulai/dilanjutkan
+        self.position_resumed = None  # time.monotonic() saat itu; None bila dijeda/berhenti
         
         self.sort_criteria_map = {
             "Judul": "title", "Artis": "artist", "Album": "album",
-            "Durasi": "duration", "Jumlah Diputar": "play_count", "Terakhir Diputar": "last_played"
+            "Durasi": "duration", "Jumlah Diputar": "play_count", "Terakhir Diputar": "last_played",
+            "Urutan Manual": "manual"
         }
         self.sort_order_map = {"Naik": "ascending", "Turun": "descending"}
         
         self.is_sorting = False # Flag untuk menandakan animasi sedang berjalan
+        self.view_songs = []    # Daftar yang sedang ditampilkan: PlaylistView lazy atau list hasil pencarian
+        self.view_cursor = None # Cursor halaman berikutnya dari view_songs
+        self.drag_item = None   # Item Treeview yang sedang di-drag
+        self.shuffle_modes = {"Mati": "off", "Acak": "shuffle", "Berbobot": "weighted"}
+        self.shuffle_mode = "off"
+        self.shuffle = None     # ShuffleEngine, dibuat ulang setiap daftar berubah
+        self.current_song = None  # Lagu yang sedang diputar
+        self.item_by_path = {}  # file_path -> item Treeview, untuk menyorot lagu yang diputar
+        self.loaded_rows = 0    # Jumlah baris view_songs yang sudah dimasukkan ke Treeview
+        self.facet_filter = None  # (artis, album) yang dipilih di panel jelajah; None = semua
+        self.browse_key = None    # (playlist, versi) yang sedang ditampilkan panel jelajah
+        self.browse_artists = []  # Indeks iid artis -> nama artis
+        self.browse_albums = {}   # iid album -> nama album
+        self.base_volume = 0.7  # Volume dari slider (0-1)
+        self.track_gain_db = 0.0  # Gain normalisasi lagu yang sedang diputar
+        self.loudness_cache = LoudnessCache("loudness_cache.json")
+        self.loudness_analyzer = LoudnessAnalyzer(self.loudness_cache, self.scheduler)
+        self.listen_started_at = None  # Waktu mulai lagu saat ini (epoch)
+        self.listen_seconds = 0.0      # Detik didengar sebelum jeda terakhir
+        self.listen_resumed = None     # time.monotonic() saat pemutaran terakhir dilanjutkan
 
         self.setup_ui()
         self.update_playlist_dropdown()
-        self.refresh_song_list(animate=False) # Muat awal tanpa animasi
+        # Index library dibaca (dan dimigrasi bila perlu) di thread worker;
+        # dipasang di thread utama, dan hanya playlist aktif yang dimuat
+        self.status_bar.config(text="Memuat library...")
+        self.scheduler.submit(self.playlist_manager.storage.read_index,
+                              priority=JobScheduler.INTERACTIVE, on_done=self.on_library_loaded,
+                              name="muat library")
         
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+    def on_library_loaded(self, index):
+        self.playlist_manager.apply_library_index(index)
+        self.update_playlist_dropdown()
+        self.refresh_song_list(animate=False) # Muat awal tanpa animasi
+
+    def save_library(self):
+        """Menjadwalkan penyimpanan library.
+
+        Beberapa permintaan berturut-turut digabung menjadi satu snapshot saat
+        idle; hanya playlist yang berubah dan index yang ditulis, di thread worker.
+        """
+        if self.save_scheduled:
+            return
+        self.save_scheduled = True
+        self.root.after_idle(self._snapshot_and_save)
+
+    def _snapshot_and_save(self):
+        self.save_scheduled = False
+        files, sequence = self.playlist_manager.snapshot_library()
+        self.scheduler.submit(self.playlist_manager.storage.write, files, sequence,
+                              priority=JobScheduler.NORMAL, name="simpan library")
+
     def setup_ui(self):
         """Mengatur antarmuka pengguna"""
         # --- Frame Atas (Kontrol Utama) ---
@@ -562,6 +5341,11 @@ class MusicPlayerApp:
         self.stop_button.pack(side=tk.LEFT, padx=2)
         self.next_button = ttk.Button(playback_frame, text="▶▶ Next", command=self.next_song)
         self.next_button.pack(side=tk.LEFT, padx=2)
+        self.shuffle_var = tk.StringVar(value="Mati")
+        ttk.Label(playback_frame, text="🔀").pack(side=tk.LEFT, padx=(6, 0))
+        self.shuffle_combo = ttk.Combobox(playback_frame, textvariable=self.shuffle_var, values=list(self.shuffle_modes.keys()), state="readonly", width=9)
+        self.shuffle_combo.pack(side=tk.LEFT, padx=2)
+        self.shuffle_combo.bind("<<ComboboxSelected>>", self.set_shuffle_mode)
         
         manage_frame = ttk.LabelFrame(top_frame, text="Manajemen", padding=5)
         manage_frame.pack(side=tk.LEFT, fill=tk.Y)
@@ -576,16 +5360,24 @@ class MusicPlayerApp:
         self.search_var = tk.StringVar()
         self.search_entry = ttk.Entry(manage_frame, textvariable=self.search_var, width=20)
         self.search_entry.pack(side=tk.LEFT)
-        self.search_entry.bind("<KeyRelease>", self.perform_search)
+        self.search_entry.bind("<KeyRelease>", self.on_search_key)
         ttk.Button(manage_frame, text="✖", command=self.clear_search, width=2).pack(side=tk.LEFT, padx=2)
+        self.fuzzy_var = tk.BooleanVar(value=False)
+        self.fuzzy_check = ttk.Checkbutton(manage_frame, text="Fuzzy", variable=self.fuzzy_var, command=self.perform_search)
+        self.fuzzy_check.pack(side=tk.LEFT, padx=2)
         
         volume_frame = ttk.Frame(top_frame)
         volume_frame.pack(side=tk.RIGHT, padx=5)
         ttk.Label(volume_frame, text="Volume:").pack()
+        self.normalize_var = tk.BooleanVar(value=True)  # Dibuat sebelum slider memanggil set_volume
         self.volume_slider = ttk.Scale(volume_frame, from_=0, to=100, command=self.set_volume, orient=tk.HORIZONTAL)
         self.volume_slider.set(70)
         pygame.mixer.music.set_volume(0.7)
         self.volume_slider.pack()
+        ttk.Checkbutton(volume_frame, text="Normalisasi", variable=self.normalize_var,
+                        command=self.apply_volume).pack()
+        self.analyze_button = ttk.Button(volume_frame, text="Analisis Loudness", command=self.analyze_library_loudness)
+        self.analyze_button.pack()
 
         # --- Frame Daftar Lagu ---
         list_frame = ttk.Frame(self.root, padding=(10,0,10,0))
@@ -604,7 +5396,22 @@ class MusicPlayerApp:
         self.sort_order_combo.pack(side=tk.LEFT)
         self.sort_order_combo.bind("<<ComboboxSelected>>", self.set_sort_options)
 
-        self.song_list = ttk.Treeview(list_frame, columns=("judul", "artis", "album", "durasi"), show="headings")
+        # Panel jelajah artis -> album, diisi dari FacetIndex playlist aktif
+        browse_frame = ttk.Frame(list_frame)
+        browse_frame.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 5))
+        self.browse_tree = ttk.Treeview(browse_frame, columns=("jumlah",), show="tree headings", selectmode="browse", height=10)
+        self.browse_tree.heading("#0", text="Jelajah")
+        self.browse_tree.heading("jumlah", text="Lagu")
+        self.browse_tree.column("#0", width=180)
+        self.browse_tree.column("jumlah", width=50, anchor=tk.E)
+        browse_scrollbar = ttk.Scrollbar(browse_frame, orient="vertical", command=self.browse_tree.yview)
+        self.browse_tree.configure(yscrollcommand=browse_scrollbar.set)
+        self.browse_tree.pack(side=tk.LEFT, fill=tk.Y)
+        browse_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.browse_tree.bind("<<TreeviewSelect>>", self.on_browse_select)
+        self.browse_tree.bind("<<TreeviewOpen>>", self.on_browse_open)
+
+        self.song_list = ttk.Treeview(list_frame, columns=("judul", "artis", "album", "durasi"), show="headings", selectmode="extended")
         self.song_list.heading("judul", text="Judul")
         self.song_list.heading("artis", text="Artis")
         self.song_list.heading("album", text="Album")
@@ -618,12 +5425,14 @@ class MusicPlayerApp:
         self.song_list.tag_configure('compare', background='#a7c7e7') # Biru muda
         self.song_list.tag_configure('sorted', background='#b2e8b2') # Hijau muda
 
-        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.song_list.yview)
-        self.song_list.configure(yscrollcommand=scrollbar.set)
+        self.song_scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.song_list.yview)
+        self.song_list.configure(yscrollcommand=self.on_song_list_scroll)
         
         self.song_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.song_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.song_list.bind("<Double-1>", self.on_song_double_click)
+        self.song_list.bind("<B1-Motion>", self.on_song_drag)
+        self.song_list.bind("<ButtonRelease-1>", self.on_song_drop)
         
         # --- Frame Bawah ---
         bottom_frame = ttk.Frame(self.root, padding=10)
@@ -640,8 +5449,9 @@ class MusicPlayerApp:
         self.now_playing_info = ttk.Label(info_progress_frame, text="Tidak ada lagu yang diputar", wraplength=600, font=("Segoe UI", 10))
         self.now_playing_info.pack(fill=tk.X, anchor='w')
         
-        self.progress_bar = ttk.Progressbar(info_progress_frame, orient=tk.HORIZONTAL, mode='determinate')
+        self.progress_bar = ttk.Progressbar(info_progress_frame, orient=tk.HORIZONTAL, mode='determinate', cursor="hand2")
         self.progress_bar.pack(fill=tk.X, expand=True, pady=5)
+        self.progress_bar.bind("<Button-1>", self.on_progress_click)
         self.progress_label = ttk.Label(info_progress_frame, text="00:00 / 00:00")
         self.progress_label.pack(fill=tk.X, anchor='e')
         
@@ -653,10 +5463,30 @@ class MusicPlayerApp:
         self.edit_song_button.pack(side=tk.LEFT, padx=2)
         self.delete_song_button = ttk.Button(action_frame, text="❌ Hapus Lagu", command=self.delete_selected_song)
         self.delete_song_button.pack(side=tk.LEFT, padx=2)
+        self.move_song_button = ttk.Button(action_frame, text="📁 Pindahkan", command=self.move_selected_songs)
+        self.move_song_button.pack(side=tk.LEFT, padx=2)
         self.fav_button = ttk.Button(action_frame, text="⭐ Favorit", command=self.toggle_favorite)
         self.fav_button.pack(side=tk.LEFT, padx=2)
         self.stats_button = ttk.Button(action_frame, text="📊 Statistik", command=self.show_stats)
         self.stats_button.pack(side=tk.LEFT, padx=2)
+        self.debug_button = ttk.Button(action_frame, text="🐞 Debug", command=self.show_debug_panel)
+        self.debug_button.pack(side=tk.LEFT, padx=2)
+        self.play_next_button = ttk.Button(action_frame, text="⏭ Putar Berikutnya", command=self.play_selected_next)
+        self.play_next_button.pack(side=tk.LEFT, padx=2)
+        self.enqueue_button = ttk.Button(action_frame, text="➕ Antrian", command=self.enqueue_selected_song)
+        self.enqueue_button.pack(side=tk.LEFT, padx=2)
+        self.queue_button = ttk.Button(action_frame, text="📜 Lihat Antrian", command=self.show_queue)
+        self.queue_button.pack(side=tk.LEFT, padx=2)
+        self.mix_button = ttk.Button(action_frame, text="🎲 Auto-Mix", command=self.create_auto_mix)
+        self.mix_button.pack(side=tk.LEFT, padx=2)
+        self.server_button = ttk.Button(action_frame, text="🌐 Server", command=self.toggle_server)
+        self.server_button.pack(side=tk.LEFT, padx=2)
+        self.undo_button = ttk.Button(action_frame, text="↶ Undo", command=self.undo)
+        self.undo_button.pack(side=tk.LEFT, padx=2)
+        self.redo_button = ttk.Button(action_frame, text="↷ Redo", command=self.redo)
+        self.redo_button.pack(side=tk.LEFT, padx=2)
+        self.root.bind("<Control-z>", lambda e: self.undo())
+        self.root.bind("<Control-y>", lambda e: self.redo())
         
         self.status_bar = ttk.Label(self.root, text="Memuat...", anchor=tk.W, relief=tk.SUNKEN, padding=2)
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
@@ -664,12 +5494,17 @@ class MusicPlayerApp:
         self.update_progress()
         
     def toggle_ui_state(self, state=tk.NORMAL):
-        """Enable/disable kontrol UI selama animasi."""
-        for widget in [self.prev_button, self.play_button, self.pause_button, 
-                       self.stop_button, self.next_button, self.manage_playlist_button,
-                       self.search_entry, self.sort_criteria_combo, self.sort_order_combo,
-                       self.add_song_button, self.edit_song_button, self.delete_song_button,
-                       self.fav_button, self.stats_button, self.playlist_dropdown, self.song_list]:
+        """Enable/disable kontrol UI selama animasi.
+
+        Tombol Prev/Pause/Stop/Next dan volume tetap aktif agar pemutaran
+        tidak terganggu; hanya kontrol yang mengubah daftar yang dinonaktifkan.
+        """
+        for widget in [self.play_button, self.manage_playlist_button,
+                       self.search_entry, self.fuzzy_check, self.sort_criteria_combo, self.sort_order_combo,
+                       self.add_song_button, self.edit_song_button, self.delete_song_button, self.move_song_button,
+                       self.fav_button, self.stats_button, self.playlist_dropdown, self.shuffle_combo,
+                       self.play_next_button, self.enqueue_button, self.queue_button,
+                       self.undo_button, self.redo_button, self.debug_button, self.mix_button, self.song_list]:
             try:
                 widget.config(state=state)
             except tk.TclError: # Treeview tidak punya config state
@@ -688,6 +5523,10 @@ class MusicPlayerApp:
         self.playlist_manager.sort_criteria = self.sort_criteria_map[selected_criteria_display]
         self.playlist_manager.sort_order = self.sort_order_map[selected_order_display]
         
+        if self.playlist_manager.sort_criteria == "manual":
+            # Urutan manual tidak perlu diurutkan, cukup tampilkan ulang
+            self.refresh_song_list(animate=False)
+            return
         self.start_sort_animation()
         
     def start_sort_animation(self):
@@ -697,17 +5536,7 @@ class MusicPlayerApp:
         self.status_bar.config(text=f"Mengurutkan berdasarkan '{self.sort_criteria_var.get()}'...")
         
         # Dapatkan daftar lagu yang saat ini ditampilkan
-        songs_in_view = []
-        for item_id in self.song_list.get_children():
-            # Cari objek Song yang sesuai dengan item di Treeview
-            values = self.song_list.item(item_id, 'values')
-            # Ini asumsi sederhana. Untuk kasus kompleks, diperlukan mapping yang lebih baik.
-            # Kita akan gunakan file_path sebagai ID unik.
-            # Dapatkan semua lagu dulu
-            all_songs = self.playlist_manager.get_current_playlist_songs()
-            found_song = next((s for s in all_songs if s.title == values[0] and s.artist == values[1] and s.album == values[2]), None)
-            if found_song:
-                songs_in_view.append(found_song)
+        songs_in_view = self.view_songs[:self.loaded_rows]
 
         if not songs_in_view:
              self.refresh_song_list(animate=False)
@@ -774,8 +5603,14 @@ class MusicPlayerApp:
             self.status_bar.config(text="Pengurutan selesai.")
             self.root.after(2000, self.update_status_bar) # Kembalikan status bar setelah 2 detik
 
-    def refresh_song_list(self, animate=True):
-        """Memperbarui daftar lagu, dengan atau tanpa animasi."""
+    def refresh_song_list(self, animate=True, refine=False):
+        """Memperbarui daftar lagu, dengan atau tanpa animasi.
+
+        refine=True mengizinkan hasil pencarian sebelumnya dipakai ulang
+        (lihat cached_matches). Pemindaian penuh tidak pernah dilakukan di
+        thread Tk: pencarian dijalankan di worker dan finish_search memanggil
+        fungsi ini lagi setelah hasilnya siap.
+        """
         if self.is_sorting: return
 
         # Jika diminta untuk animasi, panggil proses animasi
@@ -783,28 +5618,125 @@ class MusicPlayerApp:
             self.start_sort_animation()
             return
             
-        # Jika tidak, lakukan refresh instan
-        self.song_list.delete(*self.song_list.get_children())
-        
-        # Dapatkan lagu yang sudah diurutkan (versi non-generator)
-        songs = self.playlist_manager.get_sorted_playlist_songs()
-        
         search_term = self.search_var.get().lower()
         
-        filtered_songs = songs
-        if search_term:
-            filtered_songs = [
-                song for song in songs 
-                if (search_term in song.title.lower() or 
-                    search_term in song.artist.lower() or 
-                    search_term in song.album.lower())
-            ]
+        if search_term and self.fuzzy_var.get():
+            # Mode fuzzy: hasil diurutkan berdasarkan relevansi (top-K), tanpa sorting penuh
+            filtered_songs = self.playlist_manager.fuzzy_search(search_term)
+        else:
+            # View lazy yang sudah diurutkan; filter digabung di atasnya tanpa salinan perantara
+            filtered_songs = self.playlist_manager.get_sorted_playlist_songs()
+            if search_term:
+                matches = self.cached_matches(search_term) if refine else None
+                if matches is None:
+                    # Daftar lama tetap tampil sampai pemindaian di worker selesai
+                    self.start_search(search_term)
+                    return
+                self.search_cache = (self.search_view_key(), search_term, matches)
+                filtered_songs = matches
+
+        # Jika tidak, lakukan refresh instan
+        self.song_list.delete(*self.song_list.get_children())
+        self.refresh_browse_pane()
+        if self.facet_filter:
+            # Keanggotaan facet sudah dihitung; cukup cek himpunan per lagu
+            members = self.playlist_manager.get_facets().members(*self.facet_filter)
+            if isinstance(filtered_songs, PlaylistView):
+                filtered_songs = filtered_songs.filter(lambda song: song.file_path in members)
+            else:
+                filtered_songs = [song for song in filtered_songs if song.file_path in members]
         
-        for song in filtered_songs:
-            self.song_list.insert("", tk.END, values=(song.title, song.artist, song.album, song.duration))
+        self.item_by_path = {}
+        self.loaded_rows = 0
+        self.view_songs = filtered_songs
+        self.view_cursor = None
+        self.shuffle = None
+        # Treeview hanya diisi per halaman; halaman berikutnya dimuat saat digulir ke bawah
+        self.load_more_rows()
         
         self.update_status_bar()
 
+    def refresh_browse_pane(self):
+        """Mengisi ulang panel jelajah hanya bila playlist atau isinya berubah."""
+        name = self.playlist_manager.current_playlist
+        playlist = self.playlist_manager.playlists.get(name)
+        key = (name, playlist.version if playlist is not None else None)
+        if key == self.browse_key:
+            return
+        self.browse_key = key
+        facets = self.playlist_manager.get_facets(name)
+        if self.facet_filter:
+            artist, album = self.facet_filter
+            if not facets.members(artist, album):
+                self.facet_filter = None
+
+        self.browse_tree.delete(*self.browse_tree.get_children())
+        self.browse_tree.insert("", tk.END, iid="all", text="Semua Lagu", values=(len(facets.entries),))
+        artists = facets.artist_list()
+        for index, (artist, count) in enumerate(artists):
+            item_id = self.browse_tree.insert("", tk.END, iid=f"artist:{index}", text=artist or "(Tanpa Artis)", values=(count,))
+            # Anak placeholder agar bisa dibuka; album diisi saat node dibuka
+            self.browse_tree.insert(item_id, tk.END, iid=f"artist:{index}:stub", text="...")
+        self.browse_artists = [artist for artist, _ in artists]
+        self.browse_albums = {}
+
+    def on_browse_open(self, event=None):
+        item_id = self.browse_tree.focus()
+        if not item_id.startswith("artist:") or item_id.count(":") != 1:
+            return
+        stub = f"{item_id}:stub"
+        if not self.browse_tree.exists(stub):
+            return
+        self.browse_tree.delete(stub)
+        artist = self.browse_artists[int(item_id.split(":")[1])]
+        for index, (album, count) in enumerate(self.playlist_manager.get_facets().album_list(artist)):
+            self.browse_tree.insert(item_id, tk.END, iid=f"{item_id}:{index}", text=album or "(Tanpa Album)", values=(count,))
+            self.browse_albums[f"{item_id}:{index}"] = album
+
+    def on_browse_select(self, event=None):
+        if self.is_sorting: return
+        selected = self.browse_tree.selection()
+        if not selected:
+            return  # Seleksi hilang karena panel diisi ulang
+        if selected[0] == "all":
+            facet_filter = None
+        else:
+            parts = selected[0].split(":")
+            if len(parts) == 3 and parts[2] == "stub":
+                return
+            artist = self.browse_artists[int(parts[1])]
+            album = self.browse_albums[selected[0]] if len(parts) == 3 else None
+            facet_filter = (artist, album)
+        if facet_filter != self.facet_filter:
+            self.facet_filter = facet_filter
+            self.refresh_song_list(animate=False)
+
+    def load_more_rows(self):
+        """Menambahkan halaman berikutnya dari view_songs ke Treeview."""
+        if isinstance(self.view_songs, PlaylistView):
+            if self.loaded_rows and self.view_cursor is None:
+                return  # Halaman terakhir sudah dimuat
+            songs, self.view_cursor = self.view_songs.page(self.view_cursor, self.ROWS_PER_PAGE)
+        else:
+            songs = self.view_songs[self.loaded_rows:self.loaded_rows + self.ROWS_PER_PAGE]
+        for song in songs:
+            item_id = self.song_list.insert("", tk.END, values=(song.title, song.artist, song.album, song.duration))
+            self.item_by_path.setdefault(song.file_path, item_id)
+            self.loaded_rows += 1
+
+    def song_at(self, index):
+        """Lagu pada posisi index di daftar yang sedang tampil.
+
+        Tanpa urutan/filter view memakai treap posisi playlist (O(log n));
+        view terurut/terfilter memakai isi yang dimaterialisasi sekali per versi.
+        """
+        return self.view_songs[index]
+
+    def on_song_list_scroll(self, first, last):
+        self.song_scrollbar.set(first, last)
+        if float(last) >= 0.98 and self.loaded_rows < len(self.view_songs) and not self.is_sorting:
+            self.load_more_rows()
+
     def play_song(self, from_double_click=False):
         """Memutar lagu yang dipilih."""
         if self.is_sorting: return # Jangan putar lagu saat sorting
@@ -819,46 +5751,60 @@ class MusicPlayerApp:
             self.song_list.selection_set(selected_items[0])
         
         selected_item = selected_items[0]
-        values = self.song_list.item(selected_item, 'values')
         
-        # Gunakan lagu yang sudah diurutkan untuk mencari indeks
-        all_songs = self.playlist_manager.get_sorted_playlist_songs()
+        # Posisi item di Treeview sama dengan posisinya di view_songs
+        actual_index = self.song_list.index(selected_item)
         
-        song_to_play = None
-        actual_index = -1
-        for i, song in enumerate(all_songs):
-            if song.title == values[0] and song.artist == values[1] and song.album == values[2] and song.duration == values[3]:
-                song_to_play = song
-                actual_index = i
-                break
-        
-        if song_to_play:
+        if actual_index < self.loaded_rows:
             self.playlist_manager.current_song_index = actual_index
-            self.play_song_at_index(actual_index)
+            if self.shuffle_mode != "off":
+                self.get_shuffle_engine().mark_played(actual_index)
+                self.play_song_at_index(actual_index)
+            else:
+                # Daftar yang sedang tampil menjadi konteks antrian, tanpa disalin
+                queue = self.playlist_manager.playback_queue
+                queue.seed(self.view_songs, actual_index)
+                self.start_playback(queue.current_song())
         else:
             if not from_double_click:
                 messagebox.showerror("Error", "Lagu tidak dapat ditemukan. Coba segarkan daftar.")
 
     def play_song_at_index(self, index):
-        """Memutar lagu berdasarkan indeks dari daftar yang sudah diurutkan."""
-        songs = self.playlist_manager.get_sorted_playlist_songs()
-        if not songs or not (0 <= index < len(songs)):
+        """Memutar lagu berdasarkan indeks dari daftar yang sedang ditampilkan."""
+        if not (0 <= index < len(self.view_songs)):
             self.stop_song()
             return
 
-        song = songs[index]
         self.playlist_manager.current_song_index = index # Simpan indeks dari list yang terurut
+        self.start_playback(self.song_at(index))
+        if self.shuffle:
+            self.shuffle.refresh_weight(index)
+
+    def start_playback(self, song):
+        """Memutar objek lagu dan menyorotnya di Treeview bila sedang tampil."""
+        if song is None:
+            self.stop_song()
+            return
+        self.finish_listen()
         try:
-            pygame.mixer.music.load(song.file_path)
+            self.load_music(song.file_path)
             pygame.mixer.music.play()
             self.playlist_manager.playing = True
+            self.current_song = song
+            self.position_base = 0.0
+            self.position_resumed = time.monotonic()
+            self.request_seek_table(song)
+            self.listen_started_at = time.time()
+            self.listen_seconds = 0.0
+            self.listen_resumed = time.monotonic()
+            self.track_gain_db = self.loudness_cache.get_gain(song.file_path)
+            self.apply_volume()
             self.playlist_manager.record_play(song)
             self.update_now_playing(song)
-            self.playlist_manager.save_to_file("music_library.json")
+            self.save_library()
             
-            all_items = self.song_list.get_children()
-            if index < len(all_items):
-                item_to_select = all_items[index]
+            item_to_select = self.item_by_path.get(song.file_path)
+            if item_to_select:
                 self.song_list.selection_set(item_to_select)
                 self.song_list.focus(item_to_select)
                 self.song_list.see(item_to_select)
@@ -869,24 +5815,94 @@ class MusicPlayerApp:
             
     def next_song(self):
         """Memutar lagu berikutnya dalam urutan saat ini."""
-        if self.is_sorting: return
-        songs = self.playlist_manager.get_sorted_playlist_songs()
-        if not songs: return
-        
-        next_index = (self.playlist_manager.current_song_index + 1) % len(songs)
-        self.play_song_at_index(next_index)
+        if self.shuffle_mode != "off":
+            if self.view_songs:
+                self.play_song_at_index(self.get_shuffle_engine().next())
+            return
+        queue = self.playlist_manager.playback_queue
+        if queue.source is None and self.view_songs:
+            queue.seed(self.view_songs, self.playlist_manager.current_song_index)
+            if not len(queue):
+                self.start_playback(queue.current_song())
+                return
+        self.start_playback(queue.advance())
 
     def prev_song(self):
         """Memutar lagu sebelumnya dalam urutan saat ini."""
-        if self.is_sorting: return
-        songs = self.playlist_manager.get_sorted_playlist_songs()
-        if not songs: return
-        
-        if pygame.mixer.music.get_pos() > 3000:
-            self.play_song_at_index(self.playlist_manager.current_song_index)
+        if self.current_song and self.playback_position() > 3:
+            self.start_playback(self.current_song)
+        elif self.shuffle_mode != "off":
+            if self.view_songs:
+                prev_index = self.get_shuffle_engine().prev()
+                self.play_song_at_index(self.playlist_manager.current_song_index if prev_index is None else prev_index)
         else:
-            prev_index = (self.playlist_manager.current_song_index - 1 + len(songs)) % len(songs)
-            self.play_song_at_index(prev_index)
+            self.start_playback(self.playlist_manager.playback_queue.back())
+
+    def play_selected_next(self):
+        """Menyisipkan lagu terpilih tepat setelah lagu yang sedang diputar."""
+        if self.is_sorting: return
+        song, _ = self.get_selected_song_from_list()
+        if not song: return
+        self.playlist_manager.playback_queue.play_next(song)
+        self.save_library()
+        self.status_bar.config(text=f"'{song.title}' akan diputar berikutnya.")
+
+    def enqueue_selected_song(self):
+        """Menambahkan lagu terpilih ke akhir antrian."""
+        if self.is_sorting: return
+        song, _ = self.get_selected_song_from_list()
+        if not song: return
+        self.playlist_manager.playback_queue.enqueue(song)
+        self.save_library()
+        self.status_bar.config(text=f"'{song.title}' ditambahkan ke antrian.")
+
+    def show_queue(self):
+        if self.is_sorting: return
+        dialog = QueueDialog(self.root, self.playlist_manager.playback_queue)
+        self.root.wait_window(dialog)
+        self.save_library()
+        if dialog.result is not None:
+            self.start_playback(dialog.result)
+
+    def create_auto_mix(self):
+        """Membuat playlist mix dari lagu terpilih berdasarkan riwayat co-play."""
+        if self.is_sorting: return
+        song, _ = self.get_selected_song_from_list()
+        if not song:
+            messagebox.showwarning("Peringatan", "Pilih lagu sebagai titik awal mix.", parent=self.root)
+            return
+        name, count = self.playlist_manager.create_auto_mix(song)
+        if count <= 1:
+            messagebox.showinfo("Auto-Mix", "Belum ada riwayat yang cukup untuk lagu ini.", parent=self.root)
+        self.playlist_manager.current_playlist = name
+        self.save_library()
+        self.playlist_var.set(name)
+        self.update_playlist_dropdown()
+        self.refresh_song_list(animate=False)
+        self.status_bar.config(text=f"Auto-mix '{name}' dibuat dengan {count} lagu.")
+
+    def set_shuffle_mode(self, event=None):
+        """Mengganti mode acak (mati / acak / berbobot)."""
+        self.shuffle_mode = self.shuffle_modes[self.shuffle_var.get()]
+        self.shuffle = None
+
+    def get_shuffle_engine(self):
+        """Membuat ShuffleEngine untuk daftar saat ini bila belum ada (O(1) untuk mode acak)."""
+        if self.shuffle is None:
+            weight_fn = None
+            if self.shuffle_mode == "weighted":
+                weight_fn = lambda i: self.playlist_manager.get_shuffle_weight(self.song_at(i))
+            self.shuffle = ShuffleEngine(len(self.view_songs), weight_fn)
+            if weight_fn:
+                # Bobot awal diambil dalam satu lintasan; view yang dimaterialisasi juga dipakai song_at
+                songs = self.view_songs
+                if isinstance(songs, PlaylistView):
+                    songs = songs.materialize()
+                get_weight = self.playlist_manager.get_shuffle_weight
+                self.shuffle.weights = FenwickTree(get_weight(song) for song in songs)
+            if self.playlist_manager.playing:
+                self.shuffle.mark_played(self.playlist_manager.current_song_index)
+        return self.shuffle
 
     # ... (Sisa fungsi-fungsi UI lainnya tidak perlu diubah secara signifikan) ...
     # Cukup pastikan mereka tidak berjalan saat is_sorting == True
@@ -914,12 +5930,32 @@ class MusicPlayerApp:
             
             if success:
                 messagebox.showinfo("Sukses", message, parent=self.root)
-                self.playlist_manager.save_to_file("music_library.json")
+                self.save_library()
                 self.update_playlist_dropdown()
                 self.refresh_song_list(animate=False)
             else:
                 messagebox.showwarning("Gagal", "Operasi playlist gagal. Nama mungkin sudah ada.", parent=self.root)
 
+    def undo(self):
+        """Membatalkan perubahan library terakhir (Ctrl+Z)."""
+        if self.is_sorting: return
+        self.apply_history_step(self.playlist_manager.undo(), "Dibatalkan", "Tidak ada yang bisa dibatalkan.")
+
+    def redo(self):
+        """Mengulangi perubahan yang dibatalkan (Ctrl+Y)."""
+        if self.is_sorting: return
+        self.apply_history_step(self.playlist_manager.redo(), "Diulangi", "Tidak ada yang bisa diulangi.")
+
+    def apply_history_step(self, label, prefix, empty_message):
+        if label is None:
+            self.status_bar.config(text=empty_message)
+            return
+        self.save_library()
+        self.playlist_var.set(self.playlist_manager.current_playlist)
+        self.update_playlist_dropdown()
+        self.refresh_song_list(animate=False)
+        self.status_bar.config(text=f"{prefix}: {label}")
+
     def update_playlist_dropdown(self):
         current_selection = self.playlist_var.get()
         playlist_keys = list(self.playlist_manager.playlists.keys())
@@ -930,14 +5966,92 @@ class MusicPlayerApp:
         else:
             self.playlist_var.set(self.playlist_manager.current_playlist)
 
+    @staticmethod
+    def matches_search(song, search_term):
+        return (search_term in song.title.lower() or
+                search_term in song.artist.lower() or
+                search_term in song.album.lower())
+
+    def search_view_key(self):
+        """Penanda isi dan urutan view; hasil pencarian lama hanya dipakai bila tidak berubah"""
+        manager = self.playlist_manager
+        playlist = manager.playlists.get(manager.current_playlist)
+        return (manager.current_playlist, playlist.version if playlist is not None else None,
+                manager.sort_criteria, manager.sort_order)
+
+    def cached_matches(self, search_term):
+        """Menyempitkan hasil pencarian sebelumnya; None bila harus memindai ulang.
+
+        Lagu yang cocok dengan search_term pasti cocok dengan kata kunci lama
+        yang termuat di dalamnya, jadi cukup menyaring hasil lama (yang sudah
+        berurutan) tanpa menelusuri seluruh playlist.
+        """
+        if self.search_cache is None:
+            return None
+        key, previous_term, matches = self.search_cache
+        if previous_term not in search_term or key != self.search_view_key():
+            return None
+        if previous_term == search_term:
+            return matches
+        return [song for song in matches if self.matches_search(song, search_term)]
+
+    def on_search_key(self, event=None):
+        """Menjadwalkan pencarian setelah jeda ketik; tombol yang tidak mengubah teks diabaikan."""
+        text = self.search_var.get()
+        if text == self.search_text:
+            return  # Panah, Shift, Ctrl, dll.
+        self.search_text = text
+        if self.search_job is not None:
+            # Hasil untuk teks lama tidak akan ditampilkan lagi
+            self.search_job.cancel()
+            self.search_job = None
+        if self.search_after is not None:
+            self.root.after_cancel(self.search_after)
+        self.search_after = self.root.after(self.SEARCH_DEBOUNCE_MS, self.perform_search)
+
     def perform_search(self, event=None):
+        if self.search_after is not None:
+            self.root.after_cancel(self.search_after)
+            self.search_after = None
+        if self.search_job is not None:
+            self.search_job.cancel()
+            self.search_job = None
         if self.is_sorting: return
-        self.refresh_song_list(animate=False)
+        self.search_text = self.search_var.get()
+        self.refresh_song_list(animate=False, refine=True)
+
+    def start_search(self, search_term):
+        """Memindai playlist aktif di thread worker; hasilnya diteruskan ke finish_search"""
+        if self.search_job is not None:
+            self.search_job.cancel()
+        self.search_job = self.scheduler.submit(
+            self.scan_matches, search_term, pass_job=True,
+            priority=JobScheduler.INTERACTIVE, on_done=self.finish_search, name="pencarian")
+        self.status_bar.config(text=f"Mencari '{self.search_var.get()}'...")
+
+    def scan_matches(self, search_term, job):
+        """Thread worker: lagu di playlist aktif yang cocok, sesuai urutan tampilan"""
+        manager = self.playlist_manager
+        matches = []
+        with manager.reading([manager.current_playlist]):
+            key = self.search_view_key()
+            for i, song in enumerate(manager.get_sorted_playlist_songs()):
+                if i % 1024 == 0:
+                    job.check()
+                if self.matches_search(song, search_term):
+                    matches.append(song)
+        return key, search_term, matches
+
+    def finish_search(self, result):
+        self.search_job = None
+        self.search_cache = result
+        if not self.is_sorting:
+            self.refresh_song_list(animate=False, refine=True)
 
     def clear_search(self):
         if self.is_sorting: return
         self.search_var.set("")
-        self.refresh_song_list(animate=False)
+        self.perform_search()
         self.search_entry.focus()
 
     def update_now_playing(self, song):
@@ -948,73 +6062,263 @@ class MusicPlayerApp:
         self.update_album_art(song)
         
     def update_album_art(self, song):
-        try:
-            if song:
-                audiofile = eyed3.load(song.file_path)
-                if audiofile and audiofile.tag and audiofile.tag.images:
-                    image_data = audiofile.tag.images[0].image_data
-                    img = Image.open(io.BytesIO(image_data))
-                    img.thumbnail((80, 80))
-                    self.album_art_img = ImageTk.PhotoImage(img)
-                    self.album_art_label.config(image=self.album_art_img)
-                    return
+        """Decode cover di thread worker; permintaan lama dibatalkan bila lagu berganti cepat."""
+        if self.album_art_job is not None:
+            self.album_art_job.cancel()
+            self.album_art_job = None
+        if not song:
+            self.show_album_art(None)
+            return
+        self.album_art_job = self.scheduler.submit(
+            self.profiler.wrap("load_album_art", load_album_art), song.file_path, priority=JobScheduler.INTERACTIVE,
+            on_done=self.show_album_art, on_error=lambda e: self.show_album_art(None, color='#cccccc'),
+            name="cover album")
 
-            placeholder = Image.new('RGB', (80, 80), color = '#e0e0e0')
-            self.album_art_img = ImageTk.PhotoImage(placeholder)
-            self.album_art_label.config(image=self.album_art_img)
-        except Exception:
-            placeholder = Image.new('RGB', (80, 80), color = '#cccccc')
-            self.album_art_img = ImageTk.PhotoImage(placeholder)
-            self.album_art_label.config(image=self.album_art_img)
+    def show_album_art(self, img, color='#e0e0e0'):
+        if img is None:
+            img = Image.new('RGB', (80, 80), color = color)
+        self.album_art_img = ImageTk.PhotoImage(img)
+        self.album_art_label.config(image=self.album_art_img)
 
     def pause_song(self):
         if self.playlist_manager.playing:
             pygame.mixer.music.pause()
             self.playlist_manager.playing = False
+            self.position_base = self.playback_position()
+            self.position_resumed = None
+            if self.listen_resumed is not None:
+                self.listen_seconds += time.monotonic() - self.listen_resumed
+                self.listen_resumed = None
         else:
-            if pygame.mixer.music.get_pos() > 0:
+            if self.current_song is not None:
                 pygame.mixer.music.unpause()
                 self.playlist_manager.playing = True
+                self.position_resumed = time.monotonic()
+                self.listen_resumed = time.monotonic()
+
+    def load_music(self, file_path, offset=0):
+        """Memuat lagu ke mixer; offset > 0 memuat mulai dari frame pada byte tersebut."""
+        previous = self.music_file
+        if offset:
+            self.music_file = OffsetFile(file_path, offset)
+            pygame.mixer.music.load(self.music_file, "mp3")
+        else:
+            self.music_file = None
+            pygame.mixer.music.load(file_path)
+        if previous is not None:
+            previous.close()  # Baru ditutup setelah mixer melepasnya
+
+    def playback_position(self):
+        """Posisi lagu dalam detik: posisi awal seek + waktu berjalan sejak dilanjutkan."""
+        if self.position_resumed is None:
+            return self.position_base
+        return self.position_base + time.monotonic() - self.position_resumed
+
+    def song_duration(self, song):
+        """Durasi dari tabel seek (akurat untuk VBR) bila sudah ada, selain itu dari metadata."""
+        table = self.seek_tables.get(song.file_path)
+        return table.duration if table is not None else song.get_duration_seconds()
+
+    def request_seek_table(self, song):
+        """Membangun (atau memuat dari cache disk) tabel seek lagu di latar belakang."""
+        if self.seek_job is not None:
+            self.seek_job.cancel()
+        self.seek_job = None
+        if self.seek_tables.get(song.file_path) is not None:
+            return
+        self.seek_job = self.scheduler.submit(
+            self.seek_tables.load_or_build, song.file_path, priority=JobScheduler.NORMAL,
+            on_error=lambda error: None, name="tabel seek")
+
+    def seek_to(self, seconds):
+        """Melompat ke detik tertentu di lagu yang sedang diputar."""
+        song = self.current_song
+        if song is None:
+            return
+        seconds = max(0.0, seconds)
+        table = self.seek_tables.get(song.file_path)
+        try:
+            if table is not None:
+                # Muat langsung dari frame tujuan: instan dan akurat sampai satu frame
+                offset, seconds = table.offset_for(seconds)
+                self.load_music(song.file_path, offset)
+                pygame.mixer.music.play()
+            else:
+                # Tabel belum siap: serahkan ke SDL_mixer (bisa meleset pada MP3 VBR)
+                self.load_music(song.file_path)
+                pygame.mixer.music.play(start=seconds)
+        except pygame.error as e:
+            self.status_bar.config(text=f"Gagal seek: {e}")
+            return
+        self.apply_volume()
+        if not self.playlist_manager.playing:
+            pygame.mixer.music.pause()
+        self.position_base = seconds
+        self.position_resumed = time.monotonic() if self.playlist_manager.playing else None
+        self.update_progress_display()
+
+    def on_progress_click(self, event):
+        if self.current_song is None:
+            return
+        width = self.progress_bar.winfo_width()
+        duration = self.song_duration(self.current_song)
+        if width > 0 and duration > 0:
+            self.seek_to(min(max(event.x / width, 0.0), 1.0) * duration)
+
+    def finish_listen(self):
+        """Menulis lama mendengarkan lagu saat ini ke log pemutaran."""
+        if self.current_song is None or self.listen_started_at is None:
+            return
+        seconds = self.listen_seconds
+        if self.listen_resumed is not None:
+            seconds += time.monotonic() - self.listen_resumed
+        self.playlist_manager.log_listen(self.current_song, self.listen_started_at, seconds)
+        self.listen_started_at = None
+        self.listen_resumed = None
+        self.listen_seconds = 0.0
 
     def stop_song(self):
+        self.finish_listen()
         pygame.mixer.music.stop()
         self.playlist_manager.playing = False
+        self.current_song = None
         self.now_playing_info.config(text="Pemutaran dihentikan")
         self.update_album_art(None)
+        self.position_base = 0.0
+        self.position_resumed = None
         self.progress_bar['value'] = 0
         self.progress_label.config(text="00:00 / 00:00")
 
     def set_volume(self, val):
-        volume = float(val) / 100
-        pygame.mixer.music.set_volume(volume)
+        self.base_volume = float(val) / 100
+        self.apply_volume()
+
+    def apply_volume(self):
+        """Volume akhir = volume slider x gain normalisasi lagu (dibatasi 0-1)."""
+        volume = self.base_volume
+        if self.normalize_var.get():
+            volume *= 10 ** (self.track_gain_db / 20)
+        pygame.mixer.music.set_volume(max(0.0, min(1.0, volume)))
+
+    def analyze_library_loudness(self):
+        """Menganalisis loudness seluruh library di latar belakang (melanjutkan yang tertunda)."""
+        if not LoudnessAnalyzer.is_available():
+            messagebox.showwarning("Peringatan", "Analisis loudness membutuhkan NumPy.", parent=self.root)
+            return
+        if self.loudness_analyzer.is_running():
+            return
+        scheduled = self.loudness_analyzer.start(list(self.playlist_manager.get_library_paths()))
+        if not scheduled:
+            self.status_bar.config(text="Semua lagu sudah dianalisis.")
+            return
+        self.analyze_button.config(state=tk.DISABLED)
+        self.poll_loudness_progress()
+
+    def poll_loudness_progress(self):
+        analyzer = self.loudness_analyzer
+        if analyzer.is_running():
+            self.status_bar.config(text=f"Analisis loudness: {analyzer.done}/{analyzer.total} lagu...")
+            self.root.after(500, self.poll_loudness_progress)
+            return
+        self.analyze_button.config(state=tk.NORMAL)
+        self.status_bar.config(text=f"Analisis loudness selesai ({analyzer.done} lagu, {analyzer.errors} gagal).")
+        if self.current_song:
+            self.track_gain_db = self.loudness_cache.get_gain(self.current_song.file_path)
+            self.apply_volume()
 
     def update_progress(self):
         if self.playlist_manager.playing:
-            current_pos = pygame.mixer.music.get_pos() / 1000
-            songs = self.playlist_manager.get_sorted_playlist_songs()
-            
-            if 0 <= self.playlist_manager.current_song_index < len(songs):
-                song = songs[self.playlist_manager.current_song_index]
-                duration_seconds = song.get_duration_seconds()
-                
-                if duration_seconds > 0:
-                    progress = (current_pos / duration_seconds) * 100
-                    self.progress_bar['value'] = progress
-                    
-                    current_time = time.strftime('%M:%S', time.gmtime(current_pos))
-                    self.progress_label.config(text=f"{current_time} / {song.duration}")
-            
+            self.update_progress_display()
             if not pygame.mixer.music.get_busy():
                 self.next_song()
 
         self.root.after(1000, self.update_progress)
 
+    def update_progress_display(self):
+        song = self.current_song
+        if song:
+            current_pos = self.playback_position()
+            duration_seconds = self.song_duration(song)
+            if duration_seconds > 0:
+                current_pos = min(current_pos, duration_seconds)
+                self.progress_bar['value'] = (current_pos / duration_seconds) * 100
+                current_time = time.strftime('%M:%S', time.gmtime(current_pos))
+                self.progress_label.config(text=f"{current_time} / {song.duration}")
+
     def on_song_double_click(self, event):
         if self.is_sorting: return
         self.play_song(from_double_click=True)
 
+    def can_reorder_manually(self):
+        """Drag-and-drop hanya berlaku pada urutan manual tanpa filter pencarian atau facet,
+        sehingga posisi baris sama dengan posisi lagu di playlist."""
+        return (self.playlist_manager.sort_criteria == "manual"
+                and self.playlist_manager.sort_order == "ascending"
+                and not self.search_var.get()
+                and not self.facet_filter)
+
+    def on_song_drag(self, event):
+        if self.is_sorting or not self.can_reorder_manually(): return
+        if self.drag_item is None:
+            self.drag_item = self.song_list.identify_row(event.y) or None
+
+    def on_song_drop(self, event):
+        """Memindahkan lagu yang di-drag ke baris tujuan; posisi dicari lewat treap playlist, O(log n)."""
+        drag_item, self.drag_item = self.drag_item, None
+        if not drag_item or self.is_sorting or not self.can_reorder_manually(): return
+        target_item = self.song_list.identify_row(event.y)
+        if not target_item or target_item == drag_item: return
+
+        old_index = self.song_list.index(drag_item)
+        new_index = self.song_list.index(target_item)
+        self.song_list.move(drag_item, '', new_index)
+        self.playlist_manager.move_song(old_index, new_index)
+
+        # Jaga agar indeks lagu yang sedang diputar tetap menunjuk lagu yang sama
+        current = self.playlist_manager.current_song_index
+        if current == old_index:
+            self.playlist_manager.current_song_index = new_index
+        elif old_index < current <= new_index:
+            self.playlist_manager.current_song_index = current - 1
+        elif new_index <= current < old_index:
+            self.playlist_manager.current_song_index = current + 1
+        self.save_library()
+
+    def toggle_server(self):
+        """Menyalakan/mematikan server HTTP agar library bisa diputar dari mesin lain di LAN."""
+        if self.library_server is not None:
+            self.library_server.stop()
+            self.library_server = None
+            self.server_button.config(text="🌐 Server")
+            self.status_bar.config(text="Server library dimatikan.")
+            return
+        host = os.environ.get("UAS_SERVER_HOST")
+        if host is None:
+            # Default hanya mesin ini; membuka ke LAN harus dipilih pengguna
+            lan = messagebox.askyesno("Server", "Buka server untuk mesin lain di jaringan (LAN)?\n"
+                                      "Pilih 'No' agar hanya bisa diakses dari komputer ini.",
+                                      default=messagebox.NO, parent=self.root)
+            host = "0.0.0.0" if lan else "127.0.0.1"
+        port = int(os.environ.get("UAS_SERVER_PORT", "8765"))
+        # Permintaan ke manager dijalankan di thread Tk lewat scheduler
+        server = LibraryServer(self.playlist_manager, host, port, dispatch=self.scheduler.call_in_main)
+        try:
+            port = server.start_in_thread()
+        except OSError as e:
+            messagebox.showerror("Error", f"Server gagal dijalankan:\n{str(e)}", parent=self.root)
+            return
+        self.library_server = server
+        self.server_button.config(text="🌐 Server (aktif)")
+        self.status_bar.config(text=f"Server library berjalan di http://{host}:{port}/")
+
     def on_closing(self):
-        self.playlist_manager.save_to_file("music_library.json")
+        if self.library_server is not None:
+            self.library_server.stop()
+        self.finish_listen()
+        self.loudness_analyzer.stop()
+        self.scheduler.shutdown()
+        self.playlist_manager.sorter.close()
+        self.playlist_manager.save()
         pygame.mixer.quit()
         self.root.destroy()
 
@@ -1051,27 +6355,102 @@ class MusicPlayerApp:
             tree_recent.insert("", tk.END, values=(song.title, song.artist, last_played_str))
         tree_recent.pack(fill=tk.BOTH, expand=True)
 
+        play_log = self.playlist_manager.play_log
+        if play_log is None:
+            return
+
+        # Lagu teratas dalam rentang waktu tertentu, dihitung dari log pemutaran
+        window_frame = ttk.Frame(notebook)
+        notebook.add(window_frame, text="Per Periode")
+        range_options = {"Minggu Ini": None, "7 Hari": 7, "30 Hari": 30, "365 Hari": 365}
+        range_var = tk.StringVar(value="Minggu Ini")
+        range_combo = ttk.Combobox(window_frame, textvariable=range_var, values=list(range_options.keys()), state="readonly", width=12)
+        range_combo.pack(anchor='w', pady=(0, 5))
+        total_label = ttk.Label(window_frame, text="")
+        total_label.pack(anchor='w')
+        tree_window = ttk.Treeview(window_frame, columns=("judul", "artis", "diputar"), show="headings")
+        tree_window.heading("judul", text="Judul")
+        tree_window.heading("artis", text="Artis")
+        tree_window.heading("diputar", text="Jumlah Diputar")
+        tree_window.column("diputar", anchor=tk.E, width=100)
+        tree_window.pack(fill=tk.BOTH, expand=True)
+
+        def show_window(event=None):
+            tree_window.delete(*tree_window.get_children())
+            days = range_options[range_var.get()]
+            if days is None:
+                top = play_log.top_songs_this_week(10)
+                total_label.config(text="")
+            else:
+                now = time.time()
+                plays, seconds = play_log.aggregate(now - days * 86400, now + 1)
+                top = plays.most_common(10)
+                total_label.config(text=f"Total didengar: {seconds / 3600:.1f} jam")
+            songs_by_path = self.playlist_manager.get_songs_by_path(file_path for file_path, _ in top)
+            for file_path, count in top:
+                song = songs_by_path.get(file_path)
+                title, artist = (song.title, song.artist) if song else (os.path.basename(file_path), "-")
+                tree_window.insert("", tk.END, values=(title, artist, count))
+
+        range_combo.bind("<<ComboboxSelected>>", show_window)
+        show_window()
+
+        # Grafik jam mendengarkan per hari dari rollup harian
+        chart_frame = ttk.Frame(notebook)
+        notebook.add(chart_frame, text="Jam per Hari")
+        canvas = tk.Canvas(chart_frame, background="white", highlightthickness=0)
+        canvas.pack(fill=tk.BOTH, expand=True)
+
+        def draw_chart(event=None):
+            canvas.delete("all")
+            data = play_log.daily_listening(14)
+            width = max(canvas.winfo_width(), 100)
+            height = max(canvas.winfo_height(), 100)
+            peak = max((hours for _, hours in data), default=0) or 1
+            bar_width = width / len(data)
+            for i, (date_str, hours) in enumerate(data):
+                bar_height = (height - 40) * hours / peak
+                x0 = i * bar_width + 4
+                canvas.create_rectangle(x0, height - 20 - bar_height, x0 + bar_width - 8, height - 20, fill="#a7c7e7", outline="")
+                canvas.create_text(x0 + bar_width / 2 - 4, height - 10, text=date_str, font=("Segoe UI", 7))
+                if hours:
+                    canvas.create_text(x0 + bar_width / 2 - 4, height - 28 - bar_height, text=f"{hours:.1f}", font=("Segoe UI", 7))
+
+        canvas.bind("<Configure>", draw_chart)
+
+    def show_debug_panel(self):
+        if self.is_sorting: return
+        DebugDialog(self.root, self.profiler)
+
     def toggle_favorite(self):
         if self.is_sorting: return
         song, index = self.get_selected_song_from_list()
         if not song: return
 
         is_favorite = self.playlist_manager.toggle_favorite(song)
-        self.playlist_manager.save_to_file("music_library.json")
-        if self.playlist_manager.playing and self.playlist_manager.current_song_index == index:
+        self.save_library()
+        if self.playlist_manager.playing and self.current_song and self.current_song.file_path == song.file_path:
             self.update_now_playing(song)
         
         status = "ditambahkan ke" if is_favorite else "dihapus dari"
         messagebox.showinfo("Favorit", f"Lagu '{song.title}' {status} favorit.", parent=self.root)
 
+    def report_job_error(self, error):
+        """Menampilkan error tugas latar yang tidak punya penanganan sendiri di status bar."""
+        self.status_bar.config(text=f"Tugas latar belakang gagal: {error}")
+        self.root.after(5000, self.update_status_bar)
+
     def update_status_bar(self):
         if self.is_sorting: return
         current_playlist_name = self.playlist_manager.current_playlist
-        songs_in_view = len(self.song_list.get_children())
-        total_in_playlist = len(self.playlist_manager.playlists.get(current_playlist_name, []))
+        songs_in_view = len(self.view_songs)
+        total_in_playlist = self.playlist_manager.playlists.summary(current_playlist_name)[0]
         total_library = self.playlist_manager.get_total_song_count()
         
         search_term = self.search_var.get()
+        if self.facet_filter:
+            artist, album = self.facet_filter
+            search_term = " / ".join(part for part in (artist, album, search_term) if part)
         if search_term:
             status_text = f"Menampilkan {songs_in_view} lagu dari '{current_playlist_name}' (Filter: '{search_term}')  |  Total di library: {total_library} lagu"
         else:
@@ -1085,6 +6464,7 @@ class MusicPlayerApp:
         if selected_playlist != self.playlist_manager.current_playlist:
             self.playlist_manager.current_playlist = selected_playlist
             self.playlist_manager.current_song_index = 0
+            self.facet_filter = None
             self.refresh_song_list(animate=False)
             self.stop_song()
 
@@ -1096,31 +6476,36 @@ class MusicPlayerApp:
             filetypes=[("File Audio", "*.mp3"), ("Semua File", "*.*")]
         )
         if not file_paths: return
-            
+        if self.import_job is not None:
+            self.import_job.cancel()
+        self.add_song_button.config(state=tk.DISABLED)
+        self.import_job = self.scheduler.submit(
+            self.profiler.wrap("read_songs_metadata", read_songs_metadata), list(file_paths),
+            priority=JobScheduler.INTERACTIVE, pass_job=True,
+            on_progress=lambda progress: self.status_bar.config(text=f"Membaca metadata {progress[0]}/{progress[1]}..."),
+            on_done=self.finish_add_songs, on_error=self.on_import_failed, name="impor lagu")
+
+    def on_import_failed(self, error):
+        self.import_job = None
+        self.add_song_button.config(state=tk.NORMAL)
+        messagebox.showerror("Error", f"Impor gagal:\n{str(error)}", parent=self.root)
+
+    def finish_add_songs(self, results):
+        """Menampilkan dialog metadata untuk tiap file setelah metadata selesai dibaca."""
+        self.import_job = None
+        self.add_song_button.config(state=tk.NORMAL)
+        self.update_status_bar()
         songs_added_count = 0
-        for file_path in file_paths:
+        for file_path, metadata, error in results:
             try:
-                audiofile = eyed3.load(file_path)
-                
-                title = os.path.splitext(os.path.basename(file_path))[0]
-                artist = "Artis Tidak Dikenal"
-                album = "Album Tidak Dikenal"
-                duration_str = "00:00"
-
-                if audiofile:
-                    if audiofile.info:
-                        duration_sec = audiofile.info.time_secs
-                        if duration_sec:
-                            duration_str = time.strftime('%M:%S', time.gmtime(duration_sec))
-                    if audiofile.tag:
-                        tag = audiofile.tag
-                        title = tag.title or title
-                        artist = tag.artist or artist
-                        album = tag.album or album
+                if error is not None:
+                    raise error
+                duration_str = metadata["duration"]
                 
                 dialog = SongMetadataDialog(
                     self.root,
-                    default_title=title, default_artist=artist, default_album=album,
+                    default_title=metadata["title"], default_artist=metadata["artist"],
+                    default_album=metadata["album"],
                     playlists=list(self.playlist_manager.playlists.keys()),
                     current_playlist=self.playlist_manager.current_playlist
                 )
@@ -1138,7 +6523,7 @@ class MusicPlayerApp:
                 messagebox.showerror("Error", f"Tidak dapat memuat {os.path.basename(file_path)}:\n{str(e)}", parent=self.root)
         
         if songs_added_count > 0:
-            self.playlist_manager.save_to_file("music_library.json")
+            self.save_library()
             self.refresh_song_list(animate=False)
             messagebox.showinfo("Sukses", f"Berhasil menambahkan {songs_added_count} lagu.", parent=self.root)
             
@@ -1149,50 +6534,72 @@ class MusicPlayerApp:
             return None, -1
 
         index_in_view = self.song_list.index(selected_item[0])
-        
-        songs = self.playlist_manager.get_sorted_playlist_songs()
-        search_term = self.search_var.get().lower()
-        if search_term:
-            songs = [s for s in songs if (search_term in s.title.lower() or search_term in s.artist.lower() or search_term in s.album.lower())]
 
-        if index_in_view < len(songs):
-            return songs[index_in_view], index_in_view
+        if index_in_view < self.loaded_rows:
+            return self.song_at(index_in_view), index_in_view
         
         return None, -1
 
+    def get_selected_songs_from_list(self):
+        """Mengembalikan semua lagu yang dipilih (multi-seleksi) sesuai urutan tampilan."""
+        selected_items = self.song_list.selection()
+        if not selected_items:
+            messagebox.showwarning("Peringatan", "Harap pilih lagu terlebih dahulu.", parent=self.root)
+            return []
+        indexes = sorted(self.song_list.index(item) for item in selected_items)
+        return [self.song_at(i) for i in indexes if i < self.loaded_rows]
+
     def edit_selected_song(self):
         if self.is_sorting: return
-        song, _ = self.get_selected_song_from_list()
-        if not song: return
-            
-        dialog = SongMetadataDialog(
-            self.root, default_title=song.title, default_artist=song.artist,
-            default_album=song.album, playlists=list(self.playlist_manager.playlists.keys()),
-            current_playlist=song.playlist
-        )
+        songs = self.get_selected_songs_from_list()
+        if not songs: return
+
+        if len(songs) == 1:
+            song = songs[0]
+            dialog = SongMetadataDialog(
+                self.root, default_title=song.title, default_artist=song.artist,
+                default_album=song.album, playlists=list(self.playlist_manager.playlists.keys()),
+                current_playlist=song.playlist
+            )
+        else:
+            dialog = SongMetadataDialog(
+                self.root, playlists=list(self.playlist_manager.playlists.keys()), multiple=True
+            )
         self.root.wait_window(dialog)
         
         if dialog.result:
-            self.playlist_manager.update_song(song, dialog.result)
-            self.playlist_manager.save_to_file("music_library.json")
+            self.playlist_manager.update_songs([(song, dialog.result) for song in songs])
+            self.save_library()
             self.refresh_song_list(animate=False)
-            messagebox.showinfo("Sukses", "Metadata lagu berhasil diperbarui.", parent=self.root)
+            messagebox.showinfo("Sukses", f"Metadata {len(songs)} lagu berhasil diperbarui.", parent=self.root)
 
     def delete_selected_song(self):
         if self.is_sorting: return
-        song, _ = self.get_selected_song_from_list()
-        if not song: return
+        songs = self.get_selected_songs_from_list()
+        if not songs: return
 
-        confirm = messagebox.askyesno(
-            "Konfirmasi Hapus",
-            f"Anda yakin ingin menghapus '{song.title}' dari library?",
-            parent=self.root
-        )
+        question = (f"Anda yakin ingin menghapus '{songs[0].title}' dari library?" if len(songs) == 1
+                    else f"Anda yakin ingin menghapus {len(songs)} lagu dari library?")
+        confirm = messagebox.askyesno("Konfirmasi Hapus", question, parent=self.root)
         if confirm:
-            self.playlist_manager.delete_song(song)
-            self.playlist_manager.save_to_file("music_library.json")
+            self.playlist_manager.delete_songs(songs)
+            self.save_library()
+            self.refresh_song_list(animate=False)
+            messagebox.showinfo("Sukses", f"{len(songs)} lagu berhasil dihapus.", parent=self.root)
+
+    def move_selected_songs(self):
+        if self.is_sorting: return
+        songs = self.get_selected_songs_from_list()
+        if not songs: return
+
+        dialog = MoveSongsDialog(self.root, list(self.playlist_manager.playlists.keys()), len(songs))
+        self.root.wait_window(dialog)
+
+        if dialog.result:
+            self.playlist_manager.move_songs(songs, dialog.result)
+            self.save_library()
             self.refresh_song_list(animate=False)
-            messagebox.showinfo("Sukses", "Lagu berhasil dihapus.", parent=self.root)
+            self.status_bar.config(text=f"{len(songs)} lagu dipindahkan ke '{dialog.result}'.")
 
 
 # ==================================================
@@ -1200,6 +6607,38 @@ class MusicPlayerApp:
 # ==================================================
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pemutar musik dengan animasi sorting")
+    parser.add_argument("--serve", action="store_true", help="jalankan server HTTP library tanpa GUI")
+    parser.add_argument("--host", help="alamat server (default: 127.0.0.1, atau 0.0.0.0 dengan --lan)")
+    parser.add_argument("--lan", action="store_true", help="buka server untuk mesin lain di LAN")
+    parser.add_argument("--port", type=int, default=8765, help="port server (default: 8765)")
+    parser.add_argument("--merge", nargs="+", metavar="SUMBER",
+                        help="gabungkan beberapa library (file .json lama atau direktori) lalu keluar")
+    parser.add_argument("--output", default="merged_library.json",
+                        help="hasil --merge: file .json (format lama) atau direktori (format index)")
+    parser.add_argument("--plays", choices=["max", "sum"], default="max",
+                        help="cara menggabungkan jumlah putar (default: max)")
+    parser.add_argument("--match", choices=["path", "content"], default="path",
+                        help="kunci penggabungan lagu: file_path atau hash isi file")
+    args = parser.parse_args()
+
+    if args.merge:
+        summary = merge_libraries(args.merge, args.output, play_counts=args.plays, match=args.match)
+        print(f"Library digabung ke '{args.output}': {summary['playlists']} playlist, "
+              f"{summary['unique_songs']} lagu unik, {summary['favorites']} favorit")
+        raise SystemExit(0)
+
+    if args.serve:
+        # Mode tanpa GUI: manager dimiliki thread executor server, bukan event loop
+        manager = PlaylistManager()
+        manager.play_log = PlayEventLog("play_events")
+        manager.load()
+        host = args.host or ("0.0.0.0" if args.lan else "127.0.0.1")
+        LibraryServer(manager, host, args.port).run()
+        raise SystemExit(0)
+
+    # Inisialisasi pygame mixer untuk pemutaran audio
+    pygame.mixer.init()
     root = tk.Tk()
     style = ttk.Style(root)
     available_themes = style.theme_names()